@@ -1,9 +1,14 @@
 import json
 from datetime import datetime
-from coach_core.data import load_profile, load_logs, save_logs
-from coach_core.ai import AICoach
 from dotenv import load_dotenv
+# Load .env before coach_core, whose modules read their settings at import time
 load_dotenv()
+from coach_core.data import load_profile, load_logs, save_logs
+from coach_core.ai import AICoach
+from coach_core.context import encode_logs_table
+from coach_core.database import CoachDatabase
+from coach_core.insights import InsightBackfill, batch_mode_enabled
+from coach_core.routing import DAILY_INSIGHT
 
 def log_daily_feedback(ai_coach):
     """Enhanced daily logging with AI insights"""
@@ -33,26 +38,60 @@ def log_daily_feedback(ai_coach):
     # Give AI insights on the log
     print("\n🤖 AI Analysis:")
     if ai_coach.client:
-        insight_prompt = f"Based on this log entry: {json.dumps(entry)}, and considering Yoel's profile and previous patterns, give a brief insight or suggestion for tomorrow."
+        insight_prompt = f"""Based on this log entry:
+{encode_logs_table([entry])}
+
+and considering Yoel's profile and previous patterns:
+{ai_coach.build_context(max_logs=3, budget_tokens=400)}
+
+Give a brief insight or suggestion for tomorrow."""
         try:
-            insight = ai_coach.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            insight = ai_coach.complete(
+                [
                     {"role": "system", "content": "You are Yoel's AI coach. Give brief, helpful insights."},
                     {"role": "user", "content": insight_prompt}
                 ],
-                max_tokens=150,
-                temperature=0.7
+                kind=DAILY_INSIGHT
             )
-            print(insight.choices[0].message.content)
+            print(insight)
+            CoachDatabase().save_daily_insights([{"date": entry["date"], "insight": insight, "source": "live"}])
         except:
             print("✅ Log saved! I'm learning from your patterns.")
     else:
         print("✅ Log saved! I'm learning from your patterns.")
 
+def backfill_insights(ai_coach):
+    """Generate insights for logged days that have none, a block of days per request"""
+    if not ai_coach.client:
+        print("❌ Backfill needs an OpenAI API key")
+        return
+    
+    backfill = InsightBackfill(ai_coach)
+    if batch_mode_enabled():
+        collected = backfill.collect_batches()
+        if collected:
+            print(f"✅ Collected {collected} insights from finished batches")
+        batch_id = backfill.submit_batch()
+        if batch_id:
+            print(f"📦 Submitted batch {batch_id}; run 'backfill' again later to collect it")
+        else:
+            print("✅ Every logged day is covered by an insight or a pending batch")
+        return
+    
+    print("🧠 Backfilling insights...")
+    result = backfill.run()
+    if not result["pending"]:
+        print("✅ Every logged day already has an insight")
+        return
+    print(f"✅ Saved {result['saved']} of {result['pending']} missing insights "
+          f"with {result['requests']} requests (~{result['tokens']} tokens)")
+    if result["deferred"]:
+        print(f"💸 Token budget reached, leaving {result['deferred']} days for a later run")
+
 def run():
     """Main interaction loop"""
     ai_coach = AICoach()
+    conversation = ai_coach.new_conversation()
     
     print(f"Welcome back, {ai_coach.profile.get('name', 'Yoel')} 👋")
     print("Your AI Coach is ready to help!")
@@ -64,6 +103,7 @@ def run():
     print("- Type anything to chat with your AI coach")
     print("- 'log' to record your day")
     print("- 'patterns' to see your recent trends")
+    print("- 'backfill' to generate insights for past days")
     print("- 'exit' to quit")
     
     while True:
@@ -77,13 +117,25 @@ def run():
             log_daily_feedback(ai_coach)
             continue
         
+        if user_input.lower() == "backfill":
+            backfill_insights(ai_coach)
+            continue
+        
         if user_input.lower() == "patterns":
             print(f"\n📈 Your Recent Patterns:\n{ai_coach.analyze_patterns()}")
             continue
         
-        # Get AI response
-        response = ai_coach.get_ai_response(user_input)
-        print(f"\nAI Coach: {response}")
+        # Stream AI response, printing tokens as they arrive
+        print("\nAI Coach: ", end="", flush=True)
+        response = ""
+        for delta in ai_coach.stream_ai_response(user_input, history=conversation.context_messages()):
+            response += delta
+            print(delta, end="", flush=True)
+        print()
+        
+        conversation.add("user", user_input)
+        conversation.add("assistant", response)
+        conversation.maybe_refresh_summary()
 
 if __name__ == "__main__":
     run() 
\ No newline at end of file
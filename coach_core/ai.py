@@ -1,182 +1,537 @@
 print('AI module loaded')
 import os
 import json
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from datetime import datetime
-import openai
-from coach_core.data import load_profile, load_logs, save_logs
+from coach_core.data import load_profile, load_logs, save_logs, get_data_generation, get_default_profile
+from coach_core.client import get_openai_client
+from coach_core.cache import ResponseCache, cache_disabled, fingerprint
+from coach_core.semantic_cache import SemanticCache, cache_scope, semantic_cache_disabled, DEGRADED_THRESHOLD
 from coach_core.analysis import analyze_patterns
+from coach_core.context import build_context
 from coach_core.utils import detect_split
 from coach_core.mentor_brain import get_all_mentors_context, create_mentor_prompt, get_mentor_specialization
+from coach_core.mentor_index import rank_mentors
+from coach_core.prompts import (
+    get_system_prompt, get_mentor_context, build_user_context,
+    build_weekly_plan_prompt, build_summary_prompt, build_panel_synthesis_prompt,
+    WEEKLY_PLAN_SYSTEM_PROMPT, SUMMARY_SYSTEM_PROMPT, PANEL_SYNTHESIS_SYSTEM_PROMPT
+)
+from coach_core.conversation import ConversationManager
+from coach_core.transcripts import transcript_store
+from coach_core.intents import route, is_bare, HELP, INJURY, NUTRITION, TIRED, TRAINING, WEEKLY_PLAN
+from coach_core.singleflight import llm_flights
+from coach_core.transport import llm_transport
+from coach_core.limiter import llm_limiter, request_tokens, RateLimited
+from coach_core.telemetry import llm_telemetry
+from coach_core.routing import model_router, QUICK_CHAT, SUMMARY, PANEL_SYNTHESIS, WEEKLY_PLAN as WEEKLY_PLAN_KIND
+from coach_core.panel import stream_panel, mentor_name, DEFAULT_PANEL_SIZE
+
+HELP_RESPONSE = "I'm here to help with your training, nutrition, and recovery! I draw from the wisdom of the world's best movement and strength minds. Try asking about what to train today, food suggestions, or how you're feeling. I'm learning from your daily logs to give you better advice over time."
 
 class AICoach:
     """Mentor-Powered AI Coach - Synthesizing the world's best minds in movement and strength."""
     def __init__(self):
-        self.profile = load_profile()
-        self.logs = load_logs()
-        self.client = None
-        self.mentors = get_all_mentors_context()
-        
-        # Initialize OpenAI client with proper configuration
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
-            try:
-                # Use minimal configuration to avoid proxy issues
-                self.client = openai.OpenAI(
-                    api_key=api_key,
-                    # Don't pass any proxy or http_client settings
-                )
-                print("✅ OpenAI client initialized successfully")
-            except Exception as e:
-                print(f"❌ Error initializing OpenAI client: {e}")
-                self.client = None
-        else:
-            print("⚠️ No OPENAI_API_KEY found in environment variables")
-            self.client = None
+        # Everything is loaded on first access, so construction is free
+        self._profile = None
+        self._logs = None
+        self._generation = None
+        self._mentors = None
+        self._cache = None
+        self._semantic_cache = None
 
-    def analyze_patterns(self) -> str:
-        return analyze_patterns(self.logs)
+    def _sync_generation(self) -> None:
+        """Drop cached profile/logs when the data generation has moved on."""
+        generation = get_data_generation()
+        if generation != self._generation:
+            self._profile = None
+            self._logs = None
+            self._generation = generation
 
-    def get_mentor_powered_response(self, user_input: str) -> str:
-        """Get intelligent response from GPT using mentor knowledge base."""
-        if not self.client:
-            print("⚠️ Using fallback response (no OpenAI client)")
-            return self.get_fallback_response(user_input)
-        
-        # Create comprehensive mentor context
-        mentor_context = self._create_mentor_context()
-        
-        # Build the system prompt with mentor knowledge
-        system_prompt = f"""You are Yoel's personal AI fitness coach, trained by the world's greatest minds in movement, strength, and performance.
+    @property
+    def profile(self) -> Dict[str, Any]:
+        self._sync_generation()
+        if self._profile is None:
+            self._profile = load_profile()
+        return self._profile
 
-You have access to the knowledge and philosophies of these mentors:
+    @property
+    def logs(self) -> List[Dict[str, Any]]:
+        self._sync_generation()
+        if self._logs is None:
+            self._logs = load_logs()
+        return self._logs
 
-{mentor_context}
+    @property
+    def mentors(self) -> Dict[str, Any]:
+        if self._mentors is None:
+            self._mentors = get_all_mentors_context()
+        return self._mentors
 
-YOUR COACHING APPROACH:
-- Synthesize the best insights from all mentors based on Yoel's specific needs
-- Be encouraging, knowledgeable, and personalized
-- Consider his injuries (shoulder issues, knee is fine now)
-- Focus on his goals (calisthenics, yoga, athletic performance)
-- Provide actionable, specific advice
-- Ask follow-up questions to understand his needs better
-- Be conversational and supportive like a real coach
+    @property
+    def cache(self) -> ResponseCache:
+        if self._cache is None:
+            self._cache = ResponseCache()
+        return self._cache
 
-YOUR PERSONALITY:
-- Wise and knowledgeable like Dr. Andy Galpin
-- Encouraging and patient like Patrick Beach
-- Direct and motivating like Everydamnandré
-- Safety-focused like SquatU
-- Longevity-minded like KneesOverToesGuy
-- Movement-focused like Ido Portal
+    @property
+    def semantic_cache(self) -> SemanticCache:
+        if self._semantic_cache is None:
+            self._semantic_cache = SemanticCache()
+        return self._semantic_cache
 
-Always provide specific, actionable advice that combines the best insights from these mentors."""
+    @property
+    def client(self):
+        """Shared, connection-pooled OpenAI client (None without an API key)."""
+        return get_openai_client()
 
-        # Create user context with profile and logs
-        user_context = f"""
-YOEL'S PROFILE:
-{json.dumps(self.profile, indent=2)}
+    def analyze_patterns(self) -> str:
+        return analyze_patterns(self.logs)
 
-RECENT PATTERNS:
-{self.analyze_patterns()}
+    def build_context(self, max_logs: int = 7, budget_tokens: Optional[int] = None) -> str:
+        """Token-budgeted profile, pattern and recent-log context for prompts."""
+        return build_context(self.profile, self.logs, self.analyze_patterns(), max_logs, budget_tokens)
 
-RECENT LOGS (last 3 days):
-{json.dumps(self.logs[-3:], indent=2)}
+    def _request_key(self, model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        """Fingerprint a request; shared by the response cache and single-flight coalescing."""
+        return fingerprint(model, messages, params, get_data_generation())
 
-YOEL'S QUESTION/REQUEST:
-{user_input}
+    def _route(self, kind: str, max_tokens: Optional[int], temperature: Optional[float],
+               model: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """Resolve model and params from the routing table; explicit arguments win."""
+        route = model_router.select(kind)
+        params = {
+            "max_tokens": route["max_tokens"] if max_tokens is None else max_tokens,
+            "temperature": route["temperature"] if temperature is None else temperature,
+        }
+        return model or route["model"], params
 
-Respond as Yoel's mentor-powered AI coach, drawing from the wisdom of the world's best movement and strength minds:"""
+    def complete(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None,
+                 temperature: Optional[float] = None, model: Optional[str] = None,
+                 bypass_cache: bool = False, deadline: Optional[float] = None,
+                 kind: str = QUICK_CHAT, feature: Optional[str] = None,
+                 response_format: Optional[Dict[str, Any]] = None) -> str:
+        """Run a chat completion, serving repeated requests from the response cache.
 
+        Model and params come from the routing table for `kind`. Concurrent
+        identical requests share a single in-flight OpenAI call, which takes a
+        permit from the shared rate limiter (raising RateLimited when over
+        budget) and runs under the resilient transport (deadline, retries,
+        circuit breaker).
+        Each call is recorded in telemetry under `feature` (defaults to kind).
+        Pass response_format={"type": "json_object"} to request JSON output.
+        """
+        model, params = self._route(kind, max_tokens, temperature, model)
+        if response_format:
+            params["response_format"] = response_format
+        record = llm_telemetry.start(feature or kind, model)
+        key = self._request_key(model, messages, params)
+        use_cache = not bypass_cache and not cache_disabled()
+        
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print("⚡ Serving cached response")
+                record.cache_hit = True
+                record.finish()
+                return cached
+        
+        if not self.client:
+            error = RuntimeError("OpenAI client is not configured")
+            record.finish(error)
+            raise error
+        
+        client = self.client
+        
+        def call() -> str:
+            # Only the leader takes a permit; followers share its result for free
+            with llm_limiter.acquire(request_tokens(messages, params["max_tokens"])) as permit:
+                record.mark_sent()
+                started = time.monotonic()
+                try:
+                    response = llm_transport.call(
+                        lambda timeout: client.with_options(timeout=timeout).chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            **params
+                        ),
+                        deadline=deadline
+                    )
+                except TimeoutError:
+                    model_router.record(kind, model, time.monotonic() - started)
+                    raise
+                model_router.record(kind, model, time.monotonic() - started)
+                record.mark_first_token()
+                result = response.choices[0].message.content or ""
+                record.set_usage(getattr(response, "usage", None), messages, result)
+                permit.settle(record.prompt_tokens + record.completion_tokens)
+            if use_cache and result:
+                self.cache.set(key, result)
+            return result
+        
+        try:
+            result, shared = llm_flights.do(key, call)
+        except Exception as e:
+            record.finish(e)
+            raise
+        if shared:
+            print("🔗 Shared result of an identical in-flight request")
+            record.shared = True
+        record.finish()
+        return result
+
+    def stream(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None,
+               temperature: Optional[float] = None, model: Optional[str] = None,
+               bypass_cache: bool = False, deadline: Optional[float] = None,
+               kind: str = QUICK_CHAT, feature: Optional[str] = None) -> Iterator[str]:
+        """Stream a chat completion as text deltas; cached or shared responses are yielded whole."""
+        model, params = self._route(kind, max_tokens, temperature, model)
+        record = llm_telemetry.start(feature or kind, model, streamed=True)
+        key = self._request_key(model, messages, params)
+        use_cache = not bypass_cache and not cache_disabled()
+        
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print("⚡ Serving cached response")
+                record.cache_hit = True
+                record.mark_first_token()
+                record.finish()
+                yield cached
+                return
+        
+        if not self.client:
+            error = RuntimeError("OpenAI client is not configured")
+            record.finish(error)
+            raise error
+        
+        flight, leader = llm_flights.join(key)
+        if not leader:
+            print("🔗 Waiting on an identical in-flight request")
+            record.shared = True
+            try:
+                result = flight.wait()
+            except Exception as e:
+                record.finish(e)
+                raise
+            record.mark_first_token()
+            record.finish()
+            yield result
+            return
+        
+        try:
+            permit = llm_limiter.acquire(request_tokens(messages, params["max_tokens"]))
+        except RateLimited as e:
+            record.finish(e)
+            llm_flights.finish(key, flight, error=e)
+            raise
+        
+        parts = []
+        record.mark_sent()
+        started = time.monotonic()
+        try:
+            # Retries only apply until the stream opens; hedging is off for streams
+            client = self.client
+            stream = llm_transport.call(
+                lambda timeout: client.with_options(timeout=timeout).chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                    **params
+                ),
+                deadline=deadline,
+                hedge=False
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    record.mark_first_token()
+                    parts.append(delta)
+                    yield delta
+        except BaseException as e:
+            # Includes GeneratorExit when the consumer stops early
+            error = e if isinstance(e, Exception) else RuntimeError("Stream abandoned")
+            record.set_usage(None, messages, "".join(parts))
+            permit.settle(record.prompt_tokens + record.completion_tokens)
+            permit.release()
+            record.finish(error)
+            llm_flights.finish(key, flight, error=error)
+            raise
+        
+        model_router.record(kind, model, time.monotonic() - started)
+        result = "".join(parts)
+        # The streaming API doesn't report usage on older SDKs, so tokens are estimated
+        record.set_usage(None, messages, result)
+        permit.settle(record.prompt_tokens + record.completion_tokens)
+        permit.release()
+        record.finish()
+        if use_cache and result:
+            self.cache.set(key, result)
+        llm_flights.finish(key, flight, result)
+
+    def _similar_answer(self, user_input: str, history: Optional[List[Dict[str, str]]],
+                        bypass_cache: bool) -> Optional[str]:
+        """Answer to a near-duplicate earlier question for the same data and conversation, if any."""
+        if bypass_cache or semantic_cache_disabled():
+            return None
+        hit = self.semantic_cache.lookup(user_input, cache_scope(QUICK_CHAT, history))
+        if hit is None:
+            return None
+        answer, score = hit
+        print(f"🧭 Serving answer to a similar question (similarity {score:.2f})")
+        record = llm_telemetry.start(QUICK_CHAT, "semantic-cache")
+        record.cache_hit = True
+        record.finish()
+        return answer
+
+    def _degraded_answer(self, user_input: str, history: Optional[List[Dict[str, str]]]) -> str:
+        """Over the LLM budget: a looser semantic cache match if there is one, else the local fallback."""
+        if not semantic_cache_disabled():
+            hit = self.semantic_cache.lookup(user_input, cache_scope(QUICK_CHAT, history), threshold=DEGRADED_THRESHOLD)
+            if hit is not None:
+                print(f"🧭 Rate limited; serving a cached answer (similarity {hit[1]:.2f})")
+                return hit[0]
+        print("⏳ Rate limited; using fallback response")
+        return self.get_fallback_response(user_input)
+
+    def _remember_answer(self, user_input: str, history: Optional[List[Dict[str, str]]], answer: str) -> None:
+        if answer and not semantic_cache_disabled():
+            self.semantic_cache.add(user_input, cache_scope(QUICK_CHAT, history), answer)
+
+    def get_mentor_powered_response(self, user_input: str, bypass_cache: bool = False,
+                                    history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Get intelligent response from GPT using mentor knowledge base."""
+        if not self.client:
+            print("⚠️ Using fallback response (no OpenAI client)")
+            return self.get_fallback_response(user_input)
+        
+        similar = self._similar_answer(user_input, history, bypass_cache)
+        if similar is not None:
+            return similar
+        
         try:
             print("🤖 Sending request to OpenAI with mentor knowledge...")
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_context}
-                ],
-                max_tokens=500,
-                temperature=0.8
+            result = self.complete(
+                self._build_mentor_messages(user_input, history),
+                kind=QUICK_CHAT,
+                bypass_cache=bypass_cache
             )
-            result = response.choices[0].message.content or "I'm here to help with your training and nutrition!"
+            self._remember_answer(user_input, history, result)
             print("✅ Received mentor-powered response from OpenAI")
-            return result
+            return result or "I'm here to help with your training and nutrition!"
+        except RateLimited:
+            return self._degraded_answer(user_input, history)
         except Exception as e:
             print(f"❌ OpenAI API error: {e}")
             return self.get_fallback_response(user_input)
 
-    def _create_mentor_context(self) -> str:
-        """Create comprehensive mentor context for the AI"""
-        context_parts = []
+    def stream_mentor_powered_response(self, user_input: str, bypass_cache: bool = False,
+                                       history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """Stream the mentor-powered response as text deltas."""
+        if not self.client:
+            print("⚠️ Using fallback response (no OpenAI client)")
+            yield self.get_fallback_response(user_input)
+            return
         
-        for mentor_id, mentor in self.mentors.items():
-            context_parts.append(f"""
-{mentor['name']} - {mentor['focus']}:
-Philosophy: {mentor['core_philosophy']}
-Key Principles: {', '.join(mentor['key_principles'][:3])}
-Training Methods: {', '.join(mentor['training_methods'][:3])}
-Motivational Style: {mentor['motivational_style']}
-""")
+        similar = self._similar_answer(user_input, history, bypass_cache)
+        if similar is not None:
+            yield similar
+            return
         
-        return "\n".join(context_parts)
+        started = False
+        chunks = []
+        try:
+            print("🤖 Streaming request to OpenAI with mentor knowledge...")
+            for delta in self.stream(
+                self._build_mentor_messages(user_input, history),
+                kind=QUICK_CHAT,
+                bypass_cache=bypass_cache
+            ):
+                started = True
+                chunks.append(delta)
+                yield delta
+            self._remember_answer(user_input, history, "".join(chunks))
+            print("✅ Received mentor-powered response from OpenAI")
+        except RateLimited:
+            if not started:
+                yield self._degraded_answer(user_input, history)
+        except Exception as e:
+            print(f"❌ OpenAI API error: {e}")
+            if not started:
+                yield self.get_fallback_response(user_input)
+
+    def _build_mentor_messages(self, user_input: str,
+                               history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+        """Assemble the compiled system prompt, conversation memory and per-request user context."""
+        user_context = build_user_context(self.build_context(max_logs=3), user_input)
+        return [
+            {"role": "system", "content": get_system_prompt(rank_mentors(user_input))},
+            *(history or []),
+            {"role": "user", "content": user_context}
+        ]
+
+    def _create_mentor_context(self, user_input: Optional[str] = None) -> str:
+        """Create mentor context for the AI, limited to the most relevant mentors when a question is given"""
+        if user_input is None:
+            return get_mentor_context()
+        return get_mentor_context(rank_mentors(user_input))
 
-    def get_ai_response(self, user_input: str) -> str:
+    def get_ai_response(self, user_input: str, history: Optional[List[Dict[str, str]]] = None) -> str:
         """Get intelligent response from GPT based on profile and logs."""
-        return self.get_mentor_powered_response(user_input)
+        local = self.get_local_response(user_input)
+        if local is not None:
+            return local
+        return self.get_mentor_powered_response(user_input, history=history)
+
+    def stream_ai_response(self, user_input: str, history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """Stream an intelligent response from GPT as text deltas."""
+        local = self.get_local_response(user_input)
+        if local is not None:
+            return iter([local])
+        return self.stream_mentor_powered_response(user_input, history=history)
+
+    def stream_mentor_panel(self, user_input: str, k: int = DEFAULT_PANEL_SIZE,
+                            bypass_cache: bool = False) -> Iterator[Tuple[str, str]]:
+        """Ask the top-k mentors in parallel, then synthesize their answers.
+
+        Yields (source, delta) pairs where source is a mentor id while the panel
+        answers and "synthesis" for the combined answer.
+        """
+        if not self.client:
+            print("⚠️ Using fallback response (no OpenAI client)")
+            yield "synthesis", self.get_fallback_response(user_input)
+            return
+        
+        mentor_ids = rank_mentors(user_input, k)
+        answers = {mentor_id: "" for mentor_id in mentor_ids}
+        try:
+            print(f"🎙️ Asking mentor panel: {', '.join(mentor_ids)}")
+            for mentor_id, delta in stream_panel(user_input, self.build_context(max_logs=3), mentor_ids):
+                answers[mentor_id] += delta
+                yield mentor_id, delta
+        except Exception as e:
+            print(f"❌ Mentor panel error: {e}")
+        
+        named = {
+            mentor_name(mentor_id): answer
+            for mentor_id, answer in answers.items() if answer.strip()
+        }
+        if not named:
+            # Nobody answered in time; fall back to the single-call coach
+            for delta in self.stream_mentor_powered_response(user_input, bypass_cache=bypass_cache):
+                yield "synthesis", delta
+            return
+        
+        try:
+            for delta in self.stream(
+                [
+                    {"role": "system", "content": PANEL_SYNTHESIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": build_panel_synthesis_prompt(user_input, named)}
+                ],
+                kind=PANEL_SYNTHESIS,
+                bypass_cache=bypass_cache
+            ):
+                yield "synthesis", delta
+        except Exception as e:
+            print(f"❌ Panel synthesis error: {e}")
+            yield "synthesis", "\n\n".join(f"**{name}:** {answer.strip()}" for name, answer in named.items())
+
+    def summarize_conversation(self, previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        """Fold older chat turns into the rolling conversation summary."""
+        if not self.client:
+            return ""
+        transcript = "\n".join(
+            f"{'Yoel' if m['role'] == 'user' else 'Coach'}: {m['content']}" for m in messages
+        )
+        return self.complete(
+            [
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": build_summary_prompt(previous_summary, transcript)}
+            ],
+            kind=SUMMARY
+        )
+
+    def new_conversation(self, feature: str = "chat") -> ConversationManager:
+        """Create conversation memory that summarizes older turns with this coach and archives each turn under feature."""
+        return ConversationManager(
+            summarizer=self.summarize_conversation,
+            on_add=lambda role, content: transcript_store.record(feature, role, content)
+        )
 
     def get_fallback_response(self, user_input: str) -> str:
         """Fallback responses when OpenAI is not available"""
-        user_input = user_input.lower()
+        intent = route(user_input)
         
         # Enhanced fallback responses incorporating mentor wisdom
-        if "tired" in user_input or "low energy" in user_input:
+        if intent == TIRED:
             return "I hear you're feeling tired. Let's take a page from Patrick Beach's book - movement should feel good and natural. Maybe some gentle mobility work or light yoga? And remember what Dylan Werner says: 'Control your body, control your mind.' Sometimes the best training is active recovery. 💪"
         
-        if "what should i train" in user_input or "workout" in user_input:
-            return f"Looking at your {self.profile.get('training_preferences', {}).get('split', 'Push/Pull/Legs')} split, what day are you on? I can suggest specific exercises that blend Dylan Werner's isometric control, SquatU's joint safety, and your calisthenics preferences while being mindful of your shoulder. What's your energy level today?"
+        if intent in (TRAINING, WEEKLY_PLAN):
+            # Use the profile only if it is already loaded; fallbacks never touch the database
+            profile = self._profile or get_default_profile()
+            return f"Looking at your {profile.get('training_preferences', {}).get('split', 'Push/Pull/Legs')} split, what day are you on? I can suggest specific exercises that blend Dylan Werner's isometric control, SquatU's joint safety, and your calisthenics preferences while being mindful of your shoulder. What's your energy level today?"
         
-        if "what should i eat" in user_input or "food" in user_input:
+        if intent == NUTRITION:
             return "For your goals and preferences, I'd suggest something with good protein and clean carbs - think Dr. Andy Galpin's science-based approach. How about eggs with tahini and some vegetables? Or if you're post-workout, maybe some chicken with rice and fruit? What's your current energy level?"
         
-        if "injury" in user_input or "pain" in user_input:
+        if intent == INJURY:
             return "I'm keeping an eye on your shoulder issues - that's SquatU and KneesOverToesGuy territory. Remember to do your band work and avoid exercises that cause pain. Your knee is doing well though - we can include more knee work gradually! What specific movements are bothering you?"
         
-        return "I'm here to help with your training, nutrition, and recovery! I draw from the wisdom of the world's best movement and strength minds. Try asking about what to train today, food suggestions, or how you're feeling. I'm learning from your daily logs to give you better advice over time."
+        return HELP_RESPONSE
+
+    def get_local_response(self, user_input: str) -> Optional[str]:
+        """Answer cheap intents (e.g. help) locally; None means the message needs the LLM."""
+        # Only bare help requests; "help me with my handstand" is a real question
+        if route(user_input) == HELP and is_bare(user_input, HELP):
+            return HELP_RESPONSE
+        return None
 
-    def get_weekly_plan(self) -> str:
+    def get_weekly_plan(self, bypass_cache: bool = False) -> str:
         """Generate a weekly training plan using mentor knowledge"""
         if not self.client:
             return "Weekly planning requires OpenAI connection. Please check your API key."
-        
-        # Create a comprehensive weekly planning prompt
-        planning_prompt = f"""Create a weekly training plan for Yoel that synthesizes the best approaches from our mentors:
-
-PROFILE: {json.dumps(self.profile, indent=2)}
-RECENT PATTERNS: {self.analyze_patterns()}
-CURRENT LOGS: {json.dumps(self.logs[-7:], indent=2)}
 
-Create a 7-day plan that:
-1. Blends Dylan Werner's isometric control with Patrick Beach's fluid movement
-2. Incorporates SquatU's joint safety and KneesOverToesGuy's bulletproofing
-3. Uses Everydamnandré's simplicity and mental toughness
-4. Includes Ido Portal's movement complexity and adaptability
-5. Focuses on Yoel's calisthenics and yoga preferences
-6. Considers his shoulder issues and current energy levels
-7. Provides specific exercises, sets, reps, and progression
+        try:
+            return self.complete(
+                self._build_weekly_plan_messages(),
+                kind=WEEKLY_PLAN_KIND,
+                bypass_cache=bypass_cache
+            ) or "Error generating weekly plan"
+        except Exception as e:
+            return f"Error generating weekly plan: {e}"
 
-Format as a clear, actionable weekly plan."""
+    def stream_weekly_plan(self, bypass_cache: bool = False) -> Iterator[str]:
+        """Stream a weekly training plan as text deltas"""
+        if not self.client:
+            yield "Weekly planning requires OpenAI connection. Please check your API key."
+            return
 
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a master coach synthesizing the world's best training methods. Create specific, actionable weekly plans."},
-                    {"role": "user", "content": planning_prompt}
-                ],
-                max_tokens=800,
-                temperature=0.7
+            yield from self.stream(
+                self._build_weekly_plan_messages(),
+                kind=WEEKLY_PLAN_KIND,
+                bypass_cache=bypass_cache
             )
-            return response.choices[0].message.content or "Error generating weekly plan"
         except Exception as e:
-            return f"Error generating weekly plan: {e}" 
\ No newline at end of file
+            yield f"\n\nError generating weekly plan: {e}"
+
+    def _build_weekly_plan_messages(self) -> List[Dict[str, str]]:
+        """Assemble the weekly planning prompt."""
+        planning_prompt = build_weekly_plan_prompt(self.build_context(max_logs=7))
+        return [
+            {"role": "system", "content": WEEKLY_PLAN_SYSTEM_PROMPT},
+            {"role": "user", "content": planning_prompt}
+        ]
+
+
+_shared_coach = None
+
+def get_coach() -> AICoach:
+    """Get the process-wide AICoach; its data reloads lazily when the data generation changes."""
+    global _shared_coach
+    if _shared_coach is None:
+        _shared_coach = AICoach()
+    return _shared_coach
@@ -1,4 +1,5 @@
 from typing import List, Dict, Any
+from coach_core.utils import split_soreness
 
 def analyze_patterns(logs: List[Dict[str, Any]]) -> str:
     """Analyze patterns in user's logs for AI context and UI display."""
@@ -15,8 +16,7 @@ def analyze_patterns(logs: List[Dict[str, Any]]) -> str:
             energy_trend.append(int(log['energy']))
         if log.get('training_done') and log['training_done'].strip():
             training_frequency += 1
-        if log.get('soreness') and log['soreness'] and log['soreness'].lower() != 'none':
-            common_soreness.extend([s.strip() for s in log['soreness'].split(",")])
+        common_soreness.extend(split_soreness(log.get('soreness') or ""))
     
     analysis = f"Recent Analysis:\n"
     if energy_trend:
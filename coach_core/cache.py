@@ -0,0 +1,60 @@
+"""
+Persistent LLM response cache.
+
+Responses are stored in SQLite keyed by a fingerprint of the model, messages,
+request parameters and data generation, so a repeated view of the same plan or
+insight is served from disk instead of calling OpenAI again.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+from coach_core.data import ensure_db_instance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 500
+
+def cache_disabled() -> bool:
+    """Check whether the response cache is globally bypassed via COACH_LLM_CACHE=off."""
+    return os.getenv("COACH_LLM_CACHE", "on").strip().lower() in ("0", "off", "false", "no")
+
+def fingerprint(model: str, messages: List[Dict[str, str]], params: Dict[str, Any], generation: int) -> str:
+    """Hash a completion request into a stable cache key."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params, "generation": generation},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL expiry and LRU eviction."""
+    def __init__(self, db=None, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db = ensure_db_instance(db)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self.db.get_cached_response(key, self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Error reading LLM cache: {e}")
+            return None
+
+    def set(self, key: str, response: str) -> None:
+        if not response:
+            return
+        try:
+            self.db.set_cached_response(key, response, self.max_entries)
+        except Exception as e:
+            logger.error(f"Error writing LLM cache: {e}")
+
+    def clear(self) -> int:
+        try:
+            return self.db.clear_llm_cache()
+        except Exception as e:
+            logger.error(f"Error clearing LLM cache: {e}")
+            return 0
@@ -0,0 +1,137 @@
+"""
+Process-wide OpenAI client factory.
+
+Every AICoach shares one OpenAI client backed by a tuned httpx connection pool,
+so warm calls reuse keep-alive connections instead of paying a fresh TLS
+handshake per interaction.
+"""
+import os
+import threading
+from typing import Optional
+import httpx
+import openai
+
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 120.0
+
+_client: Optional[openai.OpenAI] = None
+_async_client: Optional[openai.AsyncOpenAI] = None
+_lock = threading.Lock()
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def base_url() -> Optional[str]:
+    """OpenAI-compatible server to call instead of OpenAI, e.g. the local stub_server.py for offline benchmarks."""
+    return os.getenv("COACH_OPENAI_BASE_URL") or os.getenv("OPENAI_BASE_URL") or None
+
+def build_timeout() -> httpx.Timeout:
+    # Read when the client is built, so settings from a .env loaded after import still apply
+    return httpx.Timeout(float(os.getenv("OPENAI_READ_TIMEOUT", "60")),
+                         connect=float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5")))
+
+def build_http_client() -> httpx.Client:
+    """Create the pooled keep-alive HTTP client used by the OpenAI SDK."""
+    return httpx.Client(
+        http2=http2_available(),
+        timeout=build_timeout(),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """Async counterpart of build_http_client for concurrent (panel) requests."""
+    return httpx.AsyncClient(
+        http2=http2_available(),
+        timeout=build_timeout(),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+def get_openai_client() -> Optional[openai.OpenAI]:
+    """Get the shared OpenAI client, creating it on first use. Returns None without an API key."""
+    global _client
+    if _client is not None:
+        return _client
+
+    with _lock:
+        if _client is not None:
+            return _client
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            print("⚠️ No OPENAI_API_KEY found in environment variables")
+            return None
+
+        url = base_url()
+        try:
+            _client = openai.OpenAI(
+                api_key=api_key,
+                base_url=url,
+                timeout=build_timeout(),
+                # Retries, backoff and deadlines are handled by coach_core.transport
+                max_retries=0,
+                http_client=build_http_client(),
+            )
+            if url:
+                print(f"✅ OpenAI client initialized against {url}")
+            else:
+                print("✅ OpenAI client initialized successfully")
+        except Exception as e:
+            print(f"❌ Error initializing OpenAI client: {e}")
+            _client = None
+        return _client
+
+def get_async_openai_client() -> Optional[openai.AsyncOpenAI]:
+    """Get the shared async OpenAI client. Its connections bind to the event loop that first
+    uses it, so only use it from coach_core.panel's loop. Returns None without an API key."""
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+
+    with _lock:
+        if _async_client is not None:
+            return _async_client
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            print("⚠️ No OPENAI_API_KEY found in environment variables")
+            return None
+
+        try:
+            _async_client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url(),
+                timeout=build_timeout(),
+                max_retries=0,
+                http_client=build_async_http_client(),
+            )
+        except Exception as e:
+            print(f"❌ Error initializing async OpenAI client: {e}")
+            _async_client = None
+        return _async_client
+
+def reset_openai_client() -> None:
+    """Close and drop the shared client (e.g. after the API key changes)."""
+    global _client, _async_client
+    with _lock:
+        if _client is not None:
+            try:
+                _client.close()
+            except Exception:
+                pass
+        _client = None
+        # The async client is closed with its event loop; just drop the reference
+        _async_client = None
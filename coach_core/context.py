@@ -0,0 +1,127 @@
+"""
+Token-budgeted context builder for LLM prompts.
+
+Fills a token budget by priority: compact profile, pattern summary, then the
+most recent logs in a dense pipe-separated table that skips empty fields and
+bookkeeping columns (id, created_at, updated_at, timestamp).
+"""
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("COACH_CONTEXT_TOKEN_BUDGET", "700"))
+
+# Log columns in priority order; anything not listed is left out of prompts
+LOG_FIELDS = [
+    "date", "energy", "mood", "sleep_hours", "sleep_quality", "stress_level",
+    "soreness", "training_done", "training_quality", "recovery_score",
+    "hydration", "nutrition", "notes",
+]
+
+MAX_TEXT_CHARS = 80
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """Estimate BPE tokens locally: one per word or symbol, plus one per 6 chars of long words."""
+    if not text:
+        return 0
+    return sum(1 + len(piece) // 6 for piece in TOKEN_RE.findall(text))
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, dict):
+        return "; ".join(f"{k}: {_format_value(v)}" for k, v in value.items() if not _is_empty(v))
+    if isinstance(value, list):
+        return ", ".join(_format_value(v) for v in value if not _is_empty(v))
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def compact_profile(profile: Dict[str, Any]) -> str:
+    """Render the profile as one 'key: value' line per non-empty field."""
+    lines = []
+    for key, value in (profile or {}).items():
+        if _is_empty(value):
+            continue
+        lines.append(f"{key}: {_format_value(value)}")
+    return "\n".join(lines)
+
+def _cell(value: Any) -> str:
+    text = _format_value(value).replace("|", "/").replace("\n", " ").strip()
+    if len(text) > MAX_TEXT_CHARS:
+        text = text[:MAX_TEXT_CHARS - 1] + "…"
+    return text or "-"
+
+def newest_first(logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return sorted(logs or [], key=lambda log: log.get("date") or "", reverse=True)
+
+def log_columns(logs: List[Dict[str, Any]]) -> List[str]:
+    """Columns from LOG_FIELDS that have a value in at least one log."""
+    return [field for field in LOG_FIELDS if any(not _is_empty(log.get(field)) for log in logs)]
+
+def encode_logs_table(logs: List[Dict[str, Any]], columns: Optional[List[str]] = None) -> str:
+    """Encode logs as a header row plus one pipe-separated row per log."""
+    if not logs:
+        return ""
+    columns = columns or log_columns(logs)
+    rows = ["|".join(columns)]
+    rows.extend("|".join(_cell(log.get(column)) for column in columns) for log in logs)
+    return "\n".join(rows)
+
+class ContextBuilder:
+    """Assemble prompt context sections until the token budget is spent."""
+    def __init__(self, budget_tokens: int = DEFAULT_TOKEN_BUDGET):
+        self.budget_tokens = budget_tokens
+
+    def build(self, profile: Optional[Dict[str, Any]] = None, logs: Optional[List[Dict[str, Any]]] = None,
+              patterns: Optional[str] = None, max_logs: int = 7, extra: Optional[Dict[str, str]] = None) -> str:
+        """Build context from profile, patterns, extra sections, then as many recent logs as fit."""
+        sections = []
+        remaining = self.budget_tokens
+
+        def add(title: str, body: str) -> bool:
+            nonlocal remaining
+            if not body:
+                return True
+            section = f"{title}:\n{body}"
+            cost = estimate_tokens(section)
+            if cost > remaining:
+                return False
+            sections.append(section)
+            remaining -= cost
+            return True
+
+        if profile:
+            add("PROFILE", compact_profile(profile))
+        if patterns:
+            add("PATTERNS", patterns.strip())
+        for title, body in (extra or {}).items():
+            add(title, body)
+
+        recent = newest_first(logs)[:max_logs]
+        if recent:
+            columns = log_columns(recent)
+            title = "RECENT LOGS (newest first)"
+            header_cost = estimate_tokens(f"{title}:\n" + "|".join(columns))
+            rows = []
+            budget = remaining - header_cost
+            for log in recent:
+                row = encode_logs_table([log], columns).split("\n", 1)[1]
+                cost = estimate_tokens(row) + 1
+                if cost > budget:
+                    break
+                rows.append(log)
+                budget -= cost
+            add(title, encode_logs_table(rows, columns))
+
+        return "\n\n".join(sections)
+
+def build_context(profile: Optional[Dict[str, Any]] = None, logs: Optional[List[Dict[str, Any]]] = None,
+                  patterns: Optional[str] = None, max_logs: int = 7, budget_tokens: Optional[int] = None,
+                  extra: Optional[Dict[str, str]] = None) -> str:
+    """Convenience wrapper around ContextBuilder.build."""
+    builder = ContextBuilder(budget_tokens if budget_tokens is not None else DEFAULT_TOKEN_BUDGET)
+    return builder.build(profile, logs, patterns, max_logs, extra)
@@ -0,0 +1,118 @@
+"""
+Conversation memory for chat sessions.
+
+Keeps the last N turns verbatim and folds older turns into a rolling summary
+that is refreshed on a background thread, so long chats keep their context
+while the prompt stays bounded.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP_TURNS = 4
+DEFAULT_FOLD_TURNS = 2
+MAX_SUMMARY_CHARS = 1500
+
+Summarizer = Callable[[str, List[Dict[str, str]]], str]
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="conversation-summary")
+
+def normalize_role(role: str) -> str:
+    """Map page-specific roles (e.g. 'coach') onto chat-completion roles."""
+    return "user" if role == "user" else "assistant"
+
+def local_summary(previous: str, messages: List[Dict[str, str]]) -> str:
+    """Cheap extractive summary used when no LLM summarizer is available."""
+    lines = [previous] if previous else []
+    for message in messages:
+        speaker = "Yoel" if message["role"] == "user" else "Coach"
+        text = " ".join(message["content"].split())
+        lines.append(f"{speaker}: {text[:120]}{'…' if len(text) > 120 else ''}")
+    return "\n".join(lines)[-MAX_SUMMARY_CHARS:]
+
+class ConversationManager:
+    """Chat history with a verbatim window of recent turns and a rolling summary of older ones."""
+    def __init__(self, keep_last_turns: int = DEFAULT_KEEP_TURNS, fold_turns: int = DEFAULT_FOLD_TURNS,
+                 summarizer: Optional[Summarizer] = None, on_add: Optional[Callable[[str, str], None]] = None):
+        self.keep_last_turns = keep_last_turns
+        self.fold_turns = fold_turns
+        self.summarizer = summarizer
+        self.on_add = on_add  # e.g. archives each turn
+        self.messages: List[Dict[str, str]] = []
+        self.summary = ""
+        self._folded = 0  # messages[:_folded] are represented by the summary
+        self._pending: Optional[Future] = None
+        self._epoch = 0  # bumped by clear() so stale background folds are discarded
+        self._lock = threading.Lock()
+
+    def add(self, role: str, content: str) -> None:
+        role = normalize_role(role)
+        with self._lock:
+            self.messages.append({"role": role, "content": content})
+        if self.on_add:
+            try:
+                self.on_add(role, content)
+            except Exception as e:
+                logger.error(f"Conversation add hook failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self.messages = []
+            self.summary = ""
+            self._folded = 0
+            self._epoch += 1
+
+    def context_messages(self) -> List[Dict[str, str]]:
+        """Messages to send ahead of the next question: summary, then recent turns verbatim."""
+        with self._lock:
+            # Turns awaiting summarization stay verbatim, up to a hard cap
+            max_verbatim = 2 * (self.keep_last_turns + self.fold_turns)
+            recent = self.messages[max(self._folded, len(self.messages) - max_verbatim):]
+            context = []
+            if self.summary:
+                context.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+            context.extend(dict(message) for message in recent)
+            return context
+
+    def maybe_refresh_summary(self, background: bool = True) -> Optional[Future]:
+        """Fold turns older than the verbatim window into the summary once enough have accumulated."""
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+            unsummarized = len(self.messages) - self._folded
+            if unsummarized <= 2 * (self.keep_last_turns + self.fold_turns):
+                return None
+            start, end = self._folded, len(self.messages) - 2 * self.keep_last_turns
+            older = [dict(message) for message in self.messages[start:end]]
+            previous = self.summary
+            epoch = self._epoch
+
+        if background:
+            self._pending = _executor.submit(self._fold, previous, older, end, epoch)
+            return self._pending
+        self._fold(previous, older, end, epoch)
+        return None
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until a pending background summary finishes (used by the CLI and tests)."""
+        pending = self._pending
+        if pending is not None:
+            pending.result(timeout=timeout)
+
+    def _fold(self, previous: str, older: List[Dict[str, str]], end: int, epoch: int) -> None:
+        summary = None
+        if self.summarizer:
+            try:
+                summary = self.summarizer(previous, older)
+            except Exception as e:
+                logger.warning(f"Conversation summarizer failed, using local summary: {e}")
+        if not summary:
+            summary = local_summary(previous, older)
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self.summary = summary[-MAX_SUMMARY_CHARS:]
+            self._folded = max(self._folded, end)
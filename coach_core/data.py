@@ -192,6 +192,33 @@ def get_stats(db=None) -> Dict[str, Any]:
         logger.error(f"Error getting stats: {e}")
         return {}
 
+@lru_cache(maxsize=64)
+def get_soreness_counts(start_date: Optional[str] = None, end_date: Optional[str] = None, db=None) -> Dict[str, int]:
+    db = ensure_db_instance(db)
+    try:
+        return db.get_soreness_counts(start_date, end_date)
+    except Exception as e:
+        logger.error(f"Error getting soreness counts: {e}")
+        return {}
+
+@lru_cache(maxsize=64)
+def get_soreness_by_week(region: Optional[str] = None, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None, db=None) -> List[Dict[str, Any]]:
+    db = ensure_db_instance(db)
+    try:
+        return db.get_soreness_by_week(region, start_date, end_date)
+    except Exception as e:
+        logger.error(f"Error getting weekly soreness: {e}")
+        return []
+
+def get_data_generation(db=None) -> int:
+    db = ensure_db_instance(db)
+    try:
+        return db.get_data_generation()
+    except Exception as e:
+        logger.error(f"Error getting data generation: {e}")
+        return 0
+
 # Backup/Export/Import functions
 def export_to_json(profile_path: str = PROFILE_PATH, logs_path: str = LOGS_PATH, db=None) -> bool:
     db = ensure_db_instance(db)
@@ -276,4 +303,6 @@ def migrate_from_json(db=None):
 
 def clear_cache():
     get_recent_logs.cache_clear()
-    get_stats.cache_clear() 
\ No newline at end of file
+    get_stats.cache_clear()
+    get_soreness_counts.cache_clear()
+    get_soreness_by_week.cache_clear() 
\ No newline at end of file
@@ -1,11 +1,25 @@
 import sqlite3
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime
 import os
+import time
+from .utils import split_soreness
 
 DATABASE_PATH = "coach_data.db"
 
+# Callbacks run with the database path after log writes commit (see add_write_listener)
+_write_listeners: List[Callable[[str], None]] = []
+
+def add_write_listener(listener: Callable[[str], None]) -> None:
+    """Register a callback run with the database path after every committed log write."""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+def remove_write_listener(listener: Callable[[str], None]) -> None:
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
 class CoachDatabase:
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
@@ -60,7 +74,229 @@ class CoachDatabase:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_daily_logs_recovery_score ON daily_logs(recovery_score)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_daily_logs_split ON daily_logs(split)')
             
+            # Create normalized soreness table (one row per log date and body region)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS log_soreness (
+                    date TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    PRIMARY KEY (date, region)
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_log_soreness_region_date ON log_soreness(region, date)')
+            
+            # Create meta table (data generation counter and other bookkeeping)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            ''')
+            cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_generation', '0')")
+            
+            # Create LLM response cache table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed_at ON llm_cache(accessed_at)')
+            
+            # Create semantic cache table (question vectors and answers per scope and data generation)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS semantic_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scope TEXT NOT NULL,
+                    generation INTEGER NOT NULL,
+                    question TEXT NOT NULL,
+                    vector TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_semantic_cache_scope_generation ON semantic_cache(scope, generation)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_semantic_cache_accessed_at ON semantic_cache(accessed_at)')
+            
+            # Create LLM call telemetry table (one row per completion request)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    feature TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    completion_tokens INTEGER NOT NULL DEFAULT 0,
+                    queue_ms REAL,
+                    ttft_ms REAL,
+                    latency_ms REAL NOT NULL,
+                    cache_hit INTEGER NOT NULL DEFAULT 0,
+                    shared INTEGER NOT NULL DEFAULT 0,
+                    streamed INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_calls_created_at ON llm_calls(created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_calls_feature_created_at ON llm_calls(feature, created_at)')
+            
+            # Create precomputed plans table (weekly plans and reflections per week and data generation)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS plans (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    week TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    generation INTEGER NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    structured INTEGER NOT NULL DEFAULT 0,
+                    focus TEXT,
+                    notes TEXT,
+                    revision INTEGER NOT NULL DEFAULT 0,
+                    UNIQUE (week, kind, generation, revision)
+                )
+            ''')
+            
+            # Create normalized structured plan tables (plan -> days -> exercises)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS plan_days (
+                    plan_id INTEGER NOT NULL,
+                    day_index INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    focus TEXT,
+                    type TEXT NOT NULL,
+                    PRIMARY KEY (plan_id, day_index)
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS plan_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    plan_id INTEGER NOT NULL,
+                    day_index INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    sets INTEGER NOT NULL,
+                    reps TEXT NOT NULL,
+                    tempo TEXT,
+                    rest_seconds INTEGER,
+                    notes TEXT,
+                    shoulder_load INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_plan_items_plan_day ON plan_items(plan_id, day_index, position)')
+            
+            # Create per-day AI insights table (written live by the CLI and by batch backfills)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_insights (
+                    date TEXT PRIMARY KEY,
+                    insight TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    model TEXT,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            
+            # Create table of submitted offline insight batches awaiting collection
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS insight_batches (
+                    batch_id TEXT PRIMARY KEY,
+                    dates TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            
+            # Create precomputed pattern insights table (one row per data generation)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS pattern_insights (
+                    generation INTEGER PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    insight TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            
+            # Create compressed transcript archive: an index of blocks plus the compressed block data
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS transcript_index (
+                    block_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    feature TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    records INTEGER NOT NULL,
+                    raw_bytes INTEGER NOT NULL,
+                    stored_bytes INTEGER NOT NULL,
+                    first_at TEXT NOT NULL,
+                    last_at TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_transcript_index_day ON transcript_index(day, feature)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_transcript_index_session ON transcript_index(session_id, day, feature)')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS transcript_blocks (
+                    block_id INTEGER PRIMARY KEY,
+                    data BLOB NOT NULL
+                )
+            ''')
+            
+            # Backfill soreness rows for logs written before the table existed
+            cursor.execute('SELECT COUNT(*) FROM log_soreness')
+            if cursor.fetchone()[0] == 0:
+                self._backfill_soreness(cursor)
+            
+            conn.commit()
+    
+    def _sync_soreness(self, cursor: sqlite3.Cursor, date: str, soreness: Optional[str]) -> None:
+        """Replace the normalized soreness rows for a log date."""
+        cursor.execute('DELETE FROM log_soreness WHERE date = ?', (date,))
+        cursor.executemany(
+            'INSERT OR IGNORE INTO log_soreness (date, region) VALUES (?, ?)',
+            [(date, region) for region in split_soreness(soreness or "")]
+        )
+    
+    def _backfill_soreness(self, cursor: sqlite3.Cursor) -> int:
+        """Populate log_soreness from the comma-joined daily_logs.soreness column."""
+        cursor.execute('''
+            SELECT date, soreness FROM daily_logs
+            WHERE soreness IS NOT NULL AND lower(trim(soreness)) != 'none'
+        ''')
+        rows = [(date, region) for date, soreness in cursor.fetchall() for region in split_soreness(soreness)]
+        cursor.executemany('INSERT OR IGNORE INTO log_soreness (date, region) VALUES (?, ?)', rows)
+        return len(rows)
+    
+    def backfill_soreness(self) -> int:
+        """Rebuild the normalized soreness table from daily logs."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM log_soreness')
+            count = self._backfill_soreness(cursor)
             conn.commit()
+            return count
+    
+    def _bump_generation(self, cursor: sqlite3.Cursor) -> None:
+        """Advance the data generation so caches keyed on it are invalidated."""
+        cursor.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'data_generation'")
+    
+    def _notify_write(self) -> None:
+        """Run write listeners once a log write has committed; listener errors never fail the write."""
+        for listener in list(_write_listeners):
+            try:
+                listener(self.db_path)
+            except Exception as e:
+                print(f"❌ Write listener failed: {e}")
+    
+    def get_data_generation(self) -> int:
+        """Get the current data generation (incremented on every profile/log write)."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM meta WHERE key = 'data_generation'")
+            row = cursor.fetchone()
+            return int(row[0]) if row else 0
     
     def load_profile(self) -> Dict[str, Any]:
         """Load user profile from database."""
@@ -96,6 +332,7 @@ class CoachDatabase:
                     'INSERT OR REPLACE INTO profile (key, value, updated_at) VALUES (?, ?, ?)',
                     (key, str(value), datetime.now().isoformat())
                 )
+            self._bump_generation(cursor)
             
             conn.commit()
     
@@ -157,8 +394,11 @@ class CoachDatabase:
                     log.get('split'),
                     datetime.now().isoformat()
                 ))
+                self._sync_soreness(cursor, log.get('date'), log.get('soreness'))
+            self._bump_generation(cursor)
             
             conn.commit()
+        self._notify_write()
     
     def add_log(self, log: Dict[str, Any]) -> None:
         """Add a single log entry."""
@@ -191,8 +431,11 @@ class CoachDatabase:
                 log.get('split'),
                 datetime.now().isoformat()
             ))
+            self._sync_soreness(cursor, log.get('date'), log.get('soreness'))
+            self._bump_generation(cursor)
             
             conn.commit()
+        self._notify_write()
     
     def get_log_by_date(self, date: str) -> Optional[Dict[str, Any]]:
         """Get log entry for specific date."""
@@ -212,8 +455,14 @@ class CoachDatabase:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM daily_logs WHERE date = ?', (date,))
+            deleted = cursor.rowcount > 0
+            cursor.execute('DELETE FROM log_soreness WHERE date = ?', (date,))
+            if deleted:
+                self._bump_generation(cursor)
             conn.commit()
-            return cursor.rowcount > 0
+        if deleted:
+            self._notify_write()
+        return deleted
     
     def get_recent_logs(self, days: int = 7) -> List[Dict[str, Any]]:
         """Get logs from the last N days."""
@@ -256,6 +505,489 @@ class CoachDatabase:
                 'recent_logs_7_days': recent_logs
             }
     
+    def _soreness_filters(self, region: Optional[str], start_date: Optional[str],
+                          end_date: Optional[str]) -> Tuple[str, List[str]]:
+        """Build an index-friendly WHERE clause for log_soreness queries."""
+        clauses, params = [], []
+        if region:
+            clauses.append('region = ?')
+            params.append(region)
+        if start_date:
+            clauses.append('date >= ?')
+            params.append(start_date)
+        if end_date:
+            clauses.append('date <= ?')
+            params.append(end_date)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, params
+    
+    def get_soreness_counts(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, int]:
+        """Count sore days per body region within an optional date window."""
+        where, params = self._soreness_filters(None, start_date, end_date)
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT region, COUNT(*) AS days FROM log_soreness
+                {where}
+                GROUP BY region
+                ORDER BY days DESC, region
+            ''', params)
+            
+            return {region: days for region, days in cursor.fetchall()}
+    
+    def get_soreness_by_week(self, region: Optional[str] = None, start_date: Optional[str] = None,
+                             end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Count sore days per week (YYYY-WW) and region, for heatmaps."""
+        where, params = self._soreness_filters(region, start_date, end_date)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT strftime('%Y-%W', date) AS week, region, COUNT(*) AS days
+                FROM log_soreness
+                {where}
+                GROUP BY week, region
+                ORDER BY week, region
+            ''', params)
+            
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_cached_response(self, key: str, max_age_seconds: float) -> Optional[str]:
+        """Get a cached LLM response, or None if missing or older than max_age_seconds."""
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT response, created_at FROM llm_cache WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            
+            response, created_at = row
+            if now - created_at > max_age_seconds:
+                cursor.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                conn.commit()
+                return None
+            
+            cursor.execute('UPDATE llm_cache SET accessed_at = ?, hits = hits + 1 WHERE key = ?', (now, key))
+            conn.commit()
+            return response
+    
+    def set_cached_response(self, key: str, response: str, max_entries: int) -> None:
+        """Store an LLM response and evict least recently used entries beyond max_entries."""
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO llm_cache (key, response, created_at, accessed_at, hits)
+                VALUES (?, ?, ?, ?, 0)
+            ''', (key, response, now, now))
+            cursor.execute('''
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+            conn.commit()
+    
+    def clear_llm_cache(self) -> int:
+        """Remove all cached LLM responses, exact and semantic."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM llm_cache')
+            removed = cursor.rowcount
+            cursor.execute('DELETE FROM semantic_cache')
+            conn.commit()
+            return removed + cursor.rowcount
+    
+    def get_semantic_entries(self, scope: str, generation: int, max_age_seconds: float) -> List[Dict[str, Any]]:
+        """Get unexpired semantic cache entries (id, question, vector, response) for a scope and data generation."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, question, vector, response FROM semantic_cache
+                WHERE scope = ? AND generation = ? AND created_at >= ?
+            ''', (scope, generation, time.time() - max_age_seconds))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def add_semantic_entry(self, scope: str, generation: int, question: str, vector: str,
+                           response: str, max_entries: int) -> None:
+        """Store a question vector and its answer, dropping stale generations and evicting LRU entries beyond max_entries."""
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM semantic_cache WHERE generation < ?', (generation,))
+            cursor.execute('''
+                INSERT INTO semantic_cache (scope, generation, question, vector, response, created_at, accessed_at, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+            ''', (scope, generation, question, vector, response, now, now))
+            cursor.execute('''
+                DELETE FROM semantic_cache WHERE id IN (
+                    SELECT id FROM semantic_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+            conn.commit()
+    
+    def touch_semantic_entry(self, entry_id: int) -> None:
+        """Record a semantic cache hit."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE semantic_cache SET accessed_at = ?, hits = hits + 1 WHERE id = ?', (time.time(), entry_id))
+            conn.commit()
+    
+    def record_llm_calls(self, calls: List[Dict[str, Any]], max_rows: Optional[int] = None) -> None:
+        """Insert LLM call telemetry rows, keeping at most max_rows of history."""
+        if not calls:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO llm_calls (
+                    created_at, feature, model, prompt_tokens, completion_tokens,
+                    queue_ms, ttft_ms, latency_ms, cache_hit, shared, streamed, error
+                ) VALUES (
+                    :created_at, :feature, :model, :prompt_tokens, :completion_tokens,
+                    :queue_ms, :ttft_ms, :latency_ms, :cache_hit, :shared, :streamed, :error
+                )
+            ''', calls)
+            if max_rows is not None:
+                cursor.execute('''
+                    DELETE FROM llm_calls WHERE id <= (
+                        SELECT id FROM llm_calls ORDER BY id DESC LIMIT 1 OFFSET ?
+                    )
+                ''', (max_rows,))
+            conn.commit()
+    
+    def get_llm_calls(self, since: Optional[float] = None, feature: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get LLM call telemetry rows, oldest first, optionally since a unix timestamp and for one feature."""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append('created_at >= ?')
+            params.append(since)
+        if feature:
+            clauses.append('feature = ?')
+            params.append(feature)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT * FROM llm_calls {where} ORDER BY created_at', params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_llm_tokens_by_day(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Prompt and completion tokens per local day and feature."""
+        where = "WHERE created_at >= ?" if since is not None else ""
+        params = (since,) if since is not None else ()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT date(created_at, 'unixepoch', 'localtime') AS day, feature,
+                       SUM(prompt_tokens) AS prompt_tokens,
+                       SUM(completion_tokens) AS completion_tokens,
+                       COUNT(*) AS calls
+                FROM llm_calls {where}
+                GROUP BY day, feature
+                ORDER BY day, feature
+            ''', params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def _write_plan_items(self, cursor: sqlite3.Cursor, plan_id: int, plan: Dict[str, Any]) -> None:
+        """Replace the normalized day and exercise rows of a structured plan."""
+        cursor.execute('DELETE FROM plan_days WHERE plan_id = ?', (plan_id,))
+        cursor.execute('DELETE FROM plan_items WHERE plan_id = ?', (plan_id,))
+        cursor.executemany(
+            'INSERT INTO plan_days (plan_id, day_index, day, focus, type) VALUES (?, ?, ?, ?, ?)',
+            [(plan_id, i, day['day'], day.get('focus'), day['type']) for i, day in enumerate(plan['days'])]
+        )
+        cursor.executemany('''
+            INSERT INTO plan_items (plan_id, day_index, position, name, sets, reps, tempo, rest_seconds, notes, shoulder_load)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (plan_id, i, position, ex['name'], ex['sets'], ex['reps'], ex.get('tempo'),
+             ex.get('rest_seconds'), ex.get('notes'), int(bool(ex.get('shoulder_load'))))
+            for i, day in enumerate(plan['days'])
+            for position, ex in enumerate(day['exercises'])
+        ])
+    
+    def save_plan(self, week: str, kind: str, generation: int, content: str,
+                  plan: Optional[Dict[str, Any]] = None, keep_previous: bool = False) -> int:
+        """Store a generated plan or reflection for a week and data generation; returns its id.
+        
+        A structured plan's days and exercises are stored in plan_days/plan_items. By default
+        the plan replaces the one stored for the same generation; keep_previous stores it as a
+        new revision instead, so the earlier version stays available (e.g. feedback patches).
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            if keep_previous:
+                cursor.execute(
+                    'SELECT COALESCE(MAX(revision) + 1, 0) FROM plans WHERE week = ? AND kind = ? AND generation = ?',
+                    (week, kind, generation)
+                )
+                revision = cursor.fetchone()[0]
+            else:
+                # Drop the rows of the plans being replaced so no items are orphaned
+                cursor.execute('SELECT id FROM plans WHERE week = ? AND kind = ? AND generation = ?', (week, kind, generation))
+                for (old_id,) in cursor.fetchall():
+                    cursor.execute('DELETE FROM plan_days WHERE plan_id = ?', (old_id,))
+                    cursor.execute('DELETE FROM plan_items WHERE plan_id = ?', (old_id,))
+                cursor.execute('DELETE FROM plans WHERE week = ? AND kind = ? AND generation = ?', (week, kind, generation))
+                revision = 0
+            cursor.execute('''
+                INSERT INTO plans (week, kind, generation, content, created_at, structured, focus, notes, revision)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (week, kind, generation, content, time.time(), int(plan is not None),
+                  plan.get('focus') if plan else None, plan.get('notes') if plan else None, revision))
+            plan_id = cursor.lastrowid
+            if plan is not None:
+                self._write_plan_items(cursor, plan_id, plan)
+            conn.commit()
+            return plan_id
+    
+    def update_structured_plan(self, plan_id: int, plan: Dict[str, Any], content: str) -> bool:
+        """Replace a stored plan's structure and rendered content in place (manual edits)."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'UPDATE plans SET content = ?, structured = 1, focus = ?, notes = ? WHERE id = ?',
+                (content, plan.get('focus'), plan.get('notes'), plan_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+            self._write_plan_items(cursor, plan_id, plan)
+            conn.commit()
+            return True
+    
+    def get_plan(self, week: str, kind: str, generation: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Get the latest stored plan for a week, optionally for one data generation only."""
+        query = 'SELECT * FROM plans WHERE week = ? AND kind = ?'
+        params: List[Any] = [week, kind]
+        if generation is not None:
+            query += ' AND generation = ?'
+            params.append(generation)
+        query += ' ORDER BY id DESC LIMIT 1'
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_plan_versions(self, week: str, kind: str) -> List[Dict[str, Any]]:
+        """List stored plans for a week, newest first, without their content."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, week, kind, generation, created_at, structured FROM plans
+                WHERE week = ? AND kind = ?
+                ORDER BY id DESC
+            ''', (week, kind))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_structured_plan(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        """Rebuild a structured plan (focus, notes, days with exercises) from the normalized tables."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('SELECT focus, notes FROM plans WHERE id = ? AND structured = 1', (plan_id,))
+            plan_row = cursor.fetchone()
+            if plan_row is None:
+                return None
+            cursor.execute('SELECT day, focus, type FROM plan_days WHERE plan_id = ? ORDER BY day_index', (plan_id,))
+            days = [
+                {"day": row["day"], "focus": row["focus"] or "", "type": row["type"], "exercises": []}
+                for row in cursor.fetchall()
+            ]
+            cursor.execute('''
+                SELECT day_index, name, sets, reps, tempo, rest_seconds, notes, shoulder_load FROM plan_items
+                WHERE plan_id = ?
+                ORDER BY day_index, position
+            ''', (plan_id,))
+            for row in cursor.fetchall():
+                days[row["day_index"]]["exercises"].append({
+                    "name": row["name"],
+                    "sets": row["sets"],
+                    "reps": row["reps"],
+                    "tempo": row["tempo"] or "",
+                    "rest_seconds": row["rest_seconds"],
+                    "notes": row["notes"] or "",
+                    "shoulder_load": bool(row["shoulder_load"])
+                })
+            return {"focus": plan_row["focus"] or "", "notes": plan_row["notes"] or "", "days": days}
+    
+    def save_daily_insights(self, insights: List[Dict[str, Any]]) -> None:
+        """Store per-day insights (date, insight, source, model), replacing existing ones."""
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO daily_insights (date, insight, source, model, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(i['date'], i['insight'], i['source'], i.get('model'), now) for i in insights])
+            conn.commit()
+    
+    def get_daily_insights(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get stored insights ordered by date, optionally within a date range."""
+        query = 'SELECT date, insight, source, model, created_at FROM daily_insights WHERE 1 = 1'
+        params: List[Any] = []
+        if start_date:
+            query += ' AND date >= ?'
+            params.append(start_date)
+        if end_date:
+            query += ' AND date <= ?'
+            params.append(end_date)
+        query += ' ORDER BY date'
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def save_insight_batch(self, batch_id: str, dates: List[str]) -> None:
+        """Record a submitted offline batch and the dates it covers."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO insight_batches (batch_id, dates, status, created_at) VALUES (?, ?, 'pending', ?)",
+                (batch_id, json.dumps(dates), time.time())
+            )
+            conn.commit()
+    
+    def get_pending_insight_batches(self) -> List[Dict[str, Any]]:
+        """Get submitted batches not yet collected, oldest first."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM insight_batches WHERE status = 'pending' ORDER BY created_at")
+            return [{**dict(row), 'dates': json.loads(row['dates'])} for row in cursor.fetchall()]
+    
+    def set_insight_batch_status(self, batch_id: str, status: str) -> None:
+        """Mark a batch as collected, failed or expired."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE insight_batches SET status = ? WHERE batch_id = ?', (status, batch_id))
+            conn.commit()
+    
+    def save_pattern_insight(self, generation: int, summary: str, insight: Optional[str], attempts: int = 0,
+                             keep: int = 5) -> None:
+        """Store the pattern summary and AI insight for a data generation, keeping the latest `keep` generations.
+
+        attempts counts failed insight generations since the last success, for retry backoff.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO pattern_insights (generation, summary, insight, attempts, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (generation, summary, insight, attempts, time.time()))
+            cursor.execute('''
+                DELETE FROM pattern_insights WHERE generation NOT IN (
+                    SELECT generation FROM pattern_insights ORDER BY generation DESC LIMIT ?
+                )
+            ''', (keep,))
+            conn.commit()
+    
+    def get_pattern_insight(self, generation: Optional[int] = None,
+                            with_insight: bool = False) -> Optional[Dict[str, Any]]:
+        """Get the stored pattern insight for a generation, or the latest one (that has an insight, with with_insight)."""
+        query = 'SELECT * FROM pattern_insights WHERE 1 = 1'
+        params: List[Any] = []
+        if generation is not None:
+            query += ' AND generation = ?'
+            params.append(generation)
+        if with_insight:
+            query += ' AND insight IS NOT NULL'
+        query += ' ORDER BY generation DESC LIMIT 1'
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_last_transcript_block(self, session_id: str, day: str, feature: str) -> Optional[Dict[str, Any]]:
+        """Get the newest block's index row for a session, day and feature."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM transcript_index WHERE session_id = ? AND day = ? AND feature = ?
+                ORDER BY block_id DESC LIMIT 1
+            ''', (session_id, day, feature))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def write_transcript_block(self, block: Dict[str, Any], frame: bytes, block_id: Optional[int] = None) -> int:
+        """Insert a block holding one compressed frame, or append the frame to block_id's data.
+
+        block carries the index row's totals after the write. Returns the block id.
+        """
+        columns = ('session_id', 'day', 'feature', 'codec', 'records', 'raw_bytes', 'first_at', 'last_at')
+        values = [block[column] for column in columns]
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            if block_id is None:
+                cursor.execute(f'''
+                    INSERT INTO transcript_index ({', '.join(columns)}, stored_bytes)
+                    VALUES ({', '.join('?' * (len(columns) + 1))})
+                ''', values + [len(frame)])
+                block_id = cursor.lastrowid
+                cursor.execute('INSERT INTO transcript_blocks (block_id, data) VALUES (?, ?)',
+                               (block_id, sqlite3.Binary(frame)))
+            else:
+                cursor.execute(f'''
+                    UPDATE transcript_index SET {', '.join(f'{column} = ?' for column in columns)},
+                    stored_bytes = stored_bytes + ? WHERE block_id = ?
+                ''', values + [len(frame), block_id])
+                cursor.execute('UPDATE transcript_blocks SET data = CAST(data || ? AS BLOB) WHERE block_id = ?',
+                               (sqlite3.Binary(frame), block_id))
+            conn.commit()
+            return block_id
+    
+    def find_transcript_blocks(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                               feature: Optional[str] = None, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get index rows (without data) in time order, filtered by date range, feature and session."""
+        query = 'SELECT * FROM transcript_index WHERE 1 = 1'
+        params: List[Any] = []
+        for clause, value in (('day >= ?', start_date), ('day <= ?', end_date),
+                              ('feature = ?', feature), ('session_id = ?', session_id)):
+            if value:
+                query += f' AND {clause}'
+                params.append(value)
+        query += ' ORDER BY day, first_at, block_id'
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_transcript_block_data(self, block_id: int) -> Optional[bytes]:
+        """Get one block's compressed data."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT data FROM transcript_blocks WHERE block_id = ?', (block_id,))
+            row = cursor.fetchone()
+            return bytes(row[0]) if row else None
+    
+    def get_transcript_stats(self) -> Dict[str, int]:
+        """Block, record and byte totals for the transcript archive."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*), COALESCE(SUM(records), 0), COALESCE(SUM(raw_bytes), 0), COALESCE(SUM(stored_bytes), 0)
+                FROM transcript_index
+            ''')
+            blocks, records, raw_bytes, stored_bytes = cursor.fetchone()
+            return {"blocks": blocks, "records": records, "raw_bytes": raw_bytes, "stored_bytes": stored_bytes}
+    
     def migrate_from_json(self, profile_path: str = "yoel_profile.json", logs_path: str = "daily_logs.json"):
         """Migrate existing JSON data to SQLite database."""
         # Migrate profile
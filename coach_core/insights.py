@@ -0,0 +1,229 @@
+"""
+Batch daily insight backfill.
+
+Days without a stored insight (e.g. imported histories) are grouped into
+blocks of consecutive logs, one prompt per block, so a year of logs takes a
+handful of requests rather than 365. Blocks are sized by a prompt token limit
+and a day cap, the run stops scheduling blocks once the estimated token budget
+is spent, and requests run with bounded concurrency. With COACH_INSIGHT_BATCH=on
+the blocks are submitted to the offline Batch API instead and collected on a
+later run.
+"""
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from coach_core.context import compact_profile, encode_logs_table, estimate_tokens, log_columns
+from coach_core.data import ensure_db_instance
+from coach_core.plans import PlanValidationError, parse_json_object
+from coach_core.prompts import INSIGHT_BATCH_SYSTEM_PROMPT, build_insight_batch_prompt
+from coach_core.routing import INSIGHT_BATCH, ROUTES, model_router
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_REQUEST = int(os.getenv("COACH_INSIGHT_DAYS_PER_REQUEST", "60"))
+PROMPT_TOKEN_LIMIT = int(os.getenv("COACH_INSIGHT_PROMPT_TOKENS", "3000"))
+TOKEN_BUDGET = int(os.getenv("COACH_INSIGHT_TOKEN_BUDGET", "100000"))
+CONCURRENCY = int(os.getenv("COACH_INSIGHT_CONCURRENCY", "3"))
+LEAD_IN_DAYS = 3  # earlier logs included for context ahead of each block
+OUTPUT_TOKENS_PER_DAY = 45
+# Conservative generation speed used to give each block enough time to finish
+OUTPUT_TOKENS_PER_SECOND = float(os.getenv("COACH_INSIGHT_TOKENS_PER_SECOND", "40"))
+DEADLINE_OVERHEAD_SECONDS = 10.0
+JSON_RESPONSE = {"type": "json_object"}
+
+def batch_mode_enabled() -> bool:
+    """Submit backfills to the offline Batch API instead of calling the chat endpoint."""
+    return os.getenv("COACH_INSIGHT_BATCH", "off").lower() in ("1", "on", "true")
+
+def block_deadline(max_tokens: int) -> float:
+    """Seconds allowed for one block: the route's latency budget, or longer when its output needs it."""
+    return max(ROUTES[INSIGHT_BATCH]["latency_budget"],
+               DEADLINE_OVERHEAD_SECONDS + max_tokens / OUTPUT_TOKENS_PER_SECOND)
+
+def parse_insights(text: str, dates: Sequence[str]) -> Dict[str, str]:
+    """Per-date insights from a response; entries for dates outside the block are ignored."""
+    data = parse_json_object(text)
+    entries = data.get("insights") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        raise PlanValidationError(["$.insights: expected array"])
+    wanted = set(dates)
+    insights = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        date, insight = entry.get("date"), entry.get("insight")
+        if date in wanted and isinstance(insight, str) and insight.strip():
+            insights[date] = insight.strip()
+    return insights
+
+class InsightBackfill:
+    """Generate and store insights for logged days that have none."""
+    def __init__(self, coach: Any, db=None, days_per_request: int = DAYS_PER_REQUEST,
+                 prompt_token_limit: int = PROMPT_TOKEN_LIMIT, token_budget: int = TOKEN_BUDGET,
+                 concurrency: int = CONCURRENCY):
+        self.coach = coach
+        self.db = ensure_db_instance(db)
+        self.days_per_request = days_per_request
+        self.prompt_token_limit = prompt_token_limit
+        self.token_budget = token_budget
+        self.concurrency = concurrency
+
+    def pending_logs(self, since: Optional[str] = None, force: bool = False) -> List[Dict[str, Any]]:
+        """Logs (oldest first) that have no stored insight, or all of them with force."""
+        done = set() if force else {row["date"] for row in self.db.get_daily_insights()}
+        logs = sorted((log for log in self.coach.logs if log.get("date")), key=lambda log: log["date"])
+        return [log for log in logs if log["date"] not in done and (not since or log["date"] >= since)]
+
+    def plan(self, pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Split pending logs into request blocks within the prompt limit, day cap and token budget.
+
+        Each block is {"dates", "messages", "max_tokens", "deadline", "tokens"}; days beyond the budget are
+        left for a later run.
+        """
+        all_logs = sorted((log for log in self.coach.logs if log.get("date")), key=lambda log: log["date"])
+        position = {log["date"]: i for i, log in enumerate(all_logs)}
+        columns = log_columns(all_logs)
+        profile = compact_profile(self.coach.profile)
+        base_tokens = estimate_tokens(INSIGHT_BATCH_SYSTEM_PROMPT) + estimate_tokens(
+            build_insight_batch_prompt(profile, encode_logs_table(all_logs[:1], columns), []))
+
+        def row_tokens(log: Dict[str, Any]) -> int:
+            # Row plus its date in the requested list
+            return estimate_tokens(encode_logs_table([log], columns).split("\n", 1)[1]) + 4
+
+        blocks, current, current_tokens = [], [], base_tokens
+        for log in pending:
+            tokens = row_tokens(log)
+            if current and (len(current) >= self.days_per_request or current_tokens + tokens > self.prompt_token_limit):
+                blocks.append(current)
+                current, current_tokens = [], base_tokens
+            current.append(log)
+            current_tokens += tokens
+        if current:
+            blocks.append(current)
+
+        planned, spent = [], 0
+        for block in blocks:
+            start = position[block[0]["date"]]
+            lead_in = all_logs[max(0, start - LEAD_IN_DAYS):start]
+            dates = [log["date"] for log in block]
+            prompt = build_insight_batch_prompt(profile, encode_logs_table(lead_in + block, columns), dates)
+            max_tokens = OUTPUT_TOKENS_PER_DAY * len(block) + 50
+            tokens = estimate_tokens(INSIGHT_BATCH_SYSTEM_PROMPT) + estimate_tokens(prompt) + max_tokens
+            if spent + tokens > self.token_budget:
+                logger.info(f"Token budget reached, leaving {sum(len(b) for b in blocks[len(planned):])} days for a later run")
+                break
+            spent += tokens
+            planned.append({
+                "dates": dates,
+                "messages": [
+                    {"role": "system", "content": INSIGHT_BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                "max_tokens": max_tokens,
+                "deadline": block_deadline(max_tokens),
+                "tokens": tokens
+            })
+        return planned
+
+    def _run_block(self, block: Dict[str, Any]) -> Dict[str, str]:
+        try:
+            response = self.coach.complete(
+                block["messages"], kind=INSIGHT_BATCH, feature="insight_backfill",
+                max_tokens=block["max_tokens"], deadline=block["deadline"], response_format=JSON_RESPONSE
+            )
+            return parse_insights(response, block["dates"])
+        except Exception as e:
+            logger.error(f"Insight block {block['dates'][0]}..{block['dates'][-1]} failed: {e}")
+            return {}
+
+    def _save(self, insights: Dict[str, str], source: str, model: Optional[str]) -> None:
+        if insights:
+            self.db.save_daily_insights([
+                {"date": date, "insight": insight, "source": source, "model": model}
+                for date, insight in sorted(insights.items())
+            ])
+
+    def run(self, since: Optional[str] = None, force: bool = False) -> Dict[str, int]:
+        """Backfill insights through the chat endpoint.
+
+        Returns counts: pending days, requests made, insights saved, estimated tokens and days
+        deferred to a later run by the token budget.
+        """
+        pending = self.pending_logs(since, force)
+        blocks = self.plan(pending)
+        saved = 0
+        if blocks:
+            logger.info(f"Backfilling {sum(len(b['dates']) for b in blocks)} days in {len(blocks)} requests")
+            model = ROUTES[INSIGHT_BATCH]["model"]
+            with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+                for insights in pool.map(self._run_block, blocks):
+                    self._save(insights, "backfill", model)
+                    saved += len(insights)
+        return {
+            "pending": len(pending),
+            "requests": len(blocks),
+            "saved": saved,
+            "tokens": sum(block["tokens"] for block in blocks),
+            "deferred": len(pending) - sum(len(block["dates"]) for block in blocks)
+        }
+
+    def submit_batch(self, since: Optional[str] = None, force: bool = False) -> Optional[str]:
+        """Submit pending blocks as one offline Batch API job; returns the batch id."""
+        client = self.coach.client
+        if not client or not hasattr(client, "batches"):
+            raise RuntimeError("The configured OpenAI client does not support the Batch API")
+        in_flight = {date for batch in self.db.get_pending_insight_batches() for date in batch["dates"]}
+        pending = [log for log in self.pending_logs(since, force) if log["date"] not in in_flight]
+        blocks = self.plan(pending)
+        if not blocks:
+            return None
+
+        model = model_router.select(INSIGHT_BATCH)["model"]
+        lines = [json.dumps({
+            "custom_id": f"insights-{block['dates'][0]}-{block['dates'][-1]}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": block["messages"],
+                "max_tokens": block["max_tokens"],
+                "response_format": JSON_RESPONSE
+            }
+        }) for block in blocks]
+        upload = client.files.create(file=("insights.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+        batch = client.batches.create(input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h")
+        self.db.save_insight_batch(batch.id, [date for block in blocks for date in block["dates"]])
+        logger.info(f"Submitted batch {batch.id} with {len(blocks)} requests")
+        return batch.id
+
+    def collect_batches(self) -> int:
+        """Store results of finished offline batches; returns the number of insights saved."""
+        client = self.coach.client
+        saved = 0
+        for pending in self.db.get_pending_insight_batches():
+            try:
+                batch = client.batches.retrieve(pending["batch_id"])
+                if batch.status in ("failed", "expired", "cancelled"):
+                    self.db.set_insight_batch_status(pending["batch_id"], batch.status)
+                    continue
+                if batch.status != "completed":
+                    continue
+                output = client.files.content(batch.output_file_id).text if batch.output_file_id else ""
+                for line in output.splitlines():
+                    try:
+                        body = (json.loads(line).get("response") or {}).get("body") or {}
+                        insights = parse_insights(body["choices"][0]["message"]["content"], pending["dates"])
+                    except (ValueError, KeyError, IndexError) as e:
+                        # Days of a failed request stay pending for the next backfill
+                        logger.error(f"Skipping unusable batch result in {pending['batch_id']}: {e}")
+                        continue
+                    self._save(insights, "batch", body.get("model"))
+                    saved += len(insights)
+                self.db.set_insight_batch_status(pending["batch_id"], "collected")
+            except Exception as e:
+                logger.error(f"Error collecting batch {pending['batch_id']}: {e}")
+        return saved
@@ -0,0 +1,133 @@
+"""
+Intent routing for coach messages.
+
+All keyword rules are compiled into one case-insensitive regex alternation, so
+a message is classified in a single scan instead of a chain of substring
+checks per page. Each keyword can belong to several intents; when a message
+matches more than one, the highest-priority intent wins (earliest match breaks
+ties). Keywords match on word boundaries, so "planks" is not a "plan".
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Top-level intents
+REFLECTION = "reflection"
+FEEDBACK = "feedback"
+WEEKLY_PLAN = "weekly_plan"
+INJURY = "injury"
+TIRED = "tired"
+TRAINING = "training"
+NUTRITION = "nutrition"
+HELP = "help"
+GENERAL = "general"
+
+# Feedback types, only considered when classifying feedback
+POSITIVE = "positive"
+NEEDS_PROGRESSION = "needs_progression"
+NEEDS_REGRESSION = "needs_regression"
+INJURY_CONCERN = "injury_concern"
+RECOVERY_NEEDED = "recovery_needed"
+
+# (intent, priority, keywords) - higher priority wins when several intents match
+INTENT_RULES: Sequence[Tuple[str, int, Sequence[str]]] = (
+    (FEEDBACK, 60, ("feedback", "felt", "felt great", "felt good", "too easy", "too hard",
+                    "shoulder tight", "energized")),
+    (REFLECTION, 55, ("reflection", "reflect", "sunday", "review my week")),
+    (WEEKLY_PLAN, 50, ("plan", "weekly", "training program", "training schedule")),
+    (INJURY, 45, ("injury", "injured", "pain", "hurt", "hurts")),
+    (TIRED, 40, ("tired", "low energy", "exhausted", "fatigued")),
+    (TRAINING, 35, ("what should i train", "workout", "train today")),
+    (NUTRITION, 30, ("what should i eat", "food", "meal", "nutrition")),
+    # Lowest priority so "help me plan my week" still reaches the planner
+    (HELP, 10, ("help", "what can you do", "how does this work", "commands")),
+
+    (INJURY_CONCERN, 5, ("shoulder tight", "shoulder pain", "pain", "hurt")),
+    (NEEDS_REGRESSION, 4, ("too hard", "too much", "struggled")),
+    (NEEDS_PROGRESSION, 3, ("too easy", "not challenging")),
+    (RECOVERY_NEEDED, 2, ("tired", "exhausted", "sore")),
+    (POSITIVE, 1, ("felt great", "felt good", "energized", "strong")),
+)
+
+# Words that don't turn a bare intent into a question ("hi, can you help me please?")
+FILLER_WORDS = frozenset({
+    "i", "im", "me", "you", "please", "pls", "need", "want", "some", "hi", "hey", "hello", "coach",
+    "a", "the", "can", "could", "get", "ok", "okay", "so",
+})
+
+PRIMARY_INTENTS = frozenset({REFLECTION, FEEDBACK, WEEKLY_PLAN, INJURY, TIRED, TRAINING, NUTRITION, HELP})
+FEEDBACK_TYPES = frozenset({POSITIVE, NEEDS_PROGRESSION, NEEDS_REGRESSION, INJURY_CONCERN, RECOVERY_NEEDED})
+
+class IntentRouter:
+    """Single-pass keyword classifier over a fixed rule table."""
+    def __init__(self, rules: Sequence[Tuple[str, int, Sequence[str]]] = INTENT_RULES):
+        self._intents: Dict[str, List[Tuple[str, int]]] = {}
+        for intent, priority, keywords in rules:
+            for keyword in keywords:
+                self._intents.setdefault(keyword.lower(), []).append((intent, priority))
+
+        # A longer keyword also carries the intents of keywords inside it ("shoulder pain" is still "pain"),
+        # since the regex reports one alternative per position
+        for keyword, intents in self._intents.items():
+            for inner, inner_intents in self._intents.items():
+                if inner != keyword and re.search(rf"\b{re.escape(inner)}\b", keyword):
+                    intents.extend(i for i in inner_intents if i not in intents)
+
+        # Longest keywords first so "felt great" is preferred over "felt" at the same position
+        alternatives = sorted(self._intents, key=len, reverse=True)
+        pattern = "|".join(r"\s+".join(map(re.escape, keyword.split())) for keyword in alternatives)
+        self._pattern = re.compile(rf"\b(?:{pattern})\b", re.IGNORECASE)
+
+    def matches(self, text: str) -> List[Tuple[str, str, int]]:
+        """All (intent, keyword, position) hits in text, in order of appearance."""
+        hits = []
+        for match in self._pattern.finditer(text or ""):
+            keyword = " ".join(match.group(0).lower().split())
+            for intent, _ in self._intents[keyword]:
+                hits.append((intent, keyword, match.start()))
+        return hits
+
+    def route(self, text: str, intents: Iterable[str] = PRIMARY_INTENTS, default: str = GENERAL) -> str:
+        """Best matching intent among `intents`, or `default` when nothing matches."""
+        allowed = intents if isinstance(intents, (set, frozenset)) else set(intents)
+        best: Optional[Tuple[int, int, str]] = None
+        for match in self._pattern.finditer(text or ""):
+            keyword = " ".join(match.group(0).lower().split())
+            for intent, priority in self._intents[keyword]:
+                if intent in allowed:
+                    candidate = (priority, -match.start(), intent)
+                    if best is None or candidate > best:
+                        best = candidate
+        return best[2] if best else default
+
+    def is_bare(self, text: str, intent: str) -> bool:
+        """True when text is only keywords of intent plus filler words, e.g. "help?" but not "help me eat better"."""
+        matched = False
+
+        def drop(match: "re.Match[str]") -> str:
+            nonlocal matched
+            keyword = " ".join(match.group(0).lower().split())
+            if any(i == intent for i, _ in self._intents[keyword]):
+                matched = True
+                return " "
+            return match.group(0)
+
+        rest = self._pattern.sub(drop, text or "")
+        words = re.findall(r"[a-z]+", rest.lower().replace("'", ""))
+        return matched and all(word in FILLER_WORDS for word in words)
+
+# Shared router compiled once at import
+router = IntentRouter()
+
+@lru_cache(maxsize=256)
+def route(text: str, intents: frozenset = PRIMARY_INTENTS, default: str = GENERAL) -> str:
+    """Route a message with the shared router (memoized for repeated quick-action prompts)."""
+    return router.route(text, intents, default)
+
+def classify_feedback(text: str) -> str:
+    """Feedback type for a feedback message, 'general' when no rule matches."""
+    return route(text, FEEDBACK_TYPES)
+
+def is_bare(text: str, intent: str) -> bool:
+    """Whether a message is nothing but a bare intent with the shared router."""
+    return router.is_bare(text, intent)
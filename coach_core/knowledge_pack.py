@@ -0,0 +1,133 @@
+"""
+Versioned mentor knowledge pack.
+
+Mentor knowledge lives in coach_core/knowledge/mentors.jsonl (one mentor per
+line) with a precompiled index.json holding each mentor's byte offset and
+length, a token-count estimate and the pack's content hash. Nothing is read
+until first access; single-mentor lookups parse only that mentor's line.
+Editing the JSONL needs no code change: a hash mismatch rebuilds the index in
+memory, and `python -m coach_core.knowledge_pack` rewrites index.json.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+from coach_core.context import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge")
+DATA_PATH = os.path.join(KNOWLEDGE_DIR, "mentors.jsonl")
+INDEX_PATH = os.path.join(KNOWLEDGE_DIR, "index.json")
+INDEX_FORMAT = 1
+
+def mentor_tokens(mentor: Dict[str, Any]) -> int:
+    """Estimated prompt tokens for a mentor's full knowledge."""
+    text = " ".join(
+        " ".join(value) if isinstance(value, list) else str(value)
+        for key, value in mentor.items() if key != "id"
+    )
+    return estimate_tokens(text)
+
+def build_index(data: bytes) -> Dict[str, Any]:
+    """Index a JSONL pack: per-mentor offsets and token counts plus the content hash."""
+    digest = hashlib.sha256(data).hexdigest()
+    mentors: Dict[str, Dict[str, int]] = {}
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        if line.strip():
+            mentor = json.loads(line)
+            mentors[mentor["id"]] = {"offset": offset, "length": len(line), "tokens": mentor_tokens(mentor)}
+        offset += len(line)
+    return {"format": INDEX_FORMAT, "sha256": digest, "version": digest[:12], "mentors": mentors}
+
+class KnowledgePack:
+    """Lazily loaded mentor knowledge with a precompiled offset index."""
+    def __init__(self, data_path: str = DATA_PATH, index_path: str = INDEX_PATH):
+        self.data_path = data_path
+        self.index_path = index_path
+        self._data: Optional[bytes] = None
+        self._index: Optional[Dict[str, Any]] = None
+        self._mentors: Dict[str, Dict[str, Any]] = {}
+        self._all: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is None:
+                with open(self.data_path, "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()
+                index = None
+                try:
+                    with open(self.index_path, "r") as f:
+                        index = json.load(f)
+                except (OSError, ValueError):
+                    pass
+                if not index or index.get("format") != INDEX_FORMAT or index.get("sha256") != digest:
+                    logger.warning("Mentor knowledge index is stale; rebuilding in memory")
+                    index = build_index(data)
+                self._data = data
+                self._index = index
+        return self._index
+
+    @property
+    def version(self) -> str:
+        """Short content hash of the pack; prompt and index caches key on it."""
+        return self._load()["version"]
+
+    def mentor_ids(self) -> List[str]:
+        return list(self._load()["mentors"])
+
+    def get(self, mentor_id: str) -> Dict[str, Any]:
+        """One mentor's knowledge (without the id field), or {} if unknown."""
+        entry = self._load()["mentors"].get(mentor_id)
+        if entry is None:
+            return {}
+        mentor = self._mentors.get(mentor_id)
+        if mentor is None:
+            line = self._data[entry["offset"]:entry["offset"] + entry["length"]]
+            mentor = json.loads(line)
+            mentor.pop("id", None)
+            self._mentors[mentor_id] = mentor
+        return mentor
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """Every mentor keyed by id, in pack order."""
+        if self._all is None:
+            self._all = {mentor_id: self.get(mentor_id) for mentor_id in self.mentor_ids()}
+        return self._all
+
+    def tokens(self, mentor_id: str) -> int:
+        """Cached token estimate for a mentor's knowledge."""
+        entry = self._load()["mentors"].get(mentor_id)
+        return entry["tokens"] if entry else 0
+
+    def write_index(self) -> Dict[str, Any]:
+        """Rebuild index.json from the data file (run after editing mentors.jsonl)."""
+        with open(self.data_path, "rb") as f:
+            index = build_index(f.read())
+        with open(self.index_path, "w") as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        self.reload()
+        return index
+
+    def reload(self) -> None:
+        """Drop everything loaded so the next access re-reads the pack."""
+        with self._lock:
+            self._data = None
+            self._index = None
+            self._mentors = {}
+            self._all = None
+
+# Process-wide pack, loaded on first access
+knowledge_pack = KnowledgePack()
+
+if __name__ == '__main__':
+    index = knowledge_pack.write_index()
+    print(f"✅ Indexed {len(index['mentors'])} mentors (version {index['version']})")
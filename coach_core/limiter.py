@@ -0,0 +1,289 @@
+"""
+Shared LLM rate limiter.
+
+Every OpenAI call (AICoach.complete/stream and the mentor panel) takes a
+permit first. A permit needs room in the global and the per-user token
+buckets (requests and tokens per minute) and a free slot under the global
+concurrency cap. Waiters queue per user and are admitted round-robin, so one
+chatty session can't starve everyone else. A request that can't be admitted
+within its wait budget raises RateLimited, and callers degrade to cached or
+fallback answers instead of piling up behind the OpenAI rate limit.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from coach_core.context import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Per-minute budgets; 0 turns a bucket off
+GLOBAL_RPM = float(os.getenv("COACH_LLM_RPM", "60"))
+GLOBAL_TPM = float(os.getenv("COACH_LLM_TPM", "90000"))
+USER_RPM = float(os.getenv("COACH_USER_RPM", "20"))
+USER_TPM = float(os.getenv("COACH_USER_TPM", "30000"))
+MAX_CONCURRENCY = int(os.getenv("COACH_LLM_CONCURRENCY", "4"))
+MAX_QUEUE = int(os.getenv("COACH_LLM_QUEUE", "32"))
+MAX_WAIT_SECONDS = float(os.getenv("COACH_LIMITER_WAIT", "8"))
+POLL_SECONDS = 0.05
+
+DEFAULT_USER = "default"
+
+_current_user: contextvars.ContextVar = contextvars.ContextVar("llm_user", default=DEFAULT_USER)
+
+def limiter_disabled() -> bool:
+    """Check whether the limiter is off via COACH_LLM_LIMITER=off."""
+    return os.getenv("COACH_LLM_LIMITER", "on").strip().lower() in ("0", "off", "false", "no")
+
+def current_user() -> str:
+    """User the current thread's LLM calls are charged to (background work uses the default user)."""
+    return _current_user.get()
+
+def set_current_user(user: Optional[str]) -> None:
+    """Charge this thread's LLM calls to user, e.g. once per Streamlit script run."""
+    _current_user.set(user or DEFAULT_USER)
+
+@contextmanager
+def as_user(user: Optional[str]) -> Iterator[None]:
+    """Charge LLM calls made inside the block to user."""
+    token = _current_user.set(user or DEFAULT_USER)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+def request_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> int:
+    """Worst-case token cost of a request: the estimated prompt plus the completion limit."""
+    return sum(estimate_tokens(m.get("content") or "") for m in messages) + (max_tokens or 0)
+
+class RateLimited(RuntimeError):
+    """Raised when a request can't get a permit within its wait budget."""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Refills continuously at per_minute / 60 per second up to capacity (one minute's worth by default)."""
+    def __init__(self, per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = max(per_minute, 0) / 60
+        self.capacity = per_minute if capacity is None else capacity
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount can be taken; requests larger than the bucket wait for a full one."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0.0) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Take amount; the level may go negative, which later requests wait off."""
+        if not self.unlimited:
+            self._refill()
+            self.level -= amount
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) the difference between estimated and actual use."""
+        if not self.unlimited:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+class _Waiter:
+    def __init__(self, user: str, tokens: int):
+        self.user = user
+        self.tokens = tokens
+
+class Permit:
+    """Admission to make one LLM call; release it when the call is done (or use it as a context manager)."""
+    def __init__(self, limiter: Optional["LLMLimiter"], user: str, tokens: int):
+        self.limiter = limiter
+        self.user = user
+        self.tokens = tokens
+        self.released = limiter is None
+
+    def settle(self, used_tokens: int) -> None:
+        """Correct the token buckets with the tokens the call actually used."""
+        if self.limiter is not None and used_tokens:
+            self.limiter._settle(self.user, used_tokens - self.tokens)
+            self.tokens = used_tokens
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.limiter._release()
+
+    def __enter__(self) -> "Permit":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+class LLMLimiter:
+    """Global and per-user token buckets, a concurrency cap and a fair (round-robin per user) queue."""
+    def __init__(self, rpm: float = GLOBAL_RPM, tpm: float = GLOBAL_TPM,
+                 user_rpm: float = USER_RPM, user_tpm: float = USER_TPM,
+                 concurrency: int = MAX_CONCURRENCY, max_queue: int = MAX_QUEUE,
+                 max_wait: float = MAX_WAIT_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.user_rpm = user_rpm
+        self.user_tpm = user_tpm
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock=clock)
+        self.tokens = TokenBucket(tpm, clock=clock)
+        self._users: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+        # Users with queued requests, in turn order; a user moves to the back once admitted
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+
+    def _user_buckets(self, user: str) -> Tuple[TokenBucket, TokenBucket]:
+        buckets = self._users.get(user)
+        if buckets is None:
+            buckets = (TokenBucket(self.user_rpm, clock=self.clock), TokenBucket(self.user_tpm, clock=self.clock))
+            self._users[user] = buckets
+        return buckets
+
+    def _user_wait(self, user: str, tokens: int) -> float:
+        requests, token_bucket = self._user_buckets(user)
+        return max(requests.wait_time(1), token_bucket.wait_time(tokens))
+
+    def _wait(self, waiter: _Waiter) -> float:
+        return max(self.requests.wait_time(1), self.tokens.wait_time(waiter.tokens),
+                   self._user_wait(waiter.user, waiter.tokens))
+
+    def _next(self) -> Optional[_Waiter]:
+        """Oldest request of the first user in turn order whose budget allows it right now."""
+        if self.active >= self.concurrency:
+            return None
+        for waiters in self._queues.values():
+            if self._wait(waiters[0]) == 0:
+                return waiters[0]
+        return None
+
+    def _retry_in(self) -> Optional[float]:
+        """Seconds until some queued request's buckets refill; None when only a release can help."""
+        if self.active >= self.concurrency:
+            return None
+        waits = [self._wait(waiters[0]) for waiters in self._queues.values()]
+        return min(waits, default=None)
+
+    def _enqueue(self, user: str, tokens: int, timeout: float) -> _Waiter:
+        own_wait = self._user_wait(user, tokens)
+        if own_wait > timeout:
+            raise RateLimited(f"Over the LLM budget for {user}; retry in {own_wait:.0f}s", own_wait)
+        if self.waiting >= self.max_queue:
+            raise RateLimited("Too many LLM requests queued")
+        waiter = _Waiter(user, tokens)
+        self._queues.setdefault(user, deque()).append(waiter)
+        self.waiting += 1
+        return waiter
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        waiters = self._queues.get(waiter.user)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            self.waiting -= 1
+            if not waiters:
+                del self._queues[waiter.user]
+        self._cond.notify_all()
+
+    def _try_admit(self, waiter: _Waiter) -> Optional[Permit]:
+        if self._next() is not waiter:
+            return None
+        self._dequeue(waiter)
+        if waiter.user in self._queues:
+            self._queues.move_to_end(waiter.user)
+        requests, token_bucket = self._user_buckets(waiter.user)
+        for bucket, amount in ((self.requests, 1), (self.tokens, waiter.tokens),
+                               (requests, 1), (token_bucket, waiter.tokens)):
+            bucket.take(amount)
+        self.active += 1
+        return Permit(self, waiter.user, waiter.tokens)
+
+    def _timed_out(self, waiter: _Waiter) -> RateLimited:
+        self._dequeue(waiter)
+        logger.info(f"LLM request for {waiter.user} rate limited after queueing")
+        return RateLimited("Timed out waiting for LLM capacity")
+
+    def acquire(self, tokens: int = 0, user: Optional[str] = None, timeout: Optional[float] = None) -> Permit:
+        """Block until the request is admitted; raises RateLimited if that would take longer than timeout."""
+        user = user or current_user()
+        if limiter_disabled():
+            return Permit(None, user, tokens)
+        timeout = self.max_wait if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            waiter = self._enqueue(user, tokens, timeout)
+            while True:
+                permit = self._try_admit(waiter)
+                if permit is not None:
+                    return permit
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._timed_out(waiter)
+                retry_in = self._retry_in()
+                self._cond.wait(remaining if retry_in is None else min(remaining, max(retry_in, 0.001)))
+
+    async def acquire_async(self, tokens: int = 0, user: Optional[str] = None,
+                            timeout: Optional[float] = None) -> Permit:
+        """acquire() for coroutines: polls instead of blocking the event loop, and dequeues on cancellation."""
+        user = user or current_user()
+        if limiter_disabled():
+            return Permit(None, user, tokens)
+        timeout = self.max_wait if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            waiter = self._enqueue(user, tokens, timeout)
+        try:
+            while True:
+                with self._cond:
+                    permit = self._try_admit(waiter)
+                    if permit is not None:
+                        return permit
+                    if time.monotonic() >= deadline:
+                        raise self._timed_out(waiter)
+                await asyncio.sleep(POLL_SECONDS)
+        except asyncio.CancelledError:
+            with self._cond:
+                self._dequeue(waiter)
+            raise
+
+    def _release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def _settle(self, user: str, difference: int) -> None:
+        with self._cond:
+            self.tokens.adjust(difference)
+            self._user_buckets(user)[1].adjust(difference)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"active": self.active, "waiting": self.waiting, "users": len(self._users)}
+
+# Process-wide limiter shared by every coach, page and worker
+llm_limiter = LLMLimiter()
@@ -0,0 +1,130 @@
+"""
+Mentor retrieval index.
+
+A small BM25 index over each mentor's focus, philosophy, principles, methods,
+nutrition and recovery text. It selects the mentors relevant to a question so
+prompts carry a few mentor sections instead of all of them.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+from coach_core.mentor_brain import get_all_mentors_context, get_knowledge_version
+
+DEFAULT_TOP_K = 4
+
+# Used when a question matches nothing in the index (e.g. "hi")
+DEFAULT_MENTORS = ["dr_andy_galpin", "patrick_beach", "squat_u", "knees_over_toes_guy"]
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "for", "from", "how",
+    "i", "if", "in", "into", "is", "it", "its", "me", "my", "of", "on", "or", "over", "should",
+    "so", "that", "the", "their", "this", "to", "today", "up", "was", "we", "what", "when",
+    "with", "you", "your",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Question words mapped onto the vocabulary used in the knowledge base
+QUERY_EXPANSIONS = {
+    "shoulder": ["joint", "injury", "prevention"],
+    "knee": ["joint", "knee"],
+    "pain": ["joint", "injury", "prevention"],
+    "injury": ["joint", "injury", "prevention"],
+    "hurt": ["joint", "injury"],
+    "eat": ["nutrition", "food"],
+    "food": ["nutrition", "food"],
+    "meal": ["nutrition", "food"],
+    "diet": ["nutrition", "food"],
+    "protein": ["nutrition", "protein"],
+    "tired": ["recovery", "rest", "sleep"],
+    "sore": ["recovery", "mobility"],
+    "stretch": ["flexibility", "mobility"],
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, drop stopwords and strip simple plural endings."""
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+def expand_query(tokens: List[str]) -> List[str]:
+    """Add knowledge base vocabulary for common question words."""
+    expanded = list(tokens)
+    for token in tokens:
+        expanded.extend(QUERY_EXPANSIONS.get(token, []))
+    return expanded
+
+def mentor_document(mentor: Dict) -> str:
+    """Flatten the searchable fields of a mentor; focus is repeated to weight it higher."""
+    return " ".join([
+        mentor.get("name", ""),
+        mentor.get("focus", ""),
+        mentor.get("focus", ""),
+        mentor.get("core_philosophy", ""),
+        " ".join(mentor.get("key_principles", [])),
+        " ".join(mentor.get("training_methods", [])),
+        mentor.get("nutrition_approach", ""),
+        mentor.get("recovery_focus", ""),
+    ])
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of documents."""
+    def __init__(self, documents: Dict[str, str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = {doc_id: Counter(tokenize(text)) for doc_id, text in documents.items()}
+        self.doc_lengths = {doc_id: sum(tf.values()) for doc_id, tf in self.term_freqs.items()}
+        self.avg_length = sum(self.doc_lengths.values()) / max(len(self.doc_lengths), 1)
+
+        doc_freqs = Counter(term for tf in self.term_freqs.values() for term in tf)
+        n = len(self.term_freqs)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()}
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K) -> List[Tuple[str, float]]:
+        """Return the top-k (doc_id, score) pairs with a positive score."""
+        terms = [term for term in expand_query(tokenize(query)) if term in self.idf]
+        if not terms:
+            return []
+
+        scores = []
+        for doc_id, tf in self.term_freqs.items():
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+            score = sum(
+                self.idf[term] * tf[term] * (self.k1 + 1) / (tf[term] + norm)
+                for term in terms if tf[term]
+            )
+            if score > 0:
+                scores.append((doc_id, score))
+
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores[:k]
+
+# Built indexes, keyed by knowledge pack version (built on first search)
+_indexes: Dict[str, BM25Index] = {}
+
+def get_index() -> BM25Index:
+    """Get the BM25 index for the current knowledge pack, building it once per version."""
+    version = get_knowledge_version()
+    index = _indexes.get(version)
+    if index is None:
+        index = BM25Index({mentor_id: mentor_document(m) for mentor_id, m in get_all_mentors_context().items()})
+        _indexes.clear()
+        _indexes[version] = index
+    return index
+
+def rank_mentors(question: str, k: int = DEFAULT_TOP_K) -> List[str]:
+    """Select the k mentors most relevant to a question, padded with generalists."""
+    ranked = [mentor_id for mentor_id, _ in get_index().search(question, k)]
+    mentors = get_all_mentors_context()
+    for mentor_id in DEFAULT_MENTORS:
+        if len(ranked) >= k:
+            break
+        if mentor_id in mentors and mentor_id not in ranked:
+            ranked.append(mentor_id)
+    return ranked
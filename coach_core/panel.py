@@ -0,0 +1,142 @@
+"""
+Parallel mentor panel.
+
+A question is fanned out to the top-k relevant mentors at once on a shared
+asyncio event loop, bounded by a semaphore, so the panel takes roughly as
+long as its slowest answer rather than the sum of all of them. Each mentor has
+a deadline; a slow mentor is cut off and whatever it streamed so far is kept.
+Partial answers are streamed back to the (synchronous) caller as they arrive.
+"""
+import asyncio
+import logging
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from coach_core.limiter import current_user, llm_limiter, request_tokens
+from coach_core.mentor_brain import create_mentor_prompt, get_mentor_context
+from coach_core.prompts import build_panel_mentor_prompt
+from coach_core.routing import model_router, PANEL_MENTOR
+from coach_core.telemetry import llm_telemetry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PANEL_SIZE = 3
+MAX_CONCURRENCY = int(os.getenv("COACH_PANEL_CONCURRENCY", "4"))
+MENTOR_DEADLINE_SECONDS = float(os.getenv("COACH_PANEL_DEADLINE", "12"))
+
+_DONE = object()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop running on a daemon thread; the async client lives on it."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="mentor-panel", daemon=True).start()
+        return _loop
+
+def mentor_name(mentor_id: str) -> str:
+    return get_mentor_context(mentor_id).get("name", mentor_id)
+
+def mentor_messages(mentor_id: str, question: str, context: str) -> List[Dict[str, str]]:
+    """Single-mentor prompt built from mentor_brain.create_mentor_prompt."""
+    name = mentor_name(mentor_id)
+    return [
+        {"role": "system", "content": create_mentor_prompt(mentor_id, question)},
+        {"role": "user", "content": build_panel_mentor_prompt(context, question, name)},
+    ]
+
+async def ask_mentor(client: Any, semaphore: asyncio.Semaphore, mentor_id: str, question: str, context: str,
+                     emit: Callable[[str, str], None], deadline: float, user: Optional[str] = None) -> str:
+    """Stream one mentor's answer, emitting deltas; returns what arrived before the deadline."""
+    route = model_router.select(PANEL_MENTOR)
+    messages = mentor_messages(mentor_id, question, context)
+    parts: List[str] = []
+
+    async def run() -> None:
+        async with semaphore:
+            permit = await llm_limiter.acquire_async(request_tokens(messages, route["max_tokens"]), user)
+            try:
+                record.mark_sent()
+                stream = await client.chat.completions.create(
+                    model=route["model"],
+                    messages=messages,
+                    max_tokens=route["max_tokens"],
+                    temperature=route["temperature"],
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        record.mark_first_token()
+                        parts.append(delta)
+                        emit(mentor_id, delta)
+            finally:
+                record.set_usage(None, messages, "".join(parts))
+                permit.settle(record.prompt_tokens + record.completion_tokens)
+                permit.release()
+
+    record = llm_telemetry.start(PANEL_MENTOR, route["model"], streamed=True)
+    error: Optional[BaseException] = None
+    try:
+        await asyncio.wait_for(run(), timeout=deadline)
+    except asyncio.TimeoutError as e:
+        logger.info(f"Mentor {mentor_id} cut off after {deadline:.1f}s")
+        error = e
+    except Exception as e:
+        logger.error(f"Mentor {mentor_id} failed: {e}")
+        error = e
+    answer = "".join(parts)
+    record.set_usage(None, messages, answer)
+    record.finish(error)
+    if error is None:
+        model_router.record(PANEL_MENTOR, route["model"], record.row["latency_ms"] / 1000)
+    return answer
+
+async def run_panel(client: Any, mentor_ids: Sequence[str], question: str, context: str,
+                    emit: Callable[[str, str], None], concurrency: int = MAX_CONCURRENCY,
+                    deadline: float = MENTOR_DEADLINE_SECONDS, user: Optional[str] = None) -> Dict[str, str]:
+    """Ask every mentor concurrently; returns {mentor_id: answer} (possibly partial or empty)."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    answers = await asyncio.gather(*(
+        ask_mentor(client, semaphore, mentor_id, question, context, emit, deadline, user)
+        for mentor_id in mentor_ids
+    ))
+    return dict(zip(mentor_ids, answers))
+
+def stream_panel(question: str, context: str, mentor_ids: Sequence[str], client: Any = None,
+                 concurrency: int = MAX_CONCURRENCY,
+                 deadline: float = MENTOR_DEADLINE_SECONDS) -> Iterator[Tuple[str, str]]:
+    """Run the panel on the shared loop and yield (mentor_id, delta) as answers stream in."""
+    if client is None:
+        # Imported here so the panel logic doesn't require openai/httpx at import time
+        from coach_core.client import get_async_openai_client
+        client = get_async_openai_client()
+        if client is None:
+            raise RuntimeError("OpenAI client is not configured")
+
+    events: "queue.Queue[Any]" = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(
+        # The loop thread doesn't see this thread's user, so it's passed along explicitly
+        run_panel(client, mentor_ids, question, context, lambda m, d: events.put((m, d)), concurrency, deadline,
+                  current_user()),
+        get_loop(),
+    )
+    future.add_done_callback(lambda _: events.put(_DONE))
+    try:
+        while True:
+            event = events.get()
+            if event is _DONE:
+                break
+            yield event
+        future.result()
+    finally:
+        # The consumer stopped early: don't leave mentor calls running
+        if not future.done():
+            future.cancel()
@@ -0,0 +1,162 @@
+"""
+Write-triggered pattern insight precompute.
+
+Log writes notify a background worker (via the database write listeners),
+which computes the pattern summary and the AI insight once per data
+generation and stores them in pattern_insights. The patterns page only reads
+the stored result, so viewing it never waits on the LLM. Bursts of writes
+(e.g. an import) are coalesced into one computation.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from coach_core.analysis import analyze_patterns
+from coach_core.context import encode_logs_table, newest_first
+from coach_core.data import ensure_db_instance, load_logs
+from coach_core.database import CoachDatabase, DATABASE_PATH, add_write_listener
+from coach_core.prompts import PATTERN_INSIGHT_SYSTEM_PROMPT, build_pattern_insight_prompt
+from coach_core.routing import PATTERN_INSIGHT
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_SECONDS = float(os.getenv("COACH_INSIGHT_DEBOUNCE", "2"))
+# Failed insight generations are retried after RETRY_SECONDS, doubling per failure up to MAX_RETRY_SECONDS
+RETRY_SECONDS = float(os.getenv("COACH_INSIGHT_RETRY", "60"))
+MAX_RETRY_SECONDS = 3600
+RECENT_DAYS = 7
+
+def pattern_insight_messages(logs: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": PATTERN_INSIGHT_SYSTEM_PROMPT},
+        {"role": "user", "content": build_pattern_insight_prompt(encode_logs_table(newest_first(logs)[:RECENT_DAYS]))}
+    ]
+
+def retry_due(stored: Dict[str, Any], now: Optional[float] = None) -> bool:
+    """Whether a stored row without an insight may be retried: at once unless generation failed, else after backoff."""
+    attempts = stored.get("attempts") or 0
+    if not attempts:
+        return True
+    backoff = min(RETRY_SECONDS * 2 ** (attempts - 1), MAX_RETRY_SECONDS)
+    return (time.time() if now is None else now) - stored["created_at"] >= backoff
+
+def compute_pattern_insight(db=None, complete: Optional[Callable[..., str]] = None) -> Optional[Dict[str, Any]]:
+    """Compute and store the summary and insight for the current generation unless already stored.
+
+    complete(messages, **kwargs) produces the AI insight (e.g. AICoach.complete); without it only
+    the summary is stored. A stored row without an insight is retried once complete is available,
+    with backoff after failed generations.
+    """
+    db = ensure_db_instance(db)
+    try:
+        generation = db.get_data_generation()
+        stored = db.get_pattern_insight(generation)
+        if stored and (stored["insight"] or complete is None or not retry_due(stored)):
+            return stored
+
+        logs = load_logs(db)
+        summary = analyze_patterns(newest_first(logs)[:RECENT_DAYS])
+        insight = None
+        attempts = 0
+        if complete is not None and logs:
+            try:
+                insight = complete(pattern_insight_messages(logs), kind=PATTERN_INSIGHT, feature="pattern_insight")
+            except Exception as e:
+                logger.error(f"Pattern insight generation failed: {e}")
+            if not insight:
+                attempts = (stored.get("attempts") or 0) + 1 if stored else 1
+        db.save_pattern_insight(generation, summary, insight or None, attempts)
+        return db.get_pattern_insight(generation)
+    except Exception as e:
+        logger.error(f"Error precomputing pattern insight: {e}")
+        return None
+
+def get_pattern_insight(db=None) -> Optional[Dict[str, Any]]:
+    """Stored insight for the current generation, else the latest older one marked stale.
+
+    A current row without an insight (no client yet, or generation failed) counts as missing:
+    it's only returned, marked stale, when no older insight exists.
+    """
+    db = ensure_db_instance(db)
+    try:
+        generation = db.get_data_generation()
+        stored = db.get_pattern_insight(generation)
+        if not (stored and stored["insight"]):
+            stored = db.get_pattern_insight(with_insight=True) or stored or db.get_pattern_insight()
+        if stored:
+            stored["stale"] = stored["generation"] != generation or not stored["insight"]
+        return stored
+    except Exception as e:
+        logger.error(f"Error loading pattern insight: {e}")
+        return None
+
+class InsightWorker:
+    """Daemon thread that precomputes pattern insights for databases that were written to."""
+    def __init__(self, complete_factory: Callable[[], Optional[Callable[..., str]]],
+                 debounce: float = DEBOUNCE_SECONDS):
+        self.complete_factory = complete_factory
+        self.debounce = debounce
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def notify(self, db_path: str) -> None:
+        """Write listener: schedule a precompute for the database at db_path."""
+        self._queue.put(db_path)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="insight-worker", daemon=True)
+                self._thread.start()
+
+    def process(self, db_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            complete = self.complete_factory()
+        except Exception as e:
+            logger.error(f"Insight worker could not get a client: {e}")
+            complete = None
+        return compute_pattern_insight(CoachDatabase(db_path), complete)
+
+    def _run(self) -> None:
+        while True:
+            pending = [self._queue.get()]
+            # Coalesce bursts of writes into one computation per database
+            deadline = time.monotonic() + self.debounce
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            for db_path in dict.fromkeys(pending):
+                self.process(db_path)
+            for _ in pending:
+                self._queue.task_done()
+
+    def join(self) -> None:
+        """Block until every notified write has been processed."""
+        self._queue.join()
+
+_worker: Optional[InsightWorker] = None
+_worker_lock = threading.Lock()
+
+def _coach_complete() -> Optional[Callable[..., str]]:
+    # Imported here to keep the worker usable without the OpenAI stack (e.g. in tests)
+    from coach_core.ai import get_coach
+    coach = get_coach()
+    return coach.complete if coach.client else None
+
+def start_insight_worker() -> InsightWorker:
+    """Register the precompute worker as a write listener once per process and catch up on the current data."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = InsightWorker(_coach_complete)
+            add_write_listener(_worker.notify)
+            _worker.notify(DATABASE_PATH)
+        return _worker
+
+def request_pattern_insight(db_path: str = DATABASE_PATH) -> None:
+    """Ask the worker to (re)compute the insight, e.g. when the page finds none for the current data."""
+    start_insight_worker().notify(db_path)
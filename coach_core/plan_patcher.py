@@ -0,0 +1,215 @@
+"""
+Incremental weekly plan adjustment from feedback.
+
+Instead of regenerating all seven days, classified feedback is applied to the
+stored structured plan with local rules: regress or progress volume, turn the
+next training day into recovery, or swap shoulder-loading exercises. Only the
+days the rules could not finish (shoulder exercises without a known
+substitute) are sent to the LLM, as a small diff prompt containing just those
+days.
+"""
+import copy
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from coach_core.intents import INJURY_CONCERN, NEEDS_PROGRESSION, NEEDS_REGRESSION, RECOVERY_NEEDED
+from coach_core.plans import DAY_SCHEMA, PlanValidationError, format_exercise, normalize_day, parse_json_object, validate
+from coach_core.prompts import PLAN_PATCH_SYSTEM_PROMPT, build_plan_patch_prompt
+
+logger = logging.getLogger(__name__)
+
+REGRESS_FACTOR = 0.8
+PROGRESS_FACTOR = 1.2
+MAX_SETS = 10
+
+# (keywords, substitute) for shoulder-loading exercises; first match wins
+SHOULDER_SWAPS = [
+    (("handstand", "pike", "press", "push-up", "push up", "pushup", "dip"),
+     {"name": "Hollow body hold", "reps": "30s", "tempo": "", "notes": "Swapped to spare the shoulder"}),
+    (("pull-up", "pull up", "pullup", "chin-up", "chin up", "muscle-up", "muscle up", "hang"),
+     {"name": "Single-leg Romanian deadlift", "reps": "8-10", "tempo": "3-1-1-0", "notes": "Swapped to spare the shoulder"}),
+]
+
+RECOVERY_ROUTINE = [
+    {"name": "Easy walk", "sets": 1, "reps": "20-30min", "tempo": "", "rest_seconds": None, "notes": "", "shoulder_load": False},
+    {"name": "Hip and thoracic mobility flow", "sets": 1, "reps": "10min", "tempo": "", "rest_seconds": None, "notes": "", "shoulder_load": False},
+]
+
+_REPS = re.compile(r"^\s*(\d+)(?:\s*-\s*(\d+))?(.*)$")
+
+def scale_reps(reps: str, factor: float) -> str:
+    """Scale a reps string such as "8-10", "12" or "30s"; unparseable values are returned unchanged."""
+    match = _REPS.match(reps or "")
+    if not match:
+        return reps
+    low, high, suffix = match.groups()
+    scaled = [str(max(1, round(int(n) * factor))) for n in (low, high) if n]
+    return "-".join(scaled) + suffix
+
+def find_swap(name: str) -> Optional[Dict[str, Any]]:
+    lowered = name.lower()
+    for keywords, substitute in SHOULDER_SWAPS:
+        if any(keyword in lowered for keyword in keywords):
+            return substitute
+    return None
+
+class PlanPatcher:
+    """Apply classified feedback to a structured plan, refining only unresolved days with the LLM."""
+    def __init__(self, complete: Optional[Callable[..., str]] = None):
+        # complete(messages, **kwargs) -> str, e.g. AICoach.complete; None keeps patching fully local
+        self.complete = complete
+
+    def _regress(self, day: Dict[str, Any], changes: List[str]) -> bool:
+        changed = False
+        for ex in day["exercises"]:
+            before = format_exercise(ex)
+            if ex["sets"] > 2:
+                ex["sets"] -= 1
+            else:
+                ex["reps"] = scale_reps(ex["reps"], REGRESS_FACTOR)
+            if format_exercise(ex) != before:
+                changes.append(f"{day['day']}: {before} → {ex['sets']} × {ex['reps']}")
+                changed = True
+        return changed
+
+    def _progress(self, day: Dict[str, Any], changes: List[str]) -> bool:
+        changed = False
+        for ex in day["exercises"]:
+            before = format_exercise(ex)
+            reps = scale_reps(ex["reps"], PROGRESS_FACTOR)
+            if reps != ex["reps"]:
+                ex["reps"] = reps
+            elif ex["sets"] < MAX_SETS:
+                ex["sets"] += 1
+            if format_exercise(ex) != before:
+                changes.append(f"{day['day']}: {before} → {ex['sets']} × {ex['reps']}")
+                changed = True
+        return changed
+
+    def _spare_shoulder(self, day: Dict[str, Any], changes: List[str], unresolved: List[Dict[str, Any]]) -> bool:
+        changed = False
+        for i, ex in enumerate(day["exercises"]):
+            if not ex["shoulder_load"]:
+                continue
+            substitute = find_swap(ex["name"])
+            if substitute is None:
+                unresolved.append({"day": day["day"], "exercise": ex["name"]})
+                continue
+            day["exercises"][i] = {**ex, **substitute, "shoulder_load": False}
+            changes.append(f"{day['day']}: {ex['name']} → {substitute['name']}")
+            changed = True
+        return changed
+
+    def _recover(self, day: Dict[str, Any], changes: List[str]) -> bool:
+        day["type"] = "recovery"
+        day["focus"] = "Active recovery"
+        day["exercises"] = copy.deepcopy(RECOVERY_ROUTINE)
+        changes.append(f"{day['day']}: training → active recovery")
+        return True
+
+    def _describe(self, before: Dict[str, Any], after: Dict[str, Any]) -> List[str]:
+        """Change lines for a day rewritten by the LLM, relative to the day before patching."""
+        old = [ex["name"] for ex in before["exercises"]]
+        new = [ex["name"] for ex in after["exercises"]]
+        lines = [f"{after['day']}: removed {name}" for name in old if name not in new]
+        lines += [f"{after['day']}: added {name}" for name in new if name not in old]
+        return lines
+
+    def _safe(self, day: Dict[str, Any], unresolved: List[Dict[str, Any]]) -> bool:
+        """Whether a rewritten day dropped every unresolved exercise and loads no shoulder exercise."""
+        leftover = {item["exercise"].lower() for item in unresolved if item["day"] == day["day"]}
+        return not any(ex["shoulder_load"] or ex["name"].lower() in leftover for ex in day["exercises"])
+
+    def _refine(self, plan: Dict[str, Any], original: Dict[str, Any], day_names: Sequence[str], feedback: str,
+                feedback_type: str, unresolved: List[Dict[str, Any]], changes: List[str]) -> List[str]:
+        """Ask the LLM to rewrite only the given days; returns the days it replaced.
+
+        A replaced day's rule-based change lines are rebuilt against the original day, since
+        the rewrite may have kept or undone those swaps.
+        """
+        days = [day for day in plan["days"] if day["day"] in day_names]
+        messages = [
+            {"role": "system", "content": PLAN_PATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": build_plan_patch_prompt(
+                json.dumps({"days": days}), feedback, feedback_type,
+                [f"{item['day']}: {item['exercise']}" for item in unresolved]
+            )}
+        ]
+        try:
+            response = parse_json_object(self.complete(messages, response_format={"type": "json_object"}))
+            returned = response.get("days") if isinstance(response, dict) else None
+            if not isinstance(returned, list):
+                raise PlanValidationError(["$.days: required"])
+        except Exception as e:
+            logger.error(f"Plan patch refinement failed, keeping rule-based changes: {e}")
+            return []
+
+        replaced = []
+        index = {day["day"]: i for i, day in enumerate(plan["days"])}
+        for day in returned:
+            errors = validate(day, DAY_SCHEMA)
+            if errors or day["day"] not in day_names:
+                logger.warning(f"Ignoring patched day: {'; '.join(errors) or day.get('day')}")
+                continue
+            day = normalize_day(day)
+            if not self._safe(day, unresolved):
+                logger.warning(f"Ignoring patched {day['day']}: it still loads the shoulder")
+                continue
+            plan["days"][index[day["day"]]] = day
+            prefix = f"{day['day']}: "
+            changes[:] = [line for line in changes if not line.startswith(prefix)]
+            changes.extend(self._describe(original["days"][index[day["day"]]], day)
+                           or [f"{prefix}adjusted for {feedback_type.replace('_', ' ')}"])
+            replaced.append(day["day"])
+        return replaced
+
+    def patch(self, plan: Dict[str, Any], feedback_type: str, feedback: str = "",
+              start_day: int = 0) -> Dict[str, Any]:
+        """Apply feedback to the days from start_day (Monday = 0) onwards.
+
+        Returns {"plan", "days" (changed day names), "changes" (one line each), "refined" (days rewritten by the LLM)}.
+        """
+        original, plan = plan, copy.deepcopy(plan)
+        changes: List[str] = []
+        changed_days: List[str] = []
+        unresolved: List[Dict[str, Any]] = []
+        upcoming = [day for day in plan["days"][start_day:] if day["type"] == "training" and day["exercises"]]
+
+        if feedback_type == RECOVERY_NEEDED:
+            upcoming = upcoming[:1]
+        for day in upcoming:
+            if feedback_type == NEEDS_REGRESSION:
+                changed = self._regress(day, changes)
+            elif feedback_type == NEEDS_PROGRESSION:
+                changed = self._progress(day, changes)
+            elif feedback_type == INJURY_CONCERN:
+                changed = self._spare_shoulder(day, changes, unresolved)
+            elif feedback_type == RECOVERY_NEEDED:
+                changed = self._recover(day, changes)
+            else:
+                changed = False
+            if changed:
+                changed_days.append(day["day"])
+
+        refined: List[str] = []
+        pending = sorted({item["day"] for item in unresolved}, key=[d["day"] for d in plan["days"]].index)
+        if pending and self.complete is not None:
+            refined = self._refine(plan, original, pending, feedback, feedback_type, unresolved, changes)
+        for name in pending:
+            if name not in refined:
+                # No LLM (or it failed): drop what the rules could not make shoulder-safe
+                day = next(d for d in plan["days"] if d["day"] == name)
+                dropped = [ex["name"] for ex in day["exercises"] if ex["shoulder_load"]]
+                day["exercises"] = [ex for ex in day["exercises"] if not ex["shoulder_load"]]
+                changes.extend(f"{name}: removed {exercise}" for exercise in dropped)
+
+        changed_days.extend(name for name in pending if name not in changed_days)
+        order = [d["day"] for d in plan["days"]]
+        return {
+            "plan": plan,
+            "days": sorted(changed_days, key=order.index),
+            "changes": changes,
+            "refined": refined,
+        }
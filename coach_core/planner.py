@@ -0,0 +1,299 @@
+"""
+Weekly plan and Sunday reflection precomputation.
+
+Plans and reflections are stored in the plans table keyed by week (the
+Monday's date) and data generation. A stored result for the current
+generation is served instantly; it is only regenerated when the logs or
+profile changed. An in-process scheduler generates next week's plan and this
+week's reflection ahead of time from Saturday evening onwards.
+
+Weekly plans are requested as JSON and stored structured (see plans), with
+their markdown rendering as the content; a response that fails validation
+gets one repair request before falling back to a free-text plan. Feedback
+patches the stored plan in place of a full regeneration (see plan_patcher).
+"""
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from coach_core.context import build_context
+from coach_core.data import ensure_db_instance, get_data_generation
+from coach_core.limiter import RateLimited
+from coach_core.plan_patcher import PlanPatcher
+from coach_core.plans import PLAN_SCHEMA, PlanValidationError, normalize_plan, parse_plan, render_plan, validate
+from coach_core.prompts import (
+    build_movement_plan_prompt, build_reflection_prompt, build_structured_plan_prompt,
+    MOVEMENT_PLAN_SYSTEM_PROMPT, REFLECTION_SYSTEM_PROMPT, STRUCTURED_PLAN_SYSTEM_PROMPT
+)
+from coach_core.routing import WEEKLY_PLAN, REFLECTION, PLAN_PATCH
+from coach_core.transcripts import TranscriptStore
+
+logger = logging.getLogger(__name__)
+
+PRECOMPUTE_WEEKDAY = 5  # Saturday
+PRECOMPUTE_HOUR = int(os.getenv("COACH_PRECOMPUTE_HOUR", "20"))
+SCHEDULER_INTERVAL_SECONDS = float(os.getenv("COACH_SCHEDULER_INTERVAL", str(15 * 60)))
+# JSON plans are more verbose than the free-text plan the WEEKLY_PLAN route is sized for
+STRUCTURED_PLAN_MAX_TOKENS = 1500
+JSON_RESPONSE = {"type": "json_object"}
+RATE_LIMITED_MESSAGE = "The coach is handling a lot of requests right now. Please try again in a minute! 💪"
+
+def week_start(day: date) -> date:
+    """Monday of the week containing day."""
+    return day - timedelta(days=day.weekday())
+
+def week_key(day: date) -> str:
+    return week_start(day).isoformat()
+
+def in_precompute_window(now: datetime) -> bool:
+    """Saturday evening and all of Sunday, when next week's plan is due."""
+    return now.weekday() > PRECOMPUTE_WEEKDAY or (now.weekday() == PRECOMPUTE_WEEKDAY and now.hour >= PRECOMPUTE_HOUR)
+
+def plan_week(now: datetime) -> str:
+    """Week a plan request is for: next week once the weekend window opens, otherwise this week."""
+    if in_precompute_window(now):
+        return week_key(now.date() + timedelta(days=7))
+    return week_key(now.date())
+
+def reflection_week(now: datetime) -> str:
+    return week_key(now.date())
+
+class Planner:
+    """Serve weekly plans and reflections from storage, generating them when missing or stale."""
+    def __init__(self, coach: Any, db=None, now: Callable[[], datetime] = datetime.now):
+        self.coach = coach
+        self.db = ensure_db_instance(db)
+        self.now = now
+        self.transcripts = TranscriptStore(self.db, now=now)
+
+    def _messages(self, kind: str, feedback: Optional[str] = None) -> List[Dict[str, str]]:
+        if kind == WEEKLY_PLAN:
+            context = build_context(self.coach.profile, self.coach.logs, max_logs=7)
+            return [
+                {"role": "system", "content": MOVEMENT_PLAN_SYSTEM_PROMPT},
+                {"role": "user", "content": build_movement_plan_prompt(context)}
+            ]
+        extra = {"RECENT FEEDBACK": feedback} if feedback else None
+        context = build_context(self.coach.profile, self.coach.logs, max_logs=7, extra=extra)
+        return [
+            {"role": "system", "content": REFLECTION_SYSTEM_PROMPT},
+            {"role": "user", "content": build_reflection_prompt(context)}
+        ]
+
+    def _structured_messages(self) -> List[Dict[str, str]]:
+        context = build_context(self.coach.profile, self.coach.logs, max_logs=7)
+        return [
+            {"role": "system", "content": STRUCTURED_PLAN_SYSTEM_PROMPT},
+            {"role": "user", "content": build_structured_plan_prompt(context)}
+        ]
+
+    def _week(self, kind: str) -> str:
+        return plan_week(self.now()) if kind == WEEKLY_PLAN else reflection_week(self.now())
+
+    def stored(self, kind: str, week: Optional[str] = None, current_only: bool = True) -> Optional[Dict[str, Any]]:
+        """Stored plan for the week; with current_only, only if it matches the current data generation.
+
+        Structured plans carry their days and exercises under "plan" (None for text plans).
+        """
+        generation = get_data_generation(self.db) if current_only else None
+        try:
+            row = self.db.get_plan(week or self._week(kind), kind, generation)
+            if row:
+                row["plan"] = self.db.get_structured_plan(row["id"]) if row.get("structured") else None
+            return row
+        except Exception as e:
+            logger.error(f"Error loading stored {kind}: {e}")
+            return None
+
+    def _complete_plan(self, bypass_cache: bool) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Generate a structured weekly plan; returns its rendering and the plan (None for a text fallback)."""
+        feature = "weekly_coach_plan"
+        messages = self._structured_messages()
+        response = self.coach.complete(
+            messages, kind=WEEKLY_PLAN, feature=feature, bypass_cache=bypass_cache,
+            max_tokens=STRUCTURED_PLAN_MAX_TOKENS, response_format=JSON_RESPONSE
+        )
+        try:
+            plan = parse_plan(response)
+        except PlanValidationError as e:
+            logger.warning(f"Structured plan failed validation, asking for a repair: {e}")
+            repair = messages + [
+                {"role": "assistant", "content": response or ""},
+                {"role": "user", "content": f"That JSON is invalid: {e}. Reply with the corrected JSON object only."}
+            ]
+            try:
+                plan = parse_plan(self.coach.complete(
+                    repair, kind=WEEKLY_PLAN, feature=feature, bypass_cache=True,
+                    max_tokens=STRUCTURED_PLAN_MAX_TOKENS, response_format=JSON_RESPONSE
+                ))
+            except PlanValidationError as e:
+                logger.error(f"Structured plan repair failed, falling back to a text plan: {e}")
+                content = self.coach.complete(
+                    self._messages(WEEKLY_PLAN), kind=WEEKLY_PLAN, feature=feature, bypass_cache=bypass_cache
+                )
+                return content, None
+        return render_plan(plan), plan
+
+    def get(self, kind: str, week: Optional[str] = None, bypass_cache: bool = False,
+            feedback: Optional[str] = None) -> str:
+        """Stored result for the current data generation, or a freshly generated (and stored) one.
+
+        Reflections that include session feedback are generated live and not stored. When the
+        rate limiter refuses the request, the latest stored result for the week (from any data
+        generation) is served instead, or a short try-again message.
+        """
+        week = week or self._week(kind)
+        generation = get_data_generation(self.db)
+        if not bypass_cache and not feedback:
+            stored = self.stored(kind, week)
+            if stored:
+                return stored["content"]
+
+        plan = None
+        try:
+            if kind == WEEKLY_PLAN:
+                content, plan = self._complete_plan(bypass_cache)
+            else:
+                content = self.coach.complete(
+                    self._messages(kind, feedback),
+                    kind=kind,
+                    feature="weekly_coach_reflection",
+                    bypass_cache=bypass_cache
+                )
+        except RateLimited as e:
+            logger.warning(f"{kind} request rate limited: {e}")
+            previous = self.stored(kind, week, current_only=False)
+            return previous["content"] if previous else RATE_LIMITED_MESSAGE
+        if content and not feedback:
+            try:
+                self.db.save_plan(week, kind, generation, content, plan)
+            except Exception as e:
+                logger.error(f"Error storing {kind}: {e}")
+        # Plans are infrequent, so they're archived right away
+        meta = {"week": week, "feedback": feedback} if feedback else {"week": week}
+        self.transcripts.record(kind, "assistant", content, meta, flush=True)
+        return content
+
+    def edit(self, plan_id: int, plan: Dict[str, Any]) -> str:
+        """Validate and store a manually edited structured plan in place; returns its new rendering."""
+        errors = validate(plan, PLAN_SCHEMA)
+        if errors:
+            raise PlanValidationError(errors)
+        plan = normalize_plan(plan)
+        content = render_plan(plan)
+        if not self.db.update_structured_plan(plan_id, plan, content):
+            raise KeyError(f"Plan {plan_id} not found")
+        return content
+
+    def adjust(self, feedback_type: str, feedback: str = "") -> Optional[Dict[str, Any]]:
+        """Patch this week's stored structured plan for feedback instead of regenerating it.
+
+        Only days from today onwards change. The patched plan is stored for the current data
+        generation so the next plan request serves it. Returns the patch result (see
+        PlanPatcher.patch) with its rendered "content", or None without a structured plan.
+        """
+        stored = self.stored(WEEKLY_PLAN, current_only=False)
+        if not stored or not stored.get("plan"):
+            return None
+
+        today = self.now().date()
+        start_day = today.weekday() if stored["week"] == week_key(today) else 0
+
+        def complete(messages: List[Dict[str, str]], **kwargs) -> str:
+            return self.coach.complete(messages, kind=PLAN_PATCH, feature="weekly_coach_plan_patch", **kwargs)
+
+        patcher = PlanPatcher(complete if self.coach.client else None)
+        result = patcher.patch(stored["plan"], feedback_type, feedback, start_day)
+        result["content"] = stored["content"]
+        if result["days"]:
+            result["content"] = render_plan(result["plan"])
+            try:
+                # A new revision, so the pre-feedback plan stays available to compare against
+                self.db.save_plan(stored["week"], WEEKLY_PLAN, get_data_generation(self.db),
+                                  result["content"], result["plan"], keep_previous=True)
+            except Exception as e:
+                logger.error(f"Error storing adjusted plan: {e}")
+            self.transcripts.record(WEEKLY_PLAN, "assistant", result["content"],
+                                    {"week": stored["week"], "feedback_type": feedback_type, "feedback": feedback},
+                                    flush=True)
+        return result
+
+    def weekly_plan(self, bypass_cache: bool = False) -> str:
+        return self.get(WEEKLY_PLAN, bypass_cache=bypass_cache)
+
+    def reflection(self, bypass_cache: bool = False, feedback: Optional[str] = None) -> str:
+        return self.get(REFLECTION, bypass_cache=bypass_cache, feedback=feedback)
+
+    def precompute(self) -> List[str]:
+        """Generate next week's plan and this week's reflection if due and not already current."""
+        now = self.now()
+        if not in_precompute_window(now):
+            return []
+        generated = []
+        for kind in (WEEKLY_PLAN, REFLECTION):
+            if self.stored(kind) is None:
+                print(f"🗓️ Precomputing {kind.replace('_', ' ')} for week of {self._week(kind)}")
+                self.get(kind)
+                generated.append(kind)
+        return generated
+
+class PlanScheduler:
+    """Daemon thread that runs Planner.precompute on an interval."""
+    def __init__(self, planner_factory: Callable[[], Planner], interval: float = SCHEDULER_INTERVAL_SECONDS):
+        self.planner_factory = planner_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def tick(self) -> List[str]:
+        try:
+            planner = self.planner_factory()
+            if planner is None:
+                return []
+            return planner.precompute()
+        except Exception as e:
+            logger.error(f"Plan precompute failed: {e}")
+            return []
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="plan-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+_planner: Optional[Planner] = None
+_scheduler: Optional[PlanScheduler] = None
+_lock = threading.Lock()
+
+def get_planner() -> Planner:
+    """Process-wide planner backed by the shared AICoach."""
+    global _planner
+    if _planner is None:
+        # Imported here to keep the planner usable without the OpenAI stack (e.g. in tests)
+        from coach_core.ai import get_coach
+        _planner = Planner(get_coach())
+    return _planner
+
+def _scheduled_planner() -> Optional[Planner]:
+    planner = get_planner()
+    # Nothing to precompute without an API key
+    return planner if planner.coach.client else None
+
+def start_scheduler() -> PlanScheduler:
+    """Start the background precompute scheduler once per process."""
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = PlanScheduler(_scheduled_planner)
+        _scheduler.start()
+        return _scheduler
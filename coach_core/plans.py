@@ -0,0 +1,217 @@
+"""
+Structured weekly plans.
+
+Plans are requested as JSON (days -> exercises -> sets/reps/tempo), parsed and
+validated against PLAN_SCHEMA, then stored in normalized tables so they can be
+shown, compared and edited without another LLM call. The validator supports the
+small JSON-schema subset the plan schema uses.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_TYPES = ["training", "mobility", "recovery", "rest"]
+
+EXERCISE_SCHEMA = {
+    "type": "object",
+    "required": ["name", "sets", "reps"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "sets": {"type": "integer", "minimum": 1, "maximum": 10},
+        "reps": {"type": "string", "minLength": 1},
+        "tempo": {"type": "string"},
+        "rest_seconds": {"type": "integer", "minimum": 0, "maximum": 600},
+        "notes": {"type": "string"},
+        "shoulder_load": {"type": "boolean"},
+    },
+}
+
+DAY_SCHEMA = {
+    "type": "object",
+    "required": ["day", "type", "exercises"],
+    "properties": {
+        "day": {"type": "string", "enum": DAYS},
+        "focus": {"type": "string"},
+        "type": {"type": "string", "enum": DAY_TYPES},
+        "exercises": {"type": "array", "maxItems": 12, "items": EXERCISE_SCHEMA},
+    },
+}
+
+PLAN_SCHEMA = {
+    "type": "object",
+    "required": ["days"],
+    "properties": {
+        "focus": {"type": "string"},
+        "notes": {"type": "string"},
+        "days": {"type": "array", "minItems": 7, "maxItems": 7, "items": DAY_SCHEMA},
+    },
+}
+
+# Example shown to the model alongside the schema
+PLAN_EXAMPLE = {
+    "focus": "Pulling strength and hip mobility",
+    "notes": "Keep pressing pain-free",
+    "days": [{
+        "day": "Monday", "focus": "Pull + core", "type": "training",
+        "exercises": [{"name": "Ring rows", "sets": 3, "reps": "8-10", "tempo": "3-1-1-0",
+                       "rest_seconds": 90, "notes": "", "shoulder_load": False}],
+    }],
+}
+
+class PlanValidationError(ValueError):
+    """Raised when a model response is not a valid structured plan."""
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors[:5]))
+        self.errors = errors
+
+_TYPES = {"object": dict, "array": list, "string": str, "boolean": bool}
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Validate value against a JSON-schema subset; returns a list of error messages."""
+    kind = schema.get("type")
+    if kind == "integer":
+        if isinstance(value, bool) or not isinstance(value, int):
+            return [f"{path}: expected integer"]
+    elif kind and not isinstance(value, _TYPES[kind]):
+        return [f"{path}: expected {kind}"]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: must be one of {', '.join(map(str, schema['enum']))}")
+    if "minimum" in schema and value < schema["minimum"]:
+        errors.append(f"{path}: must be >= {schema['minimum']}")
+    if "maximum" in schema and value > schema["maximum"]:
+        errors.append(f"{path}: must be <= {schema['maximum']}")
+    if "minLength" in schema and len(value.strip()) < schema["minLength"]:
+        errors.append(f"{path}: must not be empty")
+    if kind == "object":
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key}: required")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value and (value[key] is not None or key in schema.get("required", [])):
+                errors.extend(validate(value[key], subschema, f"{path}.{key}"))
+    if kind == "array":
+        if "minItems" in schema and len(value) < schema["minItems"]:
+            errors.append(f"{path}: needs at least {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append(f"{path}: allows at most {schema['maxItems']} items")
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema.get("items", {}), f"{path}[{i}]"))
+    return errors
+
+def normalize_day(day: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill a day's optional fields with defaults."""
+    return {
+        "day": day["day"],
+        "focus": day.get("focus") or "",
+        "type": day["type"],
+        "exercises": [{
+            "name": ex["name"].strip(),
+            "sets": ex["sets"],
+            "reps": ex["reps"],
+            "tempo": ex.get("tempo") or "",
+            "rest_seconds": ex.get("rest_seconds"),
+            "notes": ex.get("notes") or "",
+            "shoulder_load": bool(ex.get("shoulder_load", False)),
+        } for ex in day["exercises"]],
+    }
+
+def normalize_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill optional fields with defaults and order days Monday to Sunday."""
+    days = sorted(plan["days"], key=lambda d: DAYS.index(d["day"]))
+    return {
+        "focus": plan.get("focus") or "",
+        "notes": plan.get("notes") or "",
+        "days": [normalize_day(day) for day in days],
+    }
+
+def parse_json_object(text: str) -> Any:
+    """Extract the JSON object from a model response, or raise PlanValidationError."""
+    # Tolerate markdown code fences around the JSON
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        raise PlanValidationError(["response contains no JSON object"])
+    try:
+        return json.loads(match.group(0))
+    except ValueError as e:
+        raise PlanValidationError([f"invalid JSON: {e}"])
+
+def parse_plan(text: str) -> Dict[str, Any]:
+    """Parse and validate a model response into a normalized plan, or raise PlanValidationError."""
+    plan = parse_json_object(text)
+    errors = validate(plan, PLAN_SCHEMA)
+    if not errors and sorted(d["day"] for d in plan["days"]) != sorted(DAYS):
+        errors.append("$.days: each day of the week must appear exactly once")
+    if errors:
+        raise PlanValidationError(errors)
+    return normalize_plan(plan)
+
+def format_exercise(exercise: Dict[str, Any]) -> str:
+    line = f"{exercise['name']}: {exercise['sets']} × {exercise['reps']}"
+    if exercise.get("tempo"):
+        line += f" @ {exercise['tempo']}"
+    if exercise.get("rest_seconds"):
+        line += f", rest {exercise['rest_seconds']}s"
+    if exercise.get("notes"):
+        line += f" ({exercise['notes']})"
+    return line
+
+def render_day(day: Dict[str, Any]) -> str:
+    lines = [f"**{day['day']} - {day['focus'] or day['type'].title()}** ({day['type']})"]
+    lines.extend(f"- {format_exercise(ex)}" for ex in day["exercises"])
+    return "\n".join(lines)
+
+def render_plan(plan: Dict[str, Any]) -> str:
+    """Markdown rendering of a structured plan."""
+    sections = []
+    if plan.get("focus"):
+        sections.append(f"**Focus:** {plan['focus']}")
+    sections.extend(render_day(day) for day in plan["days"])
+    if plan.get("notes"):
+        sections.append(f"**Notes:** {plan['notes']}")
+    return "\n\n".join(sections)
+
+def plan_rows(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a plan into one row per exercise (for tables and editing)."""
+    return [
+        {"day": day["day"], "position": position, **exercise}
+        for day in plan["days"]
+        for position, exercise in enumerate(day["exercises"])
+    ]
+
+def diff_plans(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> List[str]:
+    """Days whose exercises or type differ between two plans."""
+    if old is None:
+        return [day["day"] for day in new["days"]]
+    old_days = {day["day"]: day for day in old["days"]}
+    changed = []
+    for day in new["days"]:
+        before = old_days.get(day["day"])
+        if before is None or (before["type"], before["exercises"]) != (day["type"], day["exercises"]):
+            changed.append(day["day"])
+    return changed
+
+def plan_from_rows(plan: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rebuild a plan from edited exercise rows, keeping the plan's day types and focus."""
+    def number(value: Any) -> Optional[int]:
+        # Table editors hand back floats and NaN for empty cells
+        if value is None or value != value or value == "":
+            return None
+        return int(value)
+
+    exercises: Dict[str, List[Dict[str, Any]]] = {day["day"]: [] for day in plan["days"]}
+    for row in sorted(rows, key=lambda r: number(r.get("position")) or 0):
+        if not str(row.get("name") or "").strip() or row.get("day") not in exercises:
+            continue
+        exercises[row["day"]].append({
+            "name": str(row["name"]).strip(),
+            "sets": number(row.get("sets")),
+            "reps": str(row.get("reps") or ""),
+            "tempo": row.get("tempo") or "",
+            "rest_seconds": number(row.get("rest_seconds")),
+            "notes": row.get("notes") or "",
+            "shoulder_load": bool(row.get("shoulder_load")),
+        })
+    return {**plan, "days": [{**day, "exercises": exercises[day["day"]]} for day in plan["days"]]}
@@ -0,0 +1,273 @@
+"""
+Prompt templates for the AI coach.
+
+The static parts of every prompt (coaching persona and mentor sections) are
+compiled on first use, keyed by the knowledge pack version. Only the dynamic
+user context is interpolated per request.
+"""
+import json
+from typing import Dict, Optional, Sequence
+from coach_core.mentor_brain import get_all_mentors_context, get_knowledge_version
+from coach_core.plans import DAY_TYPES, PLAN_EXAMPLE
+
+SYSTEM_PROMPT_HEADER = """You are Yoel's personal AI fitness coach, trained by the world's greatest minds in movement, strength, and performance.
+
+You have access to the knowledge and philosophies of these mentors:
+"""
+
+SYSTEM_PROMPT_FOOTER = """YOUR COACHING APPROACH:
+- Synthesize the best insights from all mentors based on Yoel's specific needs
+- Be encouraging, knowledgeable, and personalized
+- Consider his injuries (shoulder issues, knee is fine now)
+- Focus on his goals (calisthenics, yoga, athletic performance)
+- Provide actionable, specific advice
+- Ask follow-up questions to understand his needs better
+- Be conversational and supportive like a real coach
+
+YOUR PERSONALITY:
+- Wise and knowledgeable like Dr. Andy Galpin
+- Encouraging and patient like Patrick Beach
+- Direct and motivating like Everydamnandré
+- Safety-focused like SquatU
+- Longevity-minded like KneesOverToesGuy
+- Movement-focused like Ido Portal
+
+Always provide specific, actionable advice that combines the best insights from these mentors."""
+
+MENTOR_SECTION_TEMPLATE = """
+{name} - {focus}:
+Philosophy: {philosophy}
+Key Principles: {principles}
+Training Methods: {methods}
+Motivational Style: {style}
+"""
+
+USER_CONTEXT_TEMPLATE = """
+{context}
+
+YOEL'S QUESTION/REQUEST:
+{question}
+
+Respond as Yoel's mentor-powered AI coach, drawing from the wisdom of the world's best movement and strength minds:"""
+
+WEEKLY_PLAN_SYSTEM_PROMPT = "You are a master coach synthesizing the world's best training methods. Create specific, actionable weekly plans."
+
+WEEKLY_PLAN_TEMPLATE = """Create a weekly training plan for Yoel that synthesizes the best approaches from our mentors:
+
+{context}
+
+Create a 7-day plan that:
+1. Blends Dylan Werner's isometric control with Patrick Beach's fluid movement
+2. Incorporates SquatU's joint safety and KneesOverToesGuy's bulletproofing
+3. Uses Everydamnandré's simplicity and mental toughness
+4. Includes Ido Portal's movement complexity and adaptability
+5. Focuses on Yoel's calisthenics and yoga preferences
+6. Considers his shoulder issues and current energy levels
+7. Provides specific exercises, sets, reps, and progression
+
+Format as a clear, actionable weekly plan."""
+
+SUMMARY_SYSTEM_PROMPT = "You summarize coaching chats. Keep facts about Yoel's training, injuries, goals, preferences and any advice or commitments. Be concise."
+
+SUMMARY_TEMPLATE = """Previous summary:
+{previous}
+
+New conversation turns:
+{transcript}
+
+Write an updated summary in under 120 words."""
+
+MOVEMENT_PLAN_SYSTEM_PROMPT = "You are a movement-focused coach. Create specific, actionable weekly training plans focused only on movement, strength, and mobility."
+
+MOVEMENT_PLAN_TEMPLATE = """Create a 7-day movement training plan for Yoel that focuses ONLY on movement, strength, and mobility (no nutrition).
+
+{context}
+
+Create a plan that:
+1. Focuses on calisthenics, yoga, and athletic movement
+2. Considers shoulder issues (avoid painful movements)
+3. Includes mobility and flexibility work
+4. Has 3-4 training days with active recovery
+5. Provides specific exercises and progressions
+6. Adapts to energy levels and recovery needs
+
+Format as a clear, actionable weekly plan with specific exercises."""
+
+STRUCTURED_PLAN_SYSTEM_PROMPT = MOVEMENT_PLAN_SYSTEM_PROMPT + " Reply with a single JSON object only."
+
+STRUCTURED_PLAN_TEMPLATE = """Create a 7-day movement training plan for Yoel that focuses ONLY on movement, strength, and mobility (no nutrition).
+
+{context}
+
+Create a plan that:
+1. Focuses on calisthenics, yoga, and athletic movement
+2. Considers shoulder issues (avoid painful movements)
+3. Includes mobility and flexibility work
+4. Has 3-4 training days with active recovery
+5. Provides specific exercises and progressions
+6. Adapts to energy levels and recovery needs
+
+Return JSON with keys "focus", "notes" and "days": exactly 7 days, Monday to Sunday. Each day has "day", "focus", "type" (one of {day_types}) and "exercises" (empty on rest days). Each exercise has "name", "sets" (integer), "reps" (string, e.g. "8-10" or "30s"), "tempo", "rest_seconds" (integer), "notes" and "shoulder_load" (true if it loads the shoulder overhead or in pressing).
+
+Example of the shape (one day shown):
+{example}"""
+
+PLAN_PATCH_SYSTEM_PROMPT = "You are a movement-focused coach adjusting a few days of an existing weekly plan. Change only what the feedback requires and reply with a single JSON object only."
+
+PLAN_PATCH_TEMPLATE = """Yoel's feedback ({feedback_type}): {feedback}
+
+These days of his current plan need adjusting:
+{days}
+
+Replace these exercises with shoulder-friendly alternatives (lower body, core or mobility), keeping similar volume:
+{exercises}
+
+Return JSON {{"days": [...]}} containing only the days above, in the same shape. Set "shoulder_load" to false for every replacement."""
+
+INSIGHT_BATCH_SYSTEM_PROMPT = "You are Yoel's AI coach. Give brief, helpful insights. Reply with a single JSON object only."
+
+INSIGHT_BATCH_TEMPLATE = """Yoel's profile:
+{profile}
+
+Daily logs (oldest first):
+{logs}
+
+For each of these dates, give a brief insight or suggestion for the following day, based on that day's log and the days before it: {dates}
+
+Return JSON {{"insights": [{{"date": "YYYY-MM-DD", "insight": "..."}}]}} with one entry per date, at most two sentences each."""
+
+PATTERN_INSIGHT_SYSTEM_PROMPT = "You are Yoel's AI coach. Provide specific, actionable insights."
+
+PATTERN_INSIGHT_TEMPLATE = """Based on this training data:
+{logs}
+
+Provide 3 specific insights about Yoel's training patterns and suggestions for improvement."""
+
+REFLECTION_SYSTEM_PROMPT = "You are a supportive movement coach doing a Sunday reflection. Be encouraging and specific."
+
+REFLECTION_TEMPLATE = """Generate a Sunday reflection for Yoel's movement training week.
+
+{context}
+
+Create a reflection that:
+1. Summarizes the week's training
+2. Acknowledges feedback and progress
+3. Identifies what worked and what didn't
+4. Suggests improvements for next week
+5. Maintains motivation and focus on movement goals
+
+Be encouraging, specific, and actionable."""
+
+PANEL_MENTOR_TEMPLATE = """{context}
+
+YOEL'S QUESTION/REQUEST:
+{question}
+
+Answer as {name} in under 120 words, giving the one or two points from your approach that matter most here:"""
+
+PANEL_SYNTHESIS_SYSTEM_PROMPT = "You are Yoel's head coach. Merge advice from several mentors into one clear, safe, actionable answer, resolving any disagreements and respecting his shoulder issues."
+
+PANEL_SYNTHESIS_TEMPLATE = """YOEL'S QUESTION/REQUEST:
+{question}
+
+MENTOR PANEL:
+{answers}
+
+Combine the panel's advice into one answer for Yoel in under 250 words, crediting mentors by name where it helps:"""
+
+# Compiled prompts, keyed by knowledge base version
+_compiled: Dict[str, Dict] = {}
+
+def compile_mentor_section(mentor: Dict) -> str:
+    """Render one mentor's prompt section."""
+    return MENTOR_SECTION_TEMPLATE.format(
+        name=mentor['name'],
+        focus=mentor['focus'],
+        philosophy=mentor['core_philosophy'],
+        principles=', '.join(mentor['key_principles'][:3]),
+        methods=', '.join(mentor['training_methods'][:3]),
+        style=mentor['motivational_style'],
+    )
+
+def _compile() -> Dict:
+    version = get_knowledge_version()
+    compiled = _compiled.get(version)
+    if compiled is None:
+        compiled = {
+            "sections": {mentor_id: compile_mentor_section(m) for mentor_id, m in get_all_mentors_context().items()},
+            "system_prompts": {},
+        }
+        _compiled.clear()
+        _compiled[version] = compiled
+    return compiled
+
+def get_mentor_context(mentor_ids: Optional[Sequence[str]] = None) -> str:
+    """Get the compiled mentor sections for the given mentors (all mentors by default)."""
+    sections = _compile()["sections"]
+    if mentor_ids is None:
+        mentor_ids = list(sections)
+    return "\n".join(sections[mentor_id] for mentor_id in mentor_ids if mentor_id in sections)
+
+def get_system_prompt(mentor_ids: Optional[Sequence[str]] = None) -> str:
+    """Get the mentor-powered system prompt, assembled once per mentor selection."""
+    compiled = _compile()
+    key = tuple(mentor_ids) if mentor_ids is not None else None
+    system_prompt = compiled["system_prompts"].get(key)
+    if system_prompt is None:
+        system_prompt = f"{SYSTEM_PROMPT_HEADER}\n{get_mentor_context(mentor_ids)}\n\n{SYSTEM_PROMPT_FOOTER}"
+        compiled["system_prompts"][key] = system_prompt
+    return system_prompt
+
+def build_user_context(context: str, question: str) -> str:
+    """Interpolate the per-request user context."""
+    return USER_CONTEXT_TEMPLATE.format(context=context, question=question)
+
+def build_weekly_plan_prompt(context: str) -> str:
+    """Interpolate the weekly planning request."""
+    return WEEKLY_PLAN_TEMPLATE.format(context=context)
+
+def build_summary_prompt(previous: str, transcript: str) -> str:
+    """Interpolate the rolling conversation summary request."""
+    return SUMMARY_TEMPLATE.format(previous=previous or "(none)", transcript=transcript)
+
+def build_movement_plan_prompt(context: str) -> str:
+    """Interpolate the context into the movement-only weekly plan request."""
+    return MOVEMENT_PLAN_TEMPLATE.format(context=context)
+
+def build_structured_plan_prompt(context: str) -> str:
+    """Interpolate the context into the JSON weekly plan request."""
+    return STRUCTURED_PLAN_TEMPLATE.format(
+        context=context,
+        day_types=", ".join(f'"{t}"' for t in DAY_TYPES),
+        example=json.dumps(PLAN_EXAMPLE)
+    )
+
+def build_plan_patch_prompt(days: str, feedback: str, feedback_type: str, exercises: Sequence[str]) -> str:
+    """Interpolate the days to patch (as JSON) and the feedback into the plan adjustment request."""
+    return PLAN_PATCH_TEMPLATE.format(
+        days=days,
+        feedback=feedback or "(no details)",
+        feedback_type=feedback_type.replace("_", " "),
+        exercises="\n".join(f"- {exercise}" for exercise in exercises)
+    )
+
+def build_insight_batch_prompt(profile: str, logs: str, dates: Sequence[str]) -> str:
+    """Interpolate a block of daily logs into the multi-day insight request."""
+    return INSIGHT_BATCH_TEMPLATE.format(profile=profile, logs=logs, dates=", ".join(dates))
+
+def build_pattern_insight_prompt(logs: str) -> str:
+    """Interpolate the recent logs table into the pattern insight request."""
+    return PATTERN_INSIGHT_TEMPLATE.format(logs=logs)
+
+def build_reflection_prompt(context: str) -> str:
+    """Interpolate the context into the Sunday reflection request."""
+    return REFLECTION_TEMPLATE.format(context=context)
+
+def build_panel_mentor_prompt(context: str, question: str, name: str) -> str:
+    """User message for one mentor on the panel."""
+    return PANEL_MENTOR_TEMPLATE.format(context=context, question=question, name=name)
+
+def build_panel_synthesis_prompt(question: str, answers: Dict[str, str]) -> str:
+    """Synthesis request over the panel's answers, keyed by mentor name."""
+    panel = "\n\n".join(f"{name}:\n{answer.strip()}" for name, answer in answers.items())
+    return PANEL_SYNTHESIS_TEMPLATE.format(question=question, answers=panel)
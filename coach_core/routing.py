@@ -0,0 +1,130 @@
+"""
+Latency-aware model routing.
+
+Each request kind maps to a model, token limit and temperature, so quick chats
+stay on a fast model while weekly plans get the larger one. The router tracks
+recent primary-model latency per kind (samples expire after an hour) and
+downgrades a kind to its fast model while its p95 is over that kind's latency
+budget. Downgraded kinds still probe the primary every few calls (or after a
+quiet spell) and switch back as soon as a probe comes in under budget.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from coach_core.transport import LatencyTracker
+
+FAST_MODEL = os.getenv("COACH_FAST_MODEL", "gpt-3.5-turbo")
+LARGE_MODEL = os.getenv("COACH_LARGE_MODEL", "gpt-4o")
+
+QUICK_CHAT = "quick_chat"
+DAILY_INSIGHT = "daily_insight"
+PATTERN_INSIGHT = "pattern_insight"
+WEEKLY_PLAN = "weekly_plan"
+REFLECTION = "reflection"
+SUMMARY = "summary"
+PANEL_MENTOR = "panel_mentor"
+PANEL_SYNTHESIS = "panel_synthesis"
+PLAN_PATCH = "plan_patch"
+INSIGHT_BATCH = "insight_batch"
+
+SAMPLE_MAX_AGE_SECONDS = float(os.getenv("COACH_ROUTER_SAMPLE_AGE", "3600"))
+PROBE_INTERVAL_SECONDS = float(os.getenv("COACH_ROUTER_PROBE_INTERVAL", "300"))
+
+# kind -> model, fallback model, generation params and p95 latency budget (seconds)
+ROUTES: Dict[str, Dict[str, Any]] = {
+    QUICK_CHAT: {"model": FAST_MODEL, "fast_model": FAST_MODEL, "max_tokens": 500, "temperature": 0.8, "latency_budget": 8.0},
+    DAILY_INSIGHT: {"model": FAST_MODEL, "fast_model": FAST_MODEL, "max_tokens": 150, "temperature": 0.7, "latency_budget": 5.0},
+    PATTERN_INSIGHT: {"model": FAST_MODEL, "fast_model": FAST_MODEL, "max_tokens": 200, "temperature": 0.7, "latency_budget": 6.0},
+    WEEKLY_PLAN: {"model": LARGE_MODEL, "fast_model": FAST_MODEL, "max_tokens": 800, "temperature": 0.7, "latency_budget": 25.0},
+    REFLECTION: {"model": LARGE_MODEL, "fast_model": FAST_MODEL, "max_tokens": 400, "temperature": 0.8, "latency_budget": 15.0},
+    SUMMARY: {"model": FAST_MODEL, "fast_model": FAST_MODEL, "max_tokens": 200, "temperature": 0.3, "latency_budget": 5.0},
+    PANEL_MENTOR: {"model": FAST_MODEL, "fast_model": FAST_MODEL, "max_tokens": 250, "temperature": 0.8, "latency_budget": 8.0},
+    PANEL_SYNTHESIS: {"model": FAST_MODEL, "fast_model": FAST_MODEL, "max_tokens": 450, "temperature": 0.7, "latency_budget": 10.0},
+    PLAN_PATCH: {"model": FAST_MODEL, "fast_model": FAST_MODEL, "max_tokens": 500, "temperature": 0.4, "latency_budget": 8.0},
+    INSIGHT_BATCH: {"model": FAST_MODEL, "fast_model": FAST_MODEL, "max_tokens": 3000, "temperature": 0.7, "latency_budget": 60.0},
+}
+
+class ModelRouter:
+    """Pick model and generation params per request kind from observed latency."""
+    def __init__(self, routes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 min_samples: int = 5, min_slow: int = 2, probe_every: int = 10,
+                 probe_interval: float = PROBE_INTERVAL_SECONDS, max_age: float = SAMPLE_MAX_AGE_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.routes = routes or ROUTES
+        self.min_samples = min_samples
+        self.min_slow = min_slow
+        self.probe_every = probe_every
+        self.probe_interval = probe_interval
+        self.max_age = max_age
+        self.clock = clock
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._degraded_calls: Dict[str, int] = {}
+        self._last_probe: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _tracker(self, kind: str) -> LatencyTracker:
+        with self._lock:
+            if kind not in self._latency:
+                self._latency[kind] = LatencyTracker(window=50, max_age=self.max_age, clock=self.clock)
+            return self._latency[kind]
+
+    def record(self, kind: str, model: str, seconds: float) -> None:
+        """Record how long a call for kind took on model (including retries).
+
+        Only the kind's primary model is tracked. A primary call under budget while the
+        kind is downgraded is a successful probe and clears the slow history.
+        """
+        route = self.routes.get(kind)
+        if route is None or model != route["model"]:
+            return
+        tracker = self._tracker(kind)
+        if seconds <= route["latency_budget"] and self.over_budget(kind):
+            tracker.clear()
+            with self._lock:
+                self._degraded_calls.pop(kind, None)
+        tracker.record(seconds)
+
+    def p95(self, kind: str) -> Optional[float]:
+        tracker = self._tracker(kind)
+        if len(tracker) < self.min_samples:
+            return None
+        return tracker.percentile(95)
+
+    def over_budget(self, kind: str) -> bool:
+        """p95 over budget, backed by at least min_slow slow calls so one outlier doesn't downgrade."""
+        budget = self.routes[kind]["latency_budget"]
+        p95 = self.p95(kind)
+        if p95 is None or p95 <= budget:
+            return False
+        return sum(seconds > budget for seconds in self._tracker(kind).samples()) >= self.min_slow
+
+    def select(self, kind: str) -> Dict[str, Any]:
+        """Model, max_tokens and temperature for a request kind."""
+        if kind not in self.routes:
+            raise ValueError(f"Unknown request kind: {kind}")
+        route = self.routes[kind]
+        model = route["model"]
+
+        if route["fast_model"] != model and self.over_budget(kind):
+            now = self.clock()
+            with self._lock:
+                calls = self._degraded_calls.get(kind, 0) + 1
+                self._degraded_calls[kind] = calls
+                last_probe = self._last_probe.setdefault(kind, now)
+                # Probe the primary every probe_every-th call, or when it hasn't been tried for a while
+                probe = calls % self.probe_every == 0 or now - last_probe >= self.probe_interval
+                if probe:
+                    self._last_probe[kind] = now
+            if not probe:
+                model = route["fast_model"]
+        else:
+            with self._lock:
+                self._degraded_calls.pop(kind, None)
+                self._last_probe.pop(kind, None)
+
+        return {"model": model, "max_tokens": route["max_tokens"], "temperature": route["temperature"]}
+
+# Process-wide router shared by every AICoach and page helper
+model_router = ModelRouter()
@@ -0,0 +1,154 @@
+"""
+Local semantic cache for near-duplicate coaching questions.
+
+Questions are embedded on CPU as hashed bag-of-words plus character trigram
+vectors (no model, no network) and stored in SQLite with their answer, the
+data generation and a scope (the request kind plus a fingerprint of any
+conversation history). A new question is answered from the most similar
+stored question in the same scope and generation when the cosine similarity
+clears the threshold, so "what should I train today" and "what's today's
+workout" share one LLM call until the logs change. Matches that differ in a
+negation, or in a content word of a short question, are rejected.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from coach_core.cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL_SECONDS, cache_disabled
+from coach_core.data import ensure_db_instance, get_data_generation
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 1024
+DEFAULT_THRESHOLD = float(os.getenv("COACH_SEMANTIC_THRESHOLD", "0.85"))
+# Looser match accepted when the LLM is over budget and the alternative is the canned fallback
+DEGRADED_THRESHOLD = float(os.getenv("COACH_SEMANTIC_DEGRADED_THRESHOLD", "0.7"))
+# Questions with at most this many content words must share all of them to match
+SHORT_QUESTION_WORDS = 4
+TRIGRAM_WEIGHT = 0.5
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words folded together so rephrasings land on the same features
+SYNONYMS = {
+    "workout": "train", "training": "train", "exercise": "train", "session": "train", "routine": "train",
+    "todays": "today", "tonight": "today",
+    "hurt": "pain", "hurts": "pain", "sore": "pain", "ache": "pain", "aches": "pain",
+    "tired": "fatigue", "exhausted": "fatigue",
+    "whats": "what", "hows": "how",
+}
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "i", "im", "me", "my", "you", "your", "is", "are", "am", "be", "do", "does", "did",
+    "to", "for", "of", "on", "in", "at", "it", "its", "this", "that", "what", "should", "can", "could",
+    "would", "will", "please", "and", "or", "s",
+})
+
+# Words that flip a question's meaning while barely moving its vector
+NEGATORS = frozenset({
+    "not", "no", "without", "dont", "never", "cant", "wont", "doesnt", "didnt", "shouldnt", "isnt", "arent",
+})
+
+def semantic_cache_disabled() -> bool:
+    """Check whether the semantic cache is off via COACH_SEMANTIC_CACHE=off (or the whole response cache is)."""
+    return cache_disabled() or os.getenv("COACH_SEMANTIC_CACHE", "on").strip().lower() in ("0", "off", "false", "no")
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercased content words with apostrophes dropped, synonyms folded and plurals stripped."""
+    words = []
+    for word in WORD_RE.findall((text or "").lower().replace("'", "").replace("’", "")):
+        word = SYNONYMS.get(word, word)
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = SYNONYMS.get(word[:-1], word[:-1])
+        words.append(word)
+    content = [word for word in words if word not in STOPWORDS]
+    return content or words
+
+def _bucket(feature: str) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(feature.encode("utf-8")) % DIMENSIONS
+
+def embed(text: str) -> Dict[int, float]:
+    """Sparse L2-normalized vector of hashed word and character trigram features."""
+    vector: Dict[int, float] = {}
+    for word in normalize_words(text):
+        index = _bucket(f"w:{word}")
+        vector[index] = vector.get(index, 0.0) + 1.0
+        padded = f" {word} "
+        trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+        weight = TRIGRAM_WEIGHT / math.sqrt(len(trigrams))
+        for trigram in trigrams:
+            index = _bucket(f"c:{trigram}")
+            vector[index] = vector.get(index, 0.0) + weight
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {index: value / norm for index, value in vector.items()} if norm else {}
+
+def compatible(question: str, other: str) -> bool:
+    """Guard against near-duplicates that ask something different: negations must agree, and
+    short questions must have the same content words ("push-ups" vs "pull-ups")."""
+    words, other_words = set(normalize_words(question)), set(normalize_words(other))
+    if words & NEGATORS != other_words & NEGATORS:
+        return False
+    if min(len(words), len(other_words)) <= SHORT_QUESTION_WORDS:
+        return words == other_words
+    return True
+
+def similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Cosine similarity of two normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+def cache_scope(kind: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+    """Scope answers by request kind and conversation so follow-ups never match across chats."""
+    if not history:
+        return kind
+    digest = hashlib.sha256(json.dumps(history, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"{kind}:{digest[:16]}"
+
+class SemanticCache:
+    """SQLite-backed nearest-question cache scoped by request kind, conversation and data generation."""
+    def __init__(self, db=None, threshold: float = DEFAULT_THRESHOLD,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db = ensure_db_instance(db)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    def lookup(self, question: str, scope: str, threshold: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Best stored (answer, similarity) for a question in this scope and generation, if above the threshold."""
+        threshold = self.threshold if threshold is None else threshold
+        vector = embed(question)
+        if not vector:
+            return None
+        try:
+            entries = self.db.get_semantic_entries(scope, get_data_generation(self.db), self.ttl_seconds)
+            best_id, best_answer, best_score = None, None, 0.0
+            for entry in entries:
+                score = similarity(vector, {int(k): v for k, v in json.loads(entry["vector"]).items()})
+                if score >= threshold and score > best_score and compatible(question, entry["question"]):
+                    best_id, best_answer, best_score = entry["id"], entry["response"], score
+            if best_id is None:
+                return None
+            self.db.touch_semantic_entry(best_id)
+            return best_answer, best_score
+        except Exception as e:
+            logger.error(f"Error reading semantic cache: {e}")
+            return None
+
+    def add(self, question: str, scope: str, response: str) -> None:
+        vector = embed(question)
+        if not response or not vector:
+            return
+        try:
+            self.db.add_semantic_entry(
+                scope, get_data_generation(self.db), question,
+                json.dumps({str(k): round(v, 5) for k, v in vector.items()}), response, self.max_entries
+            )
+        except Exception as e:
+            logger.error(f"Error writing semantic cache: {e}")
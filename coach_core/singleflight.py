@@ -0,0 +1,70 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call: the first
+caller (the leader) runs it and everyone else waits for its result. Used for
+identical LLM requests, e.g. a double-clicked "Get Weekly Plan".
+"""
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+class Call:
+    """One in-flight call that followers can wait on."""
+    def __init__(self):
+        self._done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        if not self._done.wait(timeout):
+            raise TimeoutError("Timed out waiting for in-flight request")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by request fingerprint."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Call] = {}
+
+    def join(self, key: str) -> Tuple[Call, bool]:
+        """Join the in-flight call for key; returns (call, is_leader)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                return call, False
+            call = Call()
+            self._calls[key] = call
+            return call, True
+
+    def finish(self, key: str, call: Call, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Publish the leader's outcome and release waiting followers."""
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call._done.set()
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """Run fn once per key among concurrent callers; returns (result, shared)."""
+        call, leader = self.join(key)
+        if not leader:
+            return call.wait(timeout), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result)
+        return result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+# Process-wide registry shared by every AICoach and page helper
+llm_flights = SingleFlight()
@@ -0,0 +1,177 @@
+"""
+LLM call telemetry.
+
+Every completion request produces one structured record: feature, model,
+prompt/completion tokens, queue time, time to first token, total latency,
+cache hit, shared (single-flight) result and error class. Records are written
+to the llm_calls SQLite table by a background writer so the request path never
+waits on disk.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from coach_core.context import estimate_tokens
+from coach_core.data import ensure_db_instance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ROWS = 20000
+
+def telemetry_disabled() -> bool:
+    """Check whether telemetry is turned off via COACH_TELEMETRY=off."""
+    return os.getenv("COACH_TELEMETRY", "on").strip().lower() in ("0", "off", "false", "no")
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for no values."""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+class CallRecord:
+    """Timings and usage for one completion request."""
+    def __init__(self, telemetry: Optional["Telemetry"], feature: str, model: str, streamed: bool = False):
+        self._telemetry = telemetry
+        self.feature = feature
+        self.model = model
+        self.streamed = streamed
+        self.created_at = time.time()
+        self.started = time.monotonic()
+        self.sent_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hit = False
+        self.shared = False
+        self.row: Optional[Dict[str, Any]] = None
+
+    def mark_sent(self) -> None:
+        """The request is leaving for the API; everything before this is queue time."""
+        if self.sent_at is None:
+            self.sent_at = time.monotonic()
+
+    def mark_first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+
+    def set_usage(self, usage: Any = None, messages: Optional[List[Dict[str, str]]] = None,
+                  completion: Optional[str] = None) -> None:
+        """Token counts from the API usage block, or estimated when it's missing (e.g. streams)."""
+        if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+            self.prompt_tokens = usage.prompt_tokens
+            self.completion_tokens = usage.completion_tokens or 0
+            return
+        self.prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages or [])
+        self.completion_tokens = estimate_tokens(completion or "")
+
+    def finish(self, error: Optional[BaseException] = None) -> Dict[str, Any]:
+        """Close the record and hand it to the writer; repeated calls are ignored."""
+        if self.row is not None:
+            return self.row
+        now = time.monotonic()
+        to_ms = lambda seconds: round(seconds * 1000, 1)
+        self.row = {
+            "created_at": self.created_at,
+            "feature": self.feature,
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "queue_ms": to_ms((self.sent_at or now) - self.started),
+            "ttft_ms": to_ms(self.first_token_at - self.started) if self.first_token_at else None,
+            "latency_ms": to_ms(now - self.started),
+            "cache_hit": int(self.cache_hit),
+            "shared": int(self.shared),
+            "streamed": int(self.streamed),
+            "error": type(error).__name__ if error is not None else None,
+        }
+        if self._telemetry is not None:
+            self._telemetry.submit(self.row)
+        return self.row
+
+class Telemetry:
+    """Buffered writer for LLM call records."""
+    def __init__(self, db=None, max_rows: int = DEFAULT_MAX_ROWS):
+        self._db = db
+        self.max_rows = max_rows
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = ensure_db_instance(None)
+        return self._db
+
+    def start(self, feature: str, model: str, streamed: bool = False) -> CallRecord:
+        """Begin a record; it is stored when finish() is called."""
+        return CallRecord(None if telemetry_disabled() else self, feature, model, streamed)
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        self._queue.put(row)
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="llm-telemetry", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            rows = [self._queue.get()]
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.db.record_llm_calls(rows, self.max_rows)
+            except Exception as e:
+                logger.error(f"Error writing LLM telemetry: {e}")
+            for _ in rows:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every submitted record has been written."""
+        self._queue.join()
+
+    def load_calls(self, days: float = 7, feature: Optional[str] = None) -> List[Dict[str, Any]]:
+        try:
+            return self.db.get_llm_calls(time.time() - days * 86400, feature)
+        except Exception as e:
+            logger.error(f"Error loading LLM telemetry: {e}")
+            return []
+
+    def tokens_by_day(self, days: float = 14) -> List[Dict[str, Any]]:
+        try:
+            return self.db.get_llm_tokens_by_day(time.time() - days * 86400)
+        except Exception as e:
+            logger.error(f"Error loading LLM token usage: {e}")
+            return []
+
+def summarize_calls(calls: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-feature call counts, p50/p95 latency, p95 TTFT, tokens, cache hit rate and errors; slowest first."""
+    by_feature: Dict[str, List[Dict[str, Any]]] = {}
+    for call in calls:
+        by_feature.setdefault(call["feature"], []).append(call)
+
+    summary = []
+    for feature, rows in by_feature.items():
+        upstream = [r for r in rows if not r["cache_hit"] and not r["shared"]]
+        summary.append({
+            "feature": feature,
+            "calls": len(rows),
+            "p50_ms": percentile([r["latency_ms"] for r in rows], 50),
+            "p95_ms": percentile([r["latency_ms"] for r in rows], 95),
+            "p95_upstream_ms": percentile([r["latency_ms"] for r in upstream], 95),
+            "p95_ttft_ms": percentile([r["ttft_ms"] for r in upstream], 95),
+            "tokens": sum(r["prompt_tokens"] + r["completion_tokens"] for r in rows),
+            "cache_hit_rate": round(sum(r["cache_hit"] for r in rows) / len(rows), 3),
+            "errors": sum(1 for r in rows if r["error"]),
+        })
+    return sorted(summary, key=lambda row: row["p95_ms"] or 0, reverse=True)
+
+# Process-wide telemetry writer shared by every AICoach
+llm_telemetry = Telemetry()
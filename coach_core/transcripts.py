@@ -0,0 +1,218 @@
+"""
+Compressed archive of chat transcripts and generated plans.
+
+Records (a chat turn, a generated plan) are buffered in memory and flushed
+in batches, when enough have built up or a timer fires a few seconds after
+the first one. Each session, day and feature gets a block of JSON lines that
+grows by one compressed frame per batch, so a flush only compresses the new
+records and never rewrites what is stored; blocks are sealed at a raw size
+limit. Block metadata lives in a separate index table, so lookups by date,
+feature or session never touch the compressed data. Frames use zstd when the
+optional zstandard package is installed and zlib otherwise; the codec is kept
+per block. Exports decompress one block at a time in chunks, so memory stays
+flat however long the history gets.
+"""
+import atexit
+import io
+import json
+import logging
+import os
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from coach_core.data import ensure_db_instance
+from coach_core.limiter import current_user
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 10
+# Raw size at which a day's block is sealed and a new one started
+BLOCK_BYTES = int(os.getenv("COACH_TRANSCRIPT_BLOCK_BYTES", str(256 * 1024)))
+FLUSH_RECORDS = int(os.getenv("COACH_TRANSCRIPT_FLUSH_RECORDS", "20"))
+FLUSH_SECONDS = float(os.getenv("COACH_TRANSCRIPT_FLUSH_SECONDS", "30"))
+CHUNK_BYTES = 64 * 1024
+
+def transcripts_disabled() -> bool:
+    """Check whether archiving is off via COACH_TRANSCRIPTS=off."""
+    return os.getenv("COACH_TRANSCRIPTS", "on").strip().lower() in ("0", "off", "false", "no")
+
+def default_codec() -> str:
+    return ZSTD if zstandard is not None else ZLIB
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+def decompress_chunks(data: bytes, codec: str) -> Iterator[bytes]:
+    """Decompress a block (one or more concatenated frames) incrementally, CHUNK_BYTES of input at a time."""
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Block is zstd-compressed; install zstandard to read it")
+        reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+        with reader:
+            while chunk := reader.read(CHUNK_BYTES):
+                yield chunk
+        return
+    decompressor = zlib.decompressobj()
+    for start in range(0, len(data), CHUNK_BYTES):
+        chunk = data[start:start + CHUNK_BYTES]
+        while chunk:
+            yield decompressor.decompress(chunk)
+            chunk = b""
+            # A frame ended; the rest of the input belongs to the next one
+            if decompressor.eof:
+                chunk = decompressor.unused_data
+                decompressor = zlib.decompressobj()
+    yield decompressor.flush()
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split a stream of byte chunks into lines without joining the whole stream."""
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        yield from (line for line in lines if line)
+    if pending:
+        yield pending
+
+class TranscriptStore:
+    """Buffered, block-compressed archive of conversation turns and LLM outputs."""
+    def __init__(self, db=None, codec: Optional[str] = None, block_bytes: int = BLOCK_BYTES,
+                 flush_records: int = FLUSH_RECORDS, flush_seconds: float = FLUSH_SECONDS,
+                 now: Callable[[], datetime] = datetime.now):
+        self._db = db
+        self.codec = codec or default_codec()
+        self.block_bytes = block_bytes
+        self.flush_records = flush_records
+        self.flush_seconds = flush_seconds
+        self.now = now
+        self._buffers: Dict[Tuple[str, str, str], List[Tuple[str, bytes]]] = {}
+        self._pending = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = ensure_db_instance(None)
+        return self._db
+
+    def record(self, feature: str, role: str, content: str, meta: Optional[Dict[str, Any]] = None,
+               session_id: Optional[str] = None, flush: bool = False) -> None:
+        """Buffer one record; it's written with the next batch, at most flush_seconds later (or now with flush=True)."""
+        if transcripts_disabled() or not content:
+            return
+        moment = self.now()
+        at = moment.isoformat(timespec="seconds")
+        entry = {"at": at, "role": role, "content": content}
+        if meta:
+            entry["meta"] = meta
+        line = json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+        key = (session_id or current_user(), moment.date().isoformat(), feature)
+        with self._lock:
+            self._buffers.setdefault(key, []).append((at, line))
+            self._pending += 1
+            due = self._pending >= self.flush_records
+            if not (flush or due) and self._timer is None:
+                # Written even if no further record arrives to trigger the batch
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush or due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered records; returns how many were archived."""
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+            self._pending = 0
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        written = 0
+        with self._write_lock:
+            for (session_id, day, feature), lines in buffers.items():
+                try:
+                    self._write(session_id, day, feature, lines)
+                    written += len(lines)
+                except Exception as e:
+                    logger.error(f"Error archiving {feature} transcript: {e}")
+        return written
+
+    def _write(self, session_id: str, day: str, feature: str, lines: List[Tuple[str, bytes]]) -> None:
+        block = {"session_id": session_id, "day": day, "feature": feature, "codec": self.codec}
+        block_id: Optional[int] = None
+        frame = bytearray()
+        records, raw_bytes, first_at = 0, 0, None
+
+        # Append a frame to the day's open block; what's already stored is never recompressed
+        last = self.db.get_last_transcript_block(session_id, day, feature)
+        if last and last["codec"] == self.codec and last["raw_bytes"] < self.block_bytes:
+            block_id = last["block_id"]
+            records, raw_bytes, first_at = last["records"], last["raw_bytes"], last["first_at"]
+
+        for at, line in lines:
+            if frame and raw_bytes + len(line) > self.block_bytes:
+                self._store(block, block_id, frame, records, raw_bytes, first_at, last_at)
+                block_id, frame, records, raw_bytes, first_at = None, bytearray(), 0, 0, None
+            frame.extend(line)
+            records += 1
+            raw_bytes += len(line)
+            first_at = first_at or at
+            last_at = at
+        self._store(block, block_id, frame, records, raw_bytes, first_at, last_at)
+
+    def _store(self, block: Dict[str, Any], block_id: Optional[int], frame: bytearray,
+               records: int, raw_bytes: int, first_at: str, last_at: str) -> None:
+        self.db.write_transcript_block(
+            {**block, "records": records, "raw_bytes": raw_bytes, "first_at": first_at, "last_at": last_at},
+            compress(bytes(frame), block["codec"]), block_id
+        )
+
+    def iter_records(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                     feature: Optional[str] = None, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream archived records in time order, decompressing one block at a time."""
+        self.flush()
+        for block in self.db.find_transcript_blocks(start_date, end_date, feature, session_id):
+            data = self.db.get_transcript_block_data(block["block_id"])
+            if data is None:
+                continue
+            for line in iter_lines(decompress_chunks(data, block["codec"])):
+                record = json.loads(line)
+                record.update(session_id=block["session_id"], day=block["day"], feature=block["feature"])
+                yield record
+
+    def export(self, out: IO[str], **filters) -> int:
+        """Write matching records to out as JSON lines; returns the record count."""
+        count = 0
+        for record in self.iter_records(**filters):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Archive totals, with the compression ratio (raw bytes per stored byte)."""
+        self.flush()
+        try:
+            stats = self.db.get_transcript_stats()
+        except Exception as e:
+            logger.error(f"Error reading transcript stats: {e}")
+            return {"blocks": 0, "records": 0, "raw_bytes": 0, "stored_bytes": 0, "ratio": None}
+        stats["ratio"] = round(stats["raw_bytes"] / stats["stored_bytes"], 1) if stats["stored_bytes"] else None
+        return stats
+
+# Process-wide archive for the app database; buffered records are written on exit
+transcript_store = TranscriptStore()
+atexit.register(transcript_store.flush)
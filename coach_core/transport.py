@@ -0,0 +1,222 @@
+"""
+Resilient transport for LLM calls.
+
+Wraps each OpenAI request with a per-call deadline, exponential backoff with
+full jitter on 429/5xx/timeouts, a circuit breaker that fails fast while the
+upstream is unhealthy, and optional hedged requests fired after the observed
+p95 latency. Callers pass a function that takes the remaining timeout in
+seconds and performs one attempt.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Deque, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("COACH_LLM_DEADLINE", "30"))
+DEFAULT_MAX_RETRIES = 2
+BASE_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 8.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APITimeoutError", "APIConnectionError", "ReadTimeout", "ConnectTimeout"}
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the per-call deadline leaves no time for another attempt."""
+
+def hedging_enabled() -> bool:
+    return os.getenv("COACH_LLM_HEDGE", "off").strip().lower() in ("1", "on", "true", "yes")
+
+def status_code(error: BaseException) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient upstream failures: 429, 5xx, timeouts and connection errors."""
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class CircuitBreaker:
+    """Closed → open after consecutive failures; half-open probe after reset_timeout."""
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may go upstream; only one probe is let through when half-open."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._probing:
+                    logger.warning("LLM circuit breaker opened")
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+class LatencyTracker:
+    """Sliding window of successful call latencies, optionally expiring samples older than max_age seconds."""
+    def __init__(self, window: int = 200, max_age: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=window)
+        self.max_age = max_age
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append((self.clock(), seconds))
+
+    def samples(self) -> List[float]:
+        """Latencies still inside the window."""
+        with self._lock:
+            if self.max_age is not None:
+                cutoff = self.clock() - self.max_age
+                while self._samples and self._samples[0][0] < cutoff:
+                    self._samples.popleft()
+            return [seconds for _, seconds in self._samples]
+
+    def percentile(self, pct: float) -> Optional[float]:
+        samples = sorted(self.samples())
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(pct / 100 * len(samples))) - 1))
+        return samples[index]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def __len__(self) -> int:
+        return len(self.samples())
+
+class ResilientTransport:
+    """Deadline, retry, circuit breaker and hedging policy around single request attempts."""
+    def __init__(self, deadline: float = DEFAULT_DEADLINE_SECONDS, max_retries: int = DEFAULT_MAX_RETRIES,
+                 breaker: Optional[CircuitBreaker] = None, hedge: Optional[bool] = None,
+                 hedge_min_samples: int = 20, sleep: Callable[[float], None] = time.sleep):
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.hedge = hedging_enabled() if hedge is None else hedge
+        self.hedge_min_samples = hedge_min_samples
+        self._sleep = sleep
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def call(self, attempt: Callable[[float], T], deadline: Optional[float] = None, hedge: bool = True) -> T:
+        """Run attempt(timeout) under the transport policy and return its result."""
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM upstream unhealthy; failing fast")
+
+        deadline = self.deadline if deadline is None else deadline
+        started = time.monotonic()
+        retries = 0
+        while True:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                self.breaker.record_failure()
+                raise DeadlineExceeded(f"LLM call exceeded {deadline:.1f}s deadline")
+
+            attempt_started = time.monotonic()
+            try:
+                result = self._attempt(attempt, remaining, hedge)
+            except Exception as e:
+                if not is_retryable(e):
+                    # Client errors (bad request, auth) mean upstream answered; don't trip the breaker
+                    self.breaker.record_success()
+                    raise
+                if retries >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** retries))
+                if delay >= deadline - (time.monotonic() - started):
+                    self.breaker.record_failure()
+                    raise
+                logger.info(f"Retrying LLM call in {delay:.2f}s after {type(e).__name__}")
+                self._sleep(delay)
+                retries += 1
+                continue
+
+            self.latency.record(time.monotonic() - attempt_started)
+            self.breaker.record_success()
+            return result
+
+    def _attempt(self, attempt: Callable[[float], T], timeout: float, hedge: bool) -> T:
+        hedge_delay = self.latency.percentile(95) if len(self.latency) >= self.hedge_min_samples else None
+        if not (self.hedge and hedge and hedge_delay is not None and hedge_delay < timeout):
+            return attempt(timeout)
+
+        # Hedged request: fire a second attempt if the first is slower than p95
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+        started = time.monotonic()
+        futures = {self._executor.submit(attempt, timeout)}
+        done, _ = wait(futures, timeout=hedge_delay)
+        if not done:
+            logger.info(f"Hedging LLM call after {hedge_delay:.2f}s")
+            futures.add(self._executor.submit(attempt, max(timeout - (time.monotonic() - started), 0.1)))
+
+        error: Optional[BaseException] = None
+        pending = futures
+        while pending:
+            done, pending = wait(pending, timeout=max(timeout - (time.monotonic() - started), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error or DeadlineExceeded("Hedged LLM call exceeded its deadline")
+
+# Process-wide transport so breaker state and latency history are shared
+llm_transport = ResilientTransport()
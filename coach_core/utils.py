@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 def detect_split(training_done: str) -> str:
     """Detect training split from training_done string."""
@@ -80,4 +80,15 @@ def estimate_training_volume(training_done: str) -> str:
     elif "light" in training_done.lower() or "mobility" in training_done.lower() or "recovery" in training_done.lower():
         return "low"
     else:
-        return "medium" 
\ No newline at end of file
+        return "medium" 
+
+def split_soreness(soreness: str) -> List[str]:
+    """Split a comma-joined soreness string into normalized body regions."""
+    if not soreness or soreness.strip().lower() == "none":
+        return []
+    regions = []
+    for part in soreness.split(","):
+        region = part.strip().title()
+        if region and region.lower() != "none" and region not in regions:
+            regions.append(region)
+    return regions
@@ -1,10 +1,15 @@
 import streamlit as st
+import uuid
+from dotenv import load_dotenv
+# Load .env before coach_core, whose modules read their settings at import time
+load_dotenv()
 from coach_core.data import load_profile, load_logs
 from pages.daily_log import log_today_page, check_logged_today
 from pages.ai_chat import ai_chat_page
 from pages.settings import settings_page
-from dotenv import load_dotenv
-load_dotenv()
+from coach_core.planner import start_scheduler
+from coach_core.pattern_insights import start_insight_worker
+from coach_core.limiter import set_current_user
 
 # Page config for mobile
 st.set_page_config(
@@ -19,6 +24,13 @@ def main():
     st.title("💪 Yoel's AI Coach")
     st.markdown("---")
     
+    # Charge this browser session's LLM calls to its own rate limit bucket
+    set_current_user(st.session_state.setdefault("limiter_user", uuid.uuid4().hex))
+    
+    # Precompute weekly plans and reflections, and pattern insights on log writes, in the background
+    start_scheduler()
+    start_insight_worker()
+    
     # Load data using core modules
     profile = load_profile()
     logs = load_logs()
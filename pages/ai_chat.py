@@ -1,10 +1,13 @@
 import streamlit as st
 import json
 from coach_core.data import load_profile, load_logs
-from coach_core.ai import AICoach
+from coach_core.ai import get_coach
+from coach_core.intents import route, WEEKLY_PLAN
+from coach_core.panel import mentor_name
 
 def ai_chat_page(profile, logs):
     st.header("🧠 Mentor-Powered AI Coach")
+    
     st.markdown("""
     **Your AI coach is trained by the world's greatest minds in movement, strength, and performance:**
     
@@ -29,6 +32,11 @@ def ai_chat_page(profile, logs):
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
     
+    # Conversation memory sent to the model: recent turns verbatim plus a rolling summary
+    if "conversation" not in st.session_state:
+        st.session_state.conversation = get_coach().new_conversation()
+    conversation = st.session_state.conversation
+    
     # Display chat history with better error handling
     if st.session_state.chat_history:
         st.subheader("📝 Chat History")
@@ -70,6 +78,7 @@ def ai_chat_page(profile, logs):
     
     # Chat input
     user_input = st.text_area("Your message:", key="user_input", height=100)
+    panel_mode = st.checkbox("🎙️ Panel mode (ask the top mentors in parallel, then combine)")
     
     # Send button
     if st.button("🚀 Send to Mentor-Powered Coach", type="primary"):
@@ -80,15 +89,28 @@ def ai_chat_page(profile, logs):
                 "content": user_input.strip()
             })
             
-            # Get AI response
+            # Stream AI response, rendering tokens as they arrive
             try:
-                ai_coach = AICoach()
+                ai_coach = get_coach()
                 
                 # Check if it's a weekly plan request
-                if "weekly" in user_input.lower() or "plan" in user_input.lower():
-                    response = ai_coach.get_weekly_plan()
+                if route(user_input) == WEEKLY_PLAN:
+                    stream = ai_coach.stream_weekly_plan()
+                elif panel_mode:
+                    stream = stream_panel_response(ai_coach, user_input.strip())
                 else:
-                    response = ai_coach.get_ai_response(user_input.strip())
+                    stream = ai_coach.stream_ai_response(user_input.strip(), history=conversation.context_messages())
+                
+                placeholder = st.empty()
+                response = ""
+                for delta in stream:
+                    response += delta
+                    placeholder.markdown(f"**AI Coach:** {response}▌")
+                placeholder.markdown(f"**AI Coach:** {response}")
+                
+                conversation.add("user", user_input.strip())
+                conversation.add("assistant", response)
+                conversation.maybe_refresh_summary()
                 
                 # Add AI response to history
                 st.session_state.chat_history.append({
@@ -109,6 +131,7 @@ def ai_chat_page(profile, logs):
     # Clear chat button
     if st.button("🗑️ Clear Chat History"):
         st.session_state.chat_history = []
+        conversation.clear()
         st.rerun()
     
     # Mentor knowledge showcase
@@ -131,4 +154,21 @@ def ai_chat_page(profile, logs):
         **Dr. Andy Galpin** - "Science-based training with focus on muscle physiology and optimal recovery."
         
         Ask your coach anything about training, nutrition, recovery, or movement - they'll draw from this collective wisdom!
-        """) 
\ No newline at end of file
+        """) 
+
+def stream_panel_response(ai_coach, user_input):
+    """Show each mentor's answer live in its own expander and yield the synthesized answer."""
+    mentor_answers = {}
+    mentor_placeholders = {}
+    panel = st.container()
+    for source, delta in ai_coach.stream_mentor_panel(user_input):
+        if source == "synthesis":
+            yield delta
+            continue
+        if source not in mentor_placeholders:
+            with panel.expander(f"🎙️ {mentor_name(source)}", expanded=False):
+                mentor_placeholders[source] = st.empty()
+        mentor_answers[source] = mentor_answers.get(source, "") + delta
+        mentor_placeholders[source].markdown(mentor_answers[source] + "▌")
+    for source, placeholder in mentor_placeholders.items():
+        placeholder.markdown(mentor_answers[source])
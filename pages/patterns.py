@@ -1,8 +1,11 @@
 import streamlit as st
 import statistics
+import pandas as pd
+import plotly.express as px
 import json
-from coach_core.data import load_logs
-from coach_core.ai import AICoach
+from coach_core.data import load_logs, get_soreness_counts, get_soreness_by_week
+from coach_core.ai import get_coach
+from coach_core.pattern_insights import get_pattern_insight, request_pattern_insight, start_insight_worker
 from coach_core.utils import detect_split
 
 def pattern_analysis_page(logs):
@@ -12,11 +15,15 @@ def pattern_analysis_page(logs):
         st.warning("No data to analyze yet. Start logging to see patterns!")
         return
     
-    # AI Coach pattern analysis using core module
-    ai_coach = AICoach()
-    pattern_analysis = ai_coach.analyze_patterns()
+    # Summary and AI insight are precomputed when logs are written; the page only reads them
+    start_insight_worker()
+    ai_coach = get_coach()
+    stored = get_pattern_insight()
+    current = stored if stored and not stored["stale"] else None
+    if current is None:
+        request_pattern_insight()
     st.subheader("🤖 AI Analysis")
-    st.text(pattern_analysis)
+    st.text(current["summary"] if current else ai_coach.analyze_patterns())
     
     # Detailed metrics
     st.subheader("📈 Detailed Metrics")
@@ -46,22 +53,26 @@ def pattern_analysis_page(logs):
     
     # Soreness analysis
     st.subheader("💪 Soreness Patterns")
-    all_soreness = []
-    for log in recent_logs:
-        if log.get("soreness") and log.get("soreness") != "none":
-            all_soreness.extend([s.strip() for s in log.get("soreness", "").split(",")])
+    recent_dates = [log.get("date") for log in recent_logs if log.get("date")]
+    soreness_counts = get_soreness_counts(min(recent_dates), max(recent_dates)) if recent_dates else {}
     
-    if all_soreness:
-        soreness_counts = {}
-        for soreness in all_soreness:
-            soreness_counts[soreness] = soreness_counts.get(soreness, 0) + 1
-        
+    if soreness_counts:
         st.write("Most common soreness areas:")
-        for area, count in sorted(soreness_counts.items(), key=lambda x: x[1], reverse=True):
+        for area, count in soreness_counts.items():
             st.write(f"• {area}: {count} times")
     else:
         st.info("No soreness recorded recently. Great recovery!")
     
+    # Long-term soreness heatmap (weeks x body regions)
+    weekly_soreness = get_soreness_by_week()
+    if weekly_soreness:
+        with st.expander("🗓️ Soreness by week"):
+            heatmap = pd.DataFrame(weekly_soreness).pivot(index="region", columns="week", values="days").fillna(0)
+            fig_heatmap = px.imshow(heatmap, aspect="auto", color_continuous_scale="Reds",
+                                    labels={"x": "Week", "y": "Region", "color": "Sore days"})
+            fig_heatmap.update_layout(height=300)
+            st.plotly_chart(fig_heatmap, use_container_width=True)
+    
     # Training split analysis
     st.subheader("🏋️ Training Split Analysis")
     split_counts = {"Push": 0, "Pull": 0, "Legs": 0, "Recovery": 0, "Other": 0}
@@ -82,20 +93,12 @@ def pattern_analysis_page(logs):
     st.subheader("🤖 AI Insights")
     if ai_coach.client:
         st.success("✅ Full AI analysis available with GPT")
-        insight_prompt = f"Based on this training data: {json.dumps(recent_logs, indent=2)}, provide 3 specific insights about Yoel's training patterns and suggestions for improvement."
-        try:
-            insight_response = ai_coach.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are Yoel's AI coach. Provide specific, actionable insights."},
-                    {"role": "user", "content": insight_prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
-            st.write(insight_response.choices[0].message.content)
-        except:
-            st.info("AI insights temporarily unavailable. Using pattern analysis instead.")
+        if stored and stored["insight"]:
+            st.write(stored["insight"])
+            if stored["stale"]:
+                st.caption("⏳ Based on earlier logs; updating in the background.")
+        else:
+            st.info("⏳ AI insights are being prepared from your latest logs. Check back in a moment.")
     else:
         st.info("Add OPENAI_API_KEY for AI-powered insights!")
         
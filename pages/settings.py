@@ -1,6 +1,10 @@
 import streamlit as st
+import pandas as pd
+import plotly.express as px
 from coach_core.data import export_to_json, import_from_json, check_sync_status, load_profile, load_logs
-from datetime import datetime
+from coach_core.telemetry import llm_telemetry, summarize_calls
+from coach_core.transcripts import transcript_store
+from datetime import datetime, timedelta
 
 def settings_page():
     st.header("⚙️ Settings & Data Management")
@@ -78,6 +82,75 @@ def settings_page():
         else:
             st.info("No logs found")
     
+    # AI Usage & Latency
+    st.subheader("📈 AI Usage & Latency")
+    days = st.selectbox("Window", [1, 7, 30], index=1, format_func=lambda d: f"Last {d} day{'s' if d > 1 else ''}")
+    llm_telemetry.flush()
+    calls = llm_telemetry.load_calls(days=days)
+    
+    if calls:
+        summary = summarize_calls(calls)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("AI Calls", len(calls))
+        with col2:
+            st.metric("Tokens", f"{sum(row['tokens'] for row in summary):,}")
+        with col3:
+            st.metric("Cache Hit Rate", f"{sum(c['cache_hit'] for c in calls) / len(calls):.0%}")
+        with col4:
+            st.metric("Errors", sum(row["errors"] for row in summary))
+        
+        # Slowest features first
+        st.dataframe(pd.DataFrame(summary), use_container_width=True, hide_index=True)
+        
+        latency_df = pd.DataFrame(summary).melt(
+            id_vars="feature", value_vars=["p50_ms", "p95_ms"], var_name="percentile", value_name="latency_ms"
+        )
+        fig = px.bar(latency_df, x="feature", y="latency_ms", color="percentile", barmode="group",
+                     title="Latency by feature (p50 / p95)")
+        st.plotly_chart(fig, use_container_width=True)
+        
+        tokens_df = pd.DataFrame(llm_telemetry.tokens_by_day(days=days))
+        if not tokens_df.empty:
+            tokens_df["tokens"] = tokens_df["prompt_tokens"] + tokens_df["completion_tokens"]
+            fig = px.bar(tokens_df, x="day", y="tokens", color="feature", title="Tokens per day")
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No AI calls recorded yet. Telemetry is collected automatically for every AI request.")
+    
+    # Transcript Archive
+    st.subheader("🗄️ Transcript Archive")
+    archive = transcript_store.stats()
+    
+    if archive["records"]:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Archived Messages", f"{archive['records']:,}")
+        with col2:
+            st.metric("Stored Size", f"{archive['stored_bytes'] / 1024:,.1f} KB")
+        with col3:
+            st.metric("Compression", f"{archive['ratio']}×")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            start = st.date_input("From", value=datetime.now() - timedelta(days=30), key="archive_start")
+        with col2:
+            end = st.date_input("To", value=datetime.now(), key="archive_end")
+        with col3:
+            feature = st.selectbox("Feature", ["all", "chat", "weekly_coach", "weekly_plan", "reflection"], key="archive_feature")
+        
+        if st.button("📤 Export Transcripts to JSONL"):
+            path = f"transcripts_{start.isoformat()}_{end.isoformat()}.jsonl"
+            try:
+                with open(path, "w", encoding="utf-8") as out:
+                    count = transcript_store.export(out, start_date=start.isoformat(), end_date=end.isoformat(),
+                                                    feature=None if feature == "all" else feature)
+                st.success(f"✅ Exported {count} messages to {path}")
+            except Exception as e:
+                st.error(f"❌ Failed to export transcripts: {e}")
+    else:
+        st.info("No transcripts archived yet. Chats and generated plans are archived automatically.")
+    
     # System Information
     st.subheader("ℹ️ System Information")
     
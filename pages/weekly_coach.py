@@ -1,9 +1,15 @@
 import streamlit as st
+import pandas as pd
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from coach_core.data import load_profile, load_logs, save_logs
-from coach_core.ai import AICoach
+from coach_core.ai import AICoach, get_coach
+from coach_core.conversation import ConversationManager
+from coach_core.planner import get_planner, start_scheduler
+from coach_core.plans import PlanValidationError, diff_plans, plan_from_rows, plan_rows, render_day
+from coach_core.routing import WEEKLY_PLAN as WEEKLY_PLAN_KIND
+from coach_core.intents import route, classify_feedback, is_bare, FEEDBACK, HELP, REFLECTION, TRAINING, WEEKLY_PLAN
 
 def weekly_coach_page():
     """WhatsApp-style weekly coaching interface"""
@@ -12,8 +18,9 @@ def weekly_coach_page():
     profile = load_profile()
     logs = load_logs()
     
-    # Initialize AI coach
-    ai_coach = AICoach()
+    # Initialize AI coach and the plan precompute scheduler
+    ai_coach = get_coach()
+    start_scheduler()
     
     # Page styling for WhatsApp look
     st.markdown("""
@@ -73,11 +80,16 @@ def weekly_coach_page():
         st.session_state.chat_history = []
     
     if 'weekly_plan' not in st.session_state:
-        st.session_state.weekly_plan = None
+        # Show the stored plan for this week (even if the data has moved on since)
+        stored_plan = get_planner().stored(WEEKLY_PLAN_KIND, current_only=False)
+        st.session_state.weekly_plan = stored_plan["content"] if stored_plan else None
     
     if 'feedback_log' not in st.session_state:
         st.session_state.feedback_log = []
     
+    if 'weekly_conversation' not in st.session_state:
+        st.session_state.weekly_conversation = ai_coach.new_conversation("weekly_coach")
+    
     # Display chat history
     for message in st.session_state.chat_history:
         if message['role'] == 'user':
@@ -112,7 +124,11 @@ def weekly_coach_page():
                 })
                 
                 # Get AI response
-                response = get_coach_response(user_input, profile, logs, ai_coach)
+                conversation = st.session_state.weekly_conversation
+                response = get_coach_response(user_input, profile, logs, ai_coach, conversation)
+                conversation.add('user', user_input)
+                conversation.add('coach', response)
+                conversation.maybe_refresh_summary()
                 
                 # Add coach response to chat
                 st.session_state.chat_history.append({
@@ -126,11 +142,13 @@ def weekly_coach_page():
     # Quick action buttons
     st.markdown("### Quick Actions")
     
+    fresh = st.checkbox("🔁 Regenerate (skip cached responses)", key="bypass_cache")
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
         if st.button("📋 Get Weekly Plan", key="get_plan"):
-            plan = generate_weekly_plan(profile, logs, ai_coach)
+            plan = generate_weekly_plan(profile, logs, ai_coach, bypass_cache=fresh)
             st.session_state.weekly_plan = plan
             st.session_state.chat_history.append({
                 'role': 'coach',
@@ -145,7 +163,7 @@ def weekly_coach_page():
     
     with col3:
         if st.button("🔄 Sunday Reflection", key="reflection"):
-            reflection = generate_sunday_reflection(profile, logs, ai_coach)
+            reflection = generate_sunday_reflection(profile, logs, ai_coach, bypass_cache=fresh)
             st.session_state.chat_history.append({
                 'role': 'coach',
                 'content': f"Sunday Reflection:\n\n{reflection}",
@@ -155,82 +173,102 @@ def weekly_coach_page():
     
     # Display current weekly plan if available
     if st.session_state.weekly_plan:
-        st.markdown("### 📋 Current Weekly Plan")
-        st.text_area("Plan", st.session_state.weekly_plan, height=200, disabled=True)
+        show_weekly_plan(st.session_state.weekly_plan)
 
-def get_coach_response(user_input: str, profile: Dict, logs: List, ai_coach: AICoach) -> str:
+def show_weekly_plan(content: str):
+    """Render the stored weekly plan, with comparison and editing that need no LLM call"""
+    st.markdown("### 📋 Current Weekly Plan")
+    planner = get_planner()
+    stored = planner.stored(WEEKLY_PLAN_KIND, current_only=False)
+    plan = stored["plan"] if stored else None
+    
+    if not plan:
+        # Free-text plans (older or fallback) are shown as before
+        st.text_area("Plan", content, height=200, disabled=True)
+        return
+    
+    if plan["focus"]:
+        st.markdown(f"**Focus:** {plan['focus']}")
+    for day in plan["days"]:
+        with st.expander(f"{day['day']} - {day['focus'] or day['type'].title()}", expanded=False):
+            if day["exercises"]:
+                st.dataframe(pd.DataFrame(day["exercises"]), use_container_width=True, hide_index=True)
+            else:
+                st.caption(f"{day['type'].title()} day")
+    if plan["notes"]:
+        st.caption(plan["notes"])
+    
+    # Compare with an earlier stored version of this week's plan
+    versions = [v for v in planner.db.get_plan_versions(stored["week"], WEEKLY_PLAN_KIND)
+                if v["structured"] and v["id"] != stored["id"]]
+    if versions:
+        with st.expander("🔍 Compare with an earlier version"):
+            labels = {v["id"]: datetime.fromtimestamp(v["created_at"]).strftime("%a %d %b %H:%M") for v in versions}
+            version_id = st.selectbox("Earlier plan", list(labels), format_func=labels.get)
+            earlier = planner.db.get_structured_plan(version_id)
+            changed = diff_plans(earlier, plan)
+            if not changed:
+                st.info("No differences")
+            earlier_days = {day["day"]: day for day in earlier["days"]}
+            for name in changed:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown(render_day(earlier_days[name]) if name in earlier_days else f"**{name}**")
+                with col2:
+                    st.markdown(render_day(next(day for day in plan["days"] if day["day"] == name)))
+    
+    with st.expander("✏️ Edit plan"):
+        edited = st.data_editor(
+            pd.DataFrame(plan_rows(plan)),
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            key=f"plan_editor_{stored['id']}_{hash(stored['content'])}"
+        )
+        if st.button("Save plan", key="save_plan"):
+            try:
+                st.session_state.weekly_plan = planner.edit(stored["id"], plan_from_rows(plan, edited.to_dict("records")))
+                st.success("✅ Plan saved")
+                st.rerun()
+            except PlanValidationError as e:
+                st.error(f"❌ Plan not saved: {e}")
+
+def get_coach_response(user_input: str, profile: Dict, logs: List, ai_coach: AICoach,
+                       conversation: Optional[ConversationManager] = None) -> str:
     """Get contextual coach response based on input"""
     
-    user_input_lower = user_input.lower()
+    intent = route(user_input)
     
     # Handle specific coaching scenarios
-    if "plan" in user_input_lower or "workout" in user_input_lower:
-        return generate_weekly_plan(profile, logs, ai_coach)
-    
-    elif "feedback" in user_input_lower or "felt" in user_input_lower:
+    if intent == FEEDBACK:
         return process_feedback(user_input, profile, logs, ai_coach)
     
-    elif "reflection" in user_input_lower or "sunday" in user_input_lower:
+    elif intent == REFLECTION:
         return generate_sunday_reflection(profile, logs, ai_coach)
     
-    elif "help" in user_input_lower or "what" in user_input_lower:
+    elif intent in (WEEKLY_PLAN, TRAINING):
+        return generate_weekly_plan(profile, logs, ai_coach)
+    
+    elif intent == HELP and is_bare(user_input, HELP):
+        # Only bare help requests; "help me eat better" goes to the coach
         return get_help_message()
     
     else:
-        # Use AI coach for general conversation
-        return ai_coach.get_ai_response(user_input)
-
-def generate_weekly_plan(profile: Dict, logs: List, ai_coach: AICoach) -> str:
-    """Generate movement-focused weekly plan"""
-    
-    # Create movement-focused prompt
-    prompt = f"""Create a 7-day movement training plan for Yoel that focuses ONLY on movement, strength, and mobility (no nutrition).
-
-PROFILE: {json.dumps(profile, indent=2)}
-RECENT LOGS: {json.dumps(logs[-7:], indent=2)}
-
-Create a plan that:
-1. Focuses on calisthenics, yoga, and athletic movement
-2. Considers shoulder issues (avoid painful movements)
-3. Includes mobility and flexibility work
-4. Has 3-4 training days with active recovery
-5. Provides specific exercises and progressions
-6. Adapts to energy levels and recovery needs
-
-Format as a clear, actionable weekly plan with specific exercises."""
+        # Use AI coach for general conversation, with memory of earlier turns
+        history = conversation.context_messages() if conversation else None
+        return ai_coach.get_ai_response(user_input, history=history)
 
+def generate_weekly_plan(profile: Dict, logs: List, ai_coach: AICoach, bypass_cache: bool = False) -> str:
+    """Movement-focused weekly plan, served from storage when precomputed for the current data"""
     try:
-        response = ai_coach.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a movement-focused coach. Create specific, actionable weekly training plans focused only on movement, strength, and mobility."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=600,
-            temperature=0.7
-        )
-        return response.choices[0].message.content or "Error generating weekly plan"
+        return get_planner().weekly_plan(bypass_cache=bypass_cache) or "Error generating weekly plan"
     except Exception as e:
         return f"Error generating weekly plan: {e}"
 
 def process_feedback(user_input: str, profile: Dict, logs: List, ai_coach: AICoach) -> str:
     """Process user feedback and update plan accordingly"""
     
-    # Simple feedback processing
-    feedback_keywords = {
-        "felt great": "positive",
-        "too easy": "needs_progression", 
-        "too hard": "needs_regression",
-        "shoulder tight": "injury_concern",
-        "tired": "recovery_needed",
-        "energized": "positive"
-    }
-    
-    feedback_type = "general"
-    for keyword, ftype in feedback_keywords.items():
-        if keyword in user_input.lower():
-            feedback_type = ftype
-            break
+    feedback_type = classify_feedback(user_input)
     
     # Store feedback
     feedback_entry = {
@@ -254,43 +292,42 @@ def process_feedback(user_input: str, profile: Dict, logs: List, ai_coach: AICoa
         "general": "Thanks for the feedback! I'll use this to improve your plan for next week."
     }
     
-    return responses.get(feedback_type, responses["general"])
+    response = responses.get(feedback_type, responses["general"])
+    
+    # Patch the stored plan for the rest of the week instead of regenerating it
+    try:
+        adjustment = get_planner().adjust(feedback_type, user_input)
+    except Exception as e:
+        print(f"❌ Error adjusting plan: {e}")
+        adjustment = None
+    if adjustment and adjustment["changes"]:
+        st.session_state.weekly_plan = adjustment["content"]
+        changes = "\n".join(f"- {change}" for change in adjustment["changes"])
+        response += f"\n\nI've updated your plan:\n{changes}"
+    
+    return response
 
-def generate_sunday_reflection(profile: Dict, logs: List, ai_coach: AICoach) -> str:
+def generate_sunday_reflection(profile: Dict, logs: List, ai_coach: AICoach, bypass_cache: bool = False) -> str:
     """Generate Sunday reflection and plan evolution"""
     
-    # Get recent feedback
+    # Session feedback makes the reflection personal to this chat, so it is generated live
     recent_feedback = st.session_state.get('feedback_log', [])
     
-    prompt = f"""Generate a Sunday reflection for Yoel's movement training week.
-
-PROFILE: {json.dumps(profile, indent=2)}
-RECENT LOGS: {json.dumps(logs[-7:], indent=2)}
-RECENT FEEDBACK: {json.dumps(recent_feedback, indent=2)}
-
-Create a reflection that:
-1. Summarizes the week's training
-2. Acknowledges feedback and progress
-3. Identifies what worked and what didn't
-4. Suggests improvements for next week
-5. Maintains motivation and focus on movement goals
-
-Be encouraging, specific, and actionable."""
-
     try:
-        response = ai_coach.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a supportive movement coach doing a Sunday reflection. Be encouraging and specific."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=400,
-            temperature=0.8
-        )
-        return response.choices[0].message.content or "Error generating reflection"
+        return get_planner().reflection(
+            bypass_cache=bypass_cache,
+            feedback=format_feedback(recent_feedback) or None
+        ) or "Error generating reflection"
     except Exception as e:
         return f"Error generating reflection: {e}"
 
+def format_feedback(feedback_log: List[Dict]) -> str:
+    """Compact one-line-per-entry encoding of session feedback for prompts"""
+    return "\n".join(
+        f"{entry.get('date', '')[:10]} [{entry.get('type', 'general')}] {entry.get('feedback', '')}"
+        for entry in feedback_log[-10:]
+    )
+
 def show_feedback_form():
     """Show simple feedback form"""
     
@@ -310,7 +347,7 @@ def show_feedback_form():
                 feedback_text += f" - {additional_notes}"
             
             # Process feedback
-            response = process_feedback(feedback_text, {}, [], AICoach())
+            response = process_feedback(feedback_text, {}, [], get_coach())
             
             # Add to chat
             st.session_state.chat_history.append({
@@ -343,4 +380,8 @@ def get_help_message() -> str:
 Just type naturally like you're texting a coach! I learn from your feedback to make each week better than the last."""
 
 if __name__ == "__main__":
+    # Run as its own page, so charge this session's LLM calls here (mobile_logger.main does it for the app)
+    import uuid
+    from coach_core.limiter import set_current_user
+    set_current_user(st.session_state.setdefault("limiter_user", uuid.uuid4().hex))
     weekly_coach_page() 
\ No newline at end of file
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub server for offline benchmarking.
+
+Speaks the chat-completions API (blocking and streaming) with configurable
+latency/token-rate profiles, and can record real transcripts from an upstream
+API or replay them. Point the coach at it with:
+
+    OPENAI_API_KEY=stub COACH_OPENAI_BASE_URL=http://127.0.0.1:8765/v1 streamlit run mobile_logger.py
+
+Usage:
+    python stub_server.py --profile realistic
+    python stub_server.py --record transcripts.jsonl --upstream https://api.openai.com/v1
+    python stub_server.py --replay transcripts.jsonl --profile fast
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from coach_core.context import estimate_tokens
+
+# Latency profiles: time to first token, tokens per second, and injected error rate
+PROFILES = {
+    "instant": {"first_token_seconds": 0.0, "tokens_per_second": 0, "error_rate": 0.0},
+    "fast": {"first_token_seconds": 0.15, "tokens_per_second": 200, "error_rate": 0.0},
+    "realistic": {"first_token_seconds": 0.6, "tokens_per_second": 45, "error_rate": 0.0},
+    "slow": {"first_token_seconds": 2.5, "tokens_per_second": 12, "error_rate": 0.0},
+    "flaky": {"first_token_seconds": 0.6, "tokens_per_second": 45, "error_rate": 0.25},
+}
+
+CANNED_REPLY = (
+    "Here's your plan from the stub coach. Start with five minutes of joint prep, "
+    "then three rounds of controlled push-ups, ring rows and goblet squats at a steady tempo. "
+    "Keep the shoulder work pain-free, finish with hip and thoracic mobility, "
+    "and log how your energy feels tomorrow so we can adjust."
+)
+
+def request_key(body: Dict[str, Any]) -> str:
+    """Fingerprint the parts of a request that determine the completion."""
+    payload = json.dumps(
+        {
+            "model": body.get("model"),
+            "messages": body.get("messages"),
+            "max_tokens": body.get("max_tokens"),
+            "temperature": body.get("temperature"),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def synthetic_reply(body: Dict[str, Any]) -> str:
+    """Deterministic reply sized to the request's max_tokens."""
+    words = CANNED_REPLY.split()
+    limit = int(body.get("max_tokens") or 200)
+    reply = []
+    while estimate_tokens(" ".join(reply)) < limit and len(reply) < limit:
+        reply.append(words[len(reply) % len(words)])
+    return " ".join(reply)
+
+class TranscriptStore:
+    """JSONL transcripts keyed by request fingerprint."""
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def add(self, key: str, body: Dict[str, Any], content: str, usage: Dict[str, Any], latency: float) -> None:
+        entry = {"key": key, "request": body, "content": content, "usage": usage, "latency_seconds": latency}
+        with self._lock:
+            self.entries[key] = entry
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+class StubConfig:
+    def __init__(self, profile: str = "fast", record: Optional[TranscriptStore] = None,
+                 replay: Optional[TranscriptStore] = None, upstream: Optional[str] = None,
+                 upstream_key: Optional[str] = None, strict: bool = False):
+        self.profile = PROFILES[profile]
+        self.record = record
+        self.replay = replay
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.upstream_key = upstream_key
+        self.strict = strict
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "CoachStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def config(self) -> StubConfig:
+        return self.server.config
+
+    def log_message(self, format, *args):
+        if not getattr(self.server, "quiet", False):
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-3.5-turbo", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        profile = self.config.profile
+
+        if profile["error_rate"] and random.random() < profile["error_rate"]:
+            status = random.choice([429, 503])
+            self._send_json(status, {"error": {"message": "Injected stub failure", "type": "server_error"}})
+            return
+
+        content = self._resolve_content(body)
+        if content is None:
+            self._send_json(404, {"error": {"message": "No recorded transcript for request", "type": "replay_miss"}})
+            return
+
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in body.get("messages", []))
+        completion_tokens = estimate_tokens(content)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+
+        time.sleep(profile["first_token_seconds"])
+        if body.get("stream"):
+            self._stream(body, content, usage)
+        else:
+            if profile["tokens_per_second"]:
+                time.sleep(completion_tokens / profile["tokens_per_second"])
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-3.5-turbo"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+    def _resolve_content(self, body: Dict[str, Any]) -> Optional[str]:
+        key = request_key(body)
+        if self.config.replay:
+            entry = self.config.replay.get(key)
+            if entry:
+                return entry["content"]
+            if self.config.strict:
+                return None
+        if self.config.record and self.config.upstream:
+            return self._record(key, body)
+        return synthetic_reply(body)
+
+    def _record(self, key: str, body: Dict[str, Any]) -> str:
+        """Forward the request upstream (non-streaming) and store the transcript."""
+        upstream_body = dict(body, stream=False)
+        request = urllib.request.Request(
+            f"{self.config.upstream}/chat/completions",
+            data=json.dumps(upstream_body).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.config.upstream_key}"},
+            method="POST",
+        )
+        started = time.monotonic()
+        with urllib.request.urlopen(request, timeout=120) as response:
+            payload = json.loads(response.read())
+        content = payload["choices"][0]["message"]["content"] or ""
+        self.config.record.add(key, body, content, payload.get("usage", {}), time.monotonic() - started)
+        return content
+
+    def _stream(self, body: Dict[str, Any], content: str, usage: Dict[str, Any]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "gpt-3.5-turbo")
+        rate = self.config.profile["tokens_per_second"]
+
+        def send(delta: Dict[str, Any], finish_reason: Optional[str] = None, extra: Optional[Dict] = None) -> None:
+            chunk = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            chunk.update(extra or {})
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send({"role": "assistant", "content": ""})
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == 0 else f" {word}"
+            send({"content": piece})
+            if rate:
+                time.sleep(estimate_tokens(piece) / rate)
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+        send({}, "stop", {"usage": usage} if include_usage else None)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def create_server(host: str = "127.0.0.1", port: int = 8765, config: Optional[StubConfig] = None,
+                  quiet: bool = False) -> ThreadingHTTPServer:
+    """Create (but don't start) a stub server; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.config = config or StubConfig()
+    server.quiet = quiet
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server for the AI coach")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--record", metavar="JSONL", help="record upstream transcripts to this file")
+    parser.add_argument("--upstream", default="https://api.openai.com/v1", help="upstream base URL for --record")
+    parser.add_argument("--replay", metavar="JSONL", help="serve recorded transcripts from this file")
+    parser.add_argument("--strict", action="store_true", help="return 404 on replay misses instead of synthetic replies")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    upstream_key = os.getenv("OPENAI_UPSTREAM_API_KEY") or os.getenv("OPENAI_API_KEY")
+    if args.record and not upstream_key:
+        parser.error("--record needs OPENAI_UPSTREAM_API_KEY (or OPENAI_API_KEY) for the upstream API")
+
+    config = StubConfig(
+        profile=args.profile,
+        record=TranscriptStore(args.record) if args.record else None,
+        replay=TranscriptStore(args.replay) if args.replay else None,
+        upstream=args.upstream if args.record else None,
+        upstream_key=upstream_key,
+        strict=args.strict,
+    )
+    server = create_server(args.host, args.port, config, quiet=args.quiet)
+    print(f"🧪 Stub OpenAI server on http://{args.host}:{server.server_address[1]}/v1 (profile: {args.profile})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping stub server")
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
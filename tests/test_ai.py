@@ -0,0 +1,124 @@
+import unittest
+import tempfile
+import os
+import shutil
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.ai import AICoach
+from coach_core.cache import ResponseCache
+from coach_core.database import CoachDatabase
+from coach_core.limiter import LLMLimiter
+from coach_core.semantic_cache import SemanticCache
+from coach_core.telemetry import Telemetry
+
+class FakeClient:
+    """OpenAI client stand-in that counts requests and answers with a fixed reply."""
+    def __init__(self, reply="Do 3 x 20s wall handstand holds."):
+        self.reply = reply
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def with_options(self, timeout=None):
+        return self
+
+    def create(self, model, messages, stream=False, **params):
+        self.requests.append({"model": model, "messages": messages, "stream": stream, **params})
+        if stream:
+            words = self.reply.split(" ")
+            return iter(
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " " * (i < len(words) - 1)))])
+                for i, word in enumerate(words)
+            )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply))],
+            usage=SimpleNamespace(prompt_tokens=50, completion_tokens=10)
+        )
+
+class TestAICoachRequestPath(unittest.TestCase):
+    def setUp(self):
+        """Set up a coach whose caches, telemetry and limiter use a temporary database and a fake client."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = CoachDatabase(os.path.join(self.temp_dir, "test_ai.db"))
+        self.client = FakeClient()
+        self.telemetry = Telemetry(self.db)
+        self.limiter = LLMLimiter(rpm=0, tpm=0, user_rpm=0, user_tpm=0)
+        for target, value in (("coach_core.ai.get_openai_client", lambda: self.client),
+                              ("coach_core.ai.get_data_generation", lambda: 1),
+                              ("coach_core.ai.llm_telemetry", self.telemetry),
+                              ("coach_core.ai.llm_limiter", self.limiter)):
+            patch(target, value).start()
+        patch.dict(os.environ, {"COACH_LLM_CACHE": "on", "COACH_SEMANTIC_CACHE": "on",
+                                "COACH_TELEMETRY": "on", "COACH_LLM_LIMITER": "on"}).start()
+        self.addCleanup(patch.stopall)
+
+        self.coach = AICoach()
+        self.coach._generation = 1
+        self.coach._profile = {"name": "Yoel"}
+        self.coach._logs = []
+        self.coach._cache = ResponseCache(self.db)
+        self.coach._semantic_cache = SemanticCache(self.db)
+        self.messages = [{"role": "user", "content": "Should I train handstands today?"}]
+
+    def tearDown(self):
+        """Clean up the temporary database."""
+        self.telemetry.flush()
+        shutil.rmtree(self.temp_dir)
+
+    def calls(self, feature):
+        self.telemetry.flush()
+        return self.telemetry.load_calls(days=1, feature=feature)
+
+    def test_repeated_prompt_is_served_from_cache(self):
+        """Test a repeated completion skips the client and each call writes one telemetry row."""
+        first = self.coach.complete(self.messages, feature="test_complete")
+        second = self.coach.complete(self.messages, feature="test_complete")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.client.requests), 1)
+
+        calls = self.calls("test_complete")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(sorted(call["cache_hit"] for call in calls), [0, 1])
+        upstream = next(call for call in calls if not call["cache_hit"])
+        self.assertEqual((upstream["prompt_tokens"], upstream["completion_tokens"]), (50, 10))
+
+        self.coach.complete(self.messages, feature="test_complete", bypass_cache=True)
+        self.assertEqual(len(self.client.requests), 2)
+
+    def test_streamed_reply_is_stored_once(self):
+        """Test a streamed reply is cached once when it completes and later streams replay it whole."""
+        with patch.object(self.coach.cache, "set", wraps=self.coach.cache.set) as cache_set:
+            streamed = "".join(self.coach.stream(self.messages, feature="test_stream"))
+        self.assertEqual(streamed, self.client.reply)
+        self.assertEqual(cache_set.call_count, 1)
+        self.assertTrue(self.client.requests[0]["stream"])
+
+        self.assertEqual(list(self.coach.stream(self.messages, feature="test_stream")), [self.client.reply])
+        self.assertEqual(len(self.client.requests), 1)
+        self.assertEqual(len(self.calls("test_stream")), 2)
+        self.assertEqual(self.limiter.stats()["active"], 0)
+
+    def test_rate_limited_falls_back_to_degraded_answer(self):
+        """Test chat answers degrade to _degraded_answer instead of failing when over the LLM budget."""
+        self.coach.get_mentor_powered_response("How long should I hold a plank?")
+        self.assertEqual(len(self.client.requests), 1)
+
+        self.limiter.user_rpm = 1
+        self.limiter._users.clear()
+        self.limiter.max_wait = 0
+        self.limiter.acquire().release()  # the user's one request this minute
+        question = "What should I eat after training?"
+        with patch.object(self.coach, "_degraded_answer", wraps=self.coach._degraded_answer) as degraded:
+            answer = self.coach.get_mentor_powered_response(question)
+            streamed = "".join(self.coach.stream_mentor_powered_response(question))
+        self.assertEqual(degraded.call_count, 2)
+        self.assertEqual(answer, self.coach.get_fallback_response(question))
+        self.assertEqual(streamed, answer)
+        self.assertEqual(len(self.client.requests), 1)
+
+if __name__ == '__main__':
+    unittest.main()
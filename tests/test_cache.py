@@ -0,0 +1,85 @@
+import unittest
+import tempfile
+import os
+import sqlite3
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.database import CoachDatabase
+from coach_core.cache import ResponseCache, fingerprint, cache_disabled
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        """Set up cache backed by a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_cache.db")
+        self.db = CoachDatabase(self.db_path)
+        self.cache = ResponseCache(self.db, ttl_seconds=60, max_entries=2)
+        self.messages = [{"role": "user", "content": "Plan my week"}]
+    
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+    
+    def test_fingerprint_depends_on_all_inputs(self):
+        """Test fingerprint changes with model, messages, params and generation."""
+        params = {"max_tokens": 100, "temperature": 0.7}
+        base = fingerprint("gpt-3.5-turbo", self.messages, params, 1)
+        
+        self.assertEqual(base, fingerprint("gpt-3.5-turbo", list(self.messages), dict(params), 1))
+        self.assertNotEqual(base, fingerprint("gpt-4o-mini", self.messages, params, 1))
+        self.assertNotEqual(base, fingerprint("gpt-3.5-turbo", [{"role": "user", "content": "x"}], params, 1))
+        self.assertNotEqual(base, fingerprint("gpt-3.5-turbo", self.messages, {"max_tokens": 200, "temperature": 0.7}, 1))
+        self.assertNotEqual(base, fingerprint("gpt-3.5-turbo", self.messages, params, 2))
+    
+    def test_set_and_get(self):
+        """Test a stored response is returned on the next lookup."""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", "Monday: push")
+        self.assertEqual(self.cache.get("a"), "Monday: push")
+    
+    def test_ttl_expiry(self):
+        """Test entries older than the TTL are treated as misses."""
+        self.cache.set("a", "old answer")
+        with patch("coach_core.database.time.time", return_value=10**10):
+            self.assertIsNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("a"))
+    
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted beyond max_entries."""
+        with patch("coach_core.database.time.time", side_effect=[1, 2, 3, 4, 5, 6, 7]):
+            self.cache.set("a", "A")
+            self.cache.set("b", "B")
+            self.cache.get("a")  # touch a so b is least recently used
+            self.cache.set("c", "C")
+            
+            self.assertEqual(self.cache.get("a"), "A")
+            self.assertIsNone(self.cache.get("b"))
+            self.assertEqual(self.cache.get("c"), "C")
+    
+    def test_cache_disabled_flag(self):
+        """Test COACH_LLM_CACHE=off bypasses the cache."""
+        with patch.dict(os.environ, {"COACH_LLM_CACHE": "off"}):
+            self.assertTrue(cache_disabled())
+        with patch.dict(os.environ, {"COACH_LLM_CACHE": "on"}):
+            self.assertFalse(cache_disabled())
+    
+    def test_data_generation_advances_on_writes(self):
+        """Test profile and log writes bump the data generation."""
+        start = self.db.get_data_generation()
+        self.db.add_log({"date": "2025-01-01", "timestamp": "2025-01-01T10:00:00"})
+        self.db.save_profile({"name": "Yoel"})
+        self.db.delete_log("2025-01-01")
+        self.assertEqual(self.db.get_data_generation(), start + 3)
+        
+        # Deleting a missing log is not a data change
+        self.db.delete_log("2025-01-01")
+        self.assertEqual(self.db.get_data_generation(), start + 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.context import (
+    estimate_tokens, compact_profile, encode_logs_table, build_context, ContextBuilder
+)
+
+def make_log(day, **fields):
+    log = {
+        "id": day, "date": f"2025-01-{day:02d}", "timestamp": f"2025-01-{day:02d}T10:00:00",
+        "energy": "7", "mood": None, "soreness": "none", "training_done": "Push Day - Moderate",
+        "notes": "", "created_at": "2025-01-01 10:00:00", "updated_at": "2025-01-01 10:00:00",
+    }
+    log.update(fields)
+    return log
+
+class TestContextBuilder(unittest.TestCase):
+    def test_estimate_tokens(self):
+        """Test the local estimator counts words, symbols and long words."""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("push day"), 2)
+        self.assertEqual(estimate_tokens("sleep: 7"), 3)
+        self.assertGreater(estimate_tokens("bulletproofing"), 1)
+    
+    def test_compact_profile_skips_empty_fields(self):
+        """Test profile encoding flattens nesting and drops nulls."""
+        profile = {"name": "Yoel", "age": None, "goals": ["strength", "mobility"],
+                   "injury_history": {"shoulder": "ongoing", "knee": None}}
+        self.assertEqual(
+            compact_profile(profile),
+            "name: Yoel\ngoals: strength, mobility\ninjury_history: shoulder: ongoing"
+        )
+    
+    def test_encode_logs_table_drops_bookkeeping_and_empty_columns(self):
+        """Test logs are encoded as a dense table without id/timestamps/null columns."""
+        table = encode_logs_table([make_log(2), make_log(1, notes="a|b")])
+        lines = table.split("\n")
+        self.assertEqual(lines[0], "date|energy|soreness|training_done|notes")
+        self.assertEqual(lines[1], "2025-01-02|7|none|Push Day - Moderate|-")
+        self.assertEqual(lines[2], "2025-01-01|7|none|Push Day - Moderate|a/b")
+        self.assertNotIn("created_at", table)
+    
+    def test_build_uses_newest_logs_first(self):
+        """Test the builder orders logs newest first and honours max_logs."""
+        logs = [make_log(day) for day in range(1, 10)]
+        context = build_context({"name": "Yoel"}, logs, "Average energy: 7", max_logs=3)
+        self.assertTrue(context.startswith("PROFILE:\nname: Yoel\n\nPATTERNS:\nAverage energy: 7"))
+        self.assertIn("2025-01-09", context)
+        self.assertIn("2025-01-07", context)
+        self.assertNotIn("2025-01-06", context)
+    
+    def test_build_respects_budget(self):
+        """Test lower-priority log rows are dropped to stay within the budget."""
+        logs = [make_log(day, notes="long note " * 10) for day in range(1, 10)]
+        builder = ContextBuilder(budget_tokens=120)
+        context = builder.build({"name": "Yoel"}, logs, max_logs=9)
+        self.assertLessEqual(estimate_tokens(context), 120)
+        self.assertIn("name: Yoel", context)
+        self.assertIn("2025-01-09", context)
+        self.assertNotIn("2025-01-01", context)
+
+if __name__ == '__main__':
+    unittest.main()
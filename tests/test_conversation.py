@@ -0,0 +1,71 @@
+import unittest
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.conversation import ConversationManager, local_summary
+
+def add_turns(conversation, count, start=0):
+    for i in range(start, start + count):
+        conversation.add("user", f"question {i}")
+        conversation.add("coach", f"answer {i}")
+
+class TestConversationManager(unittest.TestCase):
+    def test_short_chat_is_sent_verbatim(self):
+        """Test chats within the window are sent verbatim without a summary."""
+        conversation = ConversationManager(keep_last_turns=2, fold_turns=1)
+        add_turns(conversation, 3)
+        self.assertIsNone(conversation.maybe_refresh_summary(background=False))
+        context = conversation.context_messages()
+        self.assertEqual(len(context), 6)
+        self.assertEqual(context[1], {"role": "assistant", "content": "answer 0"})
+    
+    def test_older_turns_fold_into_summary(self):
+        """Test older turns are folded into the summary and the window stays bounded."""
+        calls = []
+        def summarizer(previous, messages):
+            calls.append((previous, [m["content"] for m in messages]))
+            return f"{previous} +{len(messages)}".strip()
+        
+        conversation = ConversationManager(keep_last_turns=2, fold_turns=1, summarizer=summarizer)
+        add_turns(conversation, 4)
+        conversation.maybe_refresh_summary()
+        conversation.wait(timeout=5)
+        
+        self.assertEqual(calls, [("", ["question 0", "answer 0", "question 1", "answer 1"])])
+        context = conversation.context_messages()
+        self.assertEqual(context[0]["role"], "system")
+        self.assertIn("+4", context[0]["content"])
+        self.assertEqual([m["content"] for m in context[1:]], ["question 2", "answer 2", "question 3", "answer 3"])
+        
+        # The summary keeps rolling as the chat grows
+        add_turns(conversation, 2, start=4)
+        conversation.maybe_refresh_summary(background=False)
+        self.assertEqual(calls[-1][0], "+4")
+        self.assertEqual(len(conversation.context_messages()), 5)
+    
+    def test_local_summary_fallback(self):
+        """Test a failing summarizer falls back to the local extractive summary."""
+        def broken(previous, messages):
+            raise RuntimeError("offline")
+        
+        conversation = ConversationManager(keep_last_turns=1, fold_turns=1, summarizer=broken)
+        add_turns(conversation, 3)
+        conversation.maybe_refresh_summary(background=False)
+        self.assertEqual(conversation.summary, local_summary("", [
+            {"role": "user", "content": "question 0"}, {"role": "assistant", "content": "answer 0"},
+            {"role": "user", "content": "question 1"}, {"role": "assistant", "content": "answer 1"},
+        ]))
+        self.assertIn("Yoel: question 0", conversation.summary)
+    
+    def test_clear_discards_history(self):
+        """Test clearing resets messages and summary."""
+        conversation = ConversationManager(keep_last_turns=1, fold_turns=1)
+        add_turns(conversation, 3)
+        conversation.maybe_refresh_summary(background=False)
+        conversation.clear()
+        self.assertEqual(conversation.context_messages(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -328,5 +328,58 @@ class TestCoachDatabase(unittest.TestCase):
         os.remove(profile_path)
         os.remove(logs_path)
 
+    def test_soreness_table_synced_on_write(self):
+        """Test soreness rows follow add_log, save_logs and delete_log."""
+        self.db.add_log({"date": "2025-02-01", "timestamp": "2025-02-01T10:00:00", "soreness": "Shoulders, legs"})
+        self.db.save_logs([
+            {"date": "2025-02-02", "timestamp": "2025-02-02T10:00:00", "soreness": "shoulders"},
+            {"date": "2025-02-03", "timestamp": "2025-02-03T10:00:00", "soreness": "none"},
+        ])
+        
+        counts = self.db.get_soreness_counts()
+        self.assertEqual(counts, {"Shoulders": 2, "Legs": 1})
+        
+        # Overwriting a day replaces its regions
+        self.db.add_log({"date": "2025-02-01", "timestamp": "2025-02-01T11:00:00", "soreness": "Core"})
+        self.assertEqual(self.db.get_soreness_counts(), {"Core": 1, "Shoulders": 1})
+        
+        # Deleting a day removes its regions
+        self.db.delete_log("2025-02-02")
+        self.assertEqual(self.db.get_soreness_counts(), {"Core": 1})
+    
+    def test_soreness_window_and_weekly_counts(self):
+        """Test windowed region counts and per-week heatmap rows."""
+        self.db.save_logs([
+            {"date": "2025-03-03", "timestamp": "2025-03-03T10:00:00", "soreness": "Shoulders"},
+            {"date": "2025-03-05", "timestamp": "2025-03-05T10:00:00", "soreness": "Shoulders, Back"},
+            {"date": "2025-03-12", "timestamp": "2025-03-12T10:00:00", "soreness": "Shoulders"},
+        ])
+        
+        self.assertEqual(self.db.get_soreness_counts("2025-03-04", "2025-03-31"), {"Shoulders": 2, "Back": 1})
+        
+        weekly = self.db.get_soreness_by_week(region="Shoulders")
+        self.assertEqual([(row["week"], row["days"]) for row in weekly], [("2025-09", 2), ("2025-10", 1)])
+    
+    def test_soreness_backfill(self):
+        """Test backfill rebuilds soreness rows from existing logs."""
+        self.db.add_log({"date": "2025-04-01", "timestamp": "2025-04-01T10:00:00", "soreness": "Arms, Chest"})
+        with sqlite3.connect(self.db.db_path) as conn:
+            conn.execute('DELETE FROM log_soreness')
+            conn.commit()
+        
+        # Re-opening the database backfills the empty table
+        reopened = CoachDatabase(self.db_path)
+        self.assertEqual(reopened.get_soreness_counts(), {"Arms": 1, "Chest": 1})
+        self.assertEqual(reopened.backfill_soreness(), 2)
+    
+    def test_plan_revisions(self):
+        """Test keep_previous stores a new revision and a regeneration replaces every revision."""
+        self.db.save_plan('2025-W25', 'weekly_plan', 1, 'Old')
+        self.db.save_plan('2025-W25', 'weekly_plan', 1, 'Patched', keep_previous=True)
+        self.assertEqual(self.db.get_plan('2025-W25', 'weekly_plan', 1)['content'], 'Patched')
+        self.assertEqual(len(self.db.get_plan_versions('2025-W25', 'weekly_plan')), 2)
+        self.db.save_plan('2025-W25', 'weekly_plan', 1, 'Regenerated')
+        self.assertEqual(len(self.db.get_plan_versions('2025-W25', 'weekly_plan')), 1)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
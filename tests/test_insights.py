@@ -0,0 +1,149 @@
+import unittest
+import tempfile
+import os
+import json
+import re
+import threading
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.database import CoachDatabase
+from coach_core.insights import InsightBackfill, parse_insights
+
+def make_logs(days):
+    start = date(2024, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "energy": 5 + i % 5, "training_done": "Calisthenics"}
+        for i in range(days)
+    ]
+
+def requested_dates(messages):
+    return re.search(r"for the following day.*?: (.*)\n", messages[-1]["content"]).group(1).split(", ")
+
+class FakeCoach:
+    """Coach stand-in answering every requested date."""
+    def __init__(self, logs):
+        self.profile = {"name": "Yoel"}
+        self.logs = logs
+        self.client = None
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def complete(self, messages, **kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+        dates = requested_dates(messages)
+        return json.dumps({"insights": [{"date": d, "insight": f"Insight for {d}"} for d in dates]})
+
+class FakeBatchClient:
+    """Minimal files/batches API surface."""
+    def __init__(self):
+        self.uploaded = None
+        self.status = "in_progress"
+        self.files = SimpleNamespace(create=self.create_file, content=self.file_content)
+        self.batches = SimpleNamespace(create=lambda **kwargs: SimpleNamespace(id="batch_1"), retrieve=self.retrieve)
+
+    def create_file(self, file, purpose):
+        self.uploaded = file[1].decode("utf-8")
+        return SimpleNamespace(id="file_in")
+
+    def retrieve(self, batch_id):
+        return SimpleNamespace(status=self.status, output_file_id="file_out")
+
+    def file_content(self, file_id):
+        lines = []
+        for line in self.uploaded.splitlines():
+            request = json.loads(line)
+            dates = requested_dates(request["body"]["messages"])
+            content = json.dumps({"insights": [{"date": d, "insight": "Batched"} for d in dates]})
+            lines.append(json.dumps({"custom_id": request["custom_id"], "response": {"body": {
+                "model": "gpt-3.5-turbo", "choices": [{"message": {"content": content}}]}}}))
+        return SimpleNamespace(text="\n".join(lines + ["not json"]))
+
+class TestInsightBackfill(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_insights.db")
+        self.db = CoachDatabase(self.db_path)
+
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+
+    def test_year_takes_a_handful_of_requests(self):
+        """Test a year of logs is backfilled in blocks and a second run has nothing to do."""
+        coach = FakeCoach(make_logs(365))
+        result = InsightBackfill(coach, self.db).run()
+
+        self.assertEqual(result["saved"], 365)
+        self.assertLessEqual(result["requests"], 8)
+        self.assertEqual(len(coach.calls), result["requests"])
+        self.assertEqual(coach.calls[0]["response_format"], {"type": "json_object"})
+        self.assertEqual(len(self.db.get_daily_insights()), 365)
+
+        self.assertEqual(InsightBackfill(coach, self.db).run()["requests"], 0)
+
+    def test_prompt_limit_and_token_budget(self):
+        """Test small prompt limits create more blocks and the budget leaves days for later."""
+        coach = FakeCoach(make_logs(40))
+        backfill = InsightBackfill(coach, self.db, prompt_token_limit=300, token_budget=10 ** 6)
+        blocks = backfill.plan(backfill.pending_logs())
+        self.assertGreater(len(blocks), 1)
+        self.assertEqual(sum(len(b["dates"]) for b in blocks), 40)
+
+        # Later blocks carry the preceding days as context without requesting them
+        self.assertIn(blocks[0]["dates"][-1], blocks[1]["messages"][1]["content"])
+        self.assertNotIn(blocks[0]["dates"][-1], blocks[1]["dates"])
+
+        limited = InsightBackfill(coach, self.db, prompt_token_limit=300, token_budget=blocks[0]["tokens"])
+        result = limited.run()
+        self.assertEqual(result["requests"], 1)
+        self.assertEqual(result["saved"], len(blocks[0]["dates"]))
+        self.assertEqual(result["deferred"], 40 - len(blocks[0]["dates"]))
+
+    def test_long_blocks_get_longer_deadlines(self):
+        """Test each request's deadline grows with the output it asks for, never below the route budget."""
+        coach = FakeCoach(make_logs(90))
+        InsightBackfill(coach, self.db, days_per_request=60).run()
+        deadlines = sorted(call["deadline"] for call in coach.calls)
+
+        self.assertEqual(deadlines[0], 60.0)  # 30 days fit within the route's latency budget
+        self.assertGreater(deadlines[-1], 60.0)  # 60 days need more time for ~2750 output tokens
+        self.assertGreaterEqual(deadlines[-1], 2750 / 40)
+
+    def test_parse_insights_ignores_other_dates(self):
+        """Test only requested dates with non-empty insights are kept."""
+        text = json.dumps({"insights": [
+            {"date": "2024-01-01", "insight": " Rest well "},
+            {"date": "2023-12-31", "insight": "Not asked for"},
+            {"date": "2024-01-02", "insight": ""},
+        ]})
+        self.assertEqual(parse_insights(text, ["2024-01-01", "2024-01-02"]), {"2024-01-01": "Rest well"})
+        with self.assertRaises(ValueError):
+            parse_insights('{"days": []}', ["2024-01-01"])
+
+    def test_offline_batch_submit_and_collect(self):
+        """Test batch mode uploads one JSONL job and stores results once it completes."""
+        coach = FakeCoach(make_logs(90))
+        coach.client = FakeBatchClient()
+        backfill = InsightBackfill(coach, self.db)
+
+        self.assertEqual(backfill.submit_batch(), "batch_1")
+        self.assertIsNone(backfill.submit_batch())  # dates already in flight
+        self.assertEqual(backfill.collect_batches(), 0)
+
+        coach.client.status = "completed"
+        self.assertEqual(backfill.collect_batches(), 90)
+        self.assertEqual(self.db.get_daily_insights()[0]["source"], "batch")
+        self.assertEqual(self.db.get_pending_insight_batches(), [])
+        self.assertEqual(coach.calls, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.intents import (
+    IntentRouter, route, classify_feedback, is_bare,
+    FEEDBACK, GENERAL, HELP, INJURY, NUTRITION, REFLECTION, TIRED, TRAINING, WEEKLY_PLAN,
+    INJURY_CONCERN, NEEDS_PROGRESSION, POSITIVE
+)
+
+class TestIntentRouter(unittest.TestCase):
+    def test_what_questions_do_not_route_to_help(self):
+        """Test 'what' questions reach their real intent instead of the help message."""
+        self.assertEqual(route("What should I train today?"), TRAINING)
+        self.assertEqual(route("What should I eat after training?"), NUTRITION)
+        self.assertEqual(route("What do you think about handstands?"), GENERAL)
+
+    def test_priorities(self):
+        """Test the highest-priority intent wins when several keywords match."""
+        self.assertEqual(route("I felt the plan was too hard"), FEEDBACK)
+        self.assertEqual(route("Can you help me plan my week?"), WEEKLY_PLAN)
+        self.assertEqual(route("My workout caused shoulder pain"), INJURY)
+        self.assertEqual(route("Sunday reflection please"), REFLECTION)
+        self.assertEqual(route("I'm tired and low energy"), TIRED)
+        self.assertEqual(route("help"), HELP)
+
+    def test_word_boundaries(self):
+        """Test keywords only match whole words."""
+        self.assertEqual(route("I did planks and painted the fence"), GENERAL)
+        self.assertEqual(route("Generate a weekly training plan for me"), WEEKLY_PLAN)
+
+    def test_schedule_and_program_chat_is_not_a_plan_request(self):
+        """Test "schedule" and "program" only ask for a plan with training wording."""
+        self.assertEqual(route("My work schedule is crazy this week, how do I fit in sessions?"), GENERAL)
+        self.assertEqual(route("What program do you like for handstands?"), GENERAL)
+        self.assertEqual(route("Build me a training program"), WEEKLY_PLAN)
+        self.assertEqual(route("Update my training schedule"), WEEKLY_PLAN)
+
+    def test_classify_feedback(self):
+        """Test feedback types are classified with their own rules."""
+        self.assertEqual(classify_feedback("Felt great today"), POSITIVE)
+        self.assertEqual(classify_feedback("Session felt too easy"), NEEDS_PROGRESSION)
+        self.assertEqual(classify_feedback("Felt great but my shoulder tight again"), INJURY_CONCERN)
+        self.assertEqual(classify_feedback("Nothing to report"), GENERAL)
+
+    def test_bare_help(self):
+        """Test only bare help requests count as bare; help with a topic is a real question."""
+        self.assertTrue(is_bare("help", HELP))
+        self.assertTrue(is_bare("Hi coach, can you help me?", HELP))
+        self.assertTrue(is_bare("What can you do?", HELP))
+        self.assertFalse(is_bare("help me eat better", HELP))
+        self.assertFalse(is_bare("help with my shoulder", HELP))
+        self.assertFalse(is_bare("What should I eat?", HELP))
+        self.assertFalse(is_bare("can you help me figure out my mobility", HELP))
+
+    def test_custom_rules(self):
+        """Test a router over a custom rule table and its match listing."""
+        router = IntentRouter((("a", 2, ("mobility work",)), ("b", 1, ("mobility",))))
+        self.assertEqual(router.route("Some  Mobility   work", {"a", "b"}), "a")
+        self.assertEqual(router.route("mobility only", {"a", "b"}), "b")
+        self.assertEqual(router.matches("mobility work"), [("a", "mobility work", 0), ("b", "mobility work", 0)])
+
+if __name__ == '__main__':
+    unittest.main()
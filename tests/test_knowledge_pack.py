@@ -0,0 +1,98 @@
+import unittest
+import tempfile
+import os
+import json
+import shutil
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.knowledge_pack import KnowledgePack, build_index, DATA_PATH, INDEX_PATH
+from coach_core import mentor_brain
+
+class TestKnowledgePack(unittest.TestCase):
+    def setUp(self):
+        """Set up a two-mentor pack in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.temp_dir, "mentors.jsonl")
+        self.index_path = os.path.join(self.temp_dir, "index.json")
+        self.write_mentors([
+            {"id": "dylan_werner", "name": "Dylan Werner", "focus": "Isometric strength", "key_principles": ["Control"]},
+            {"id": "everydamnandré", "name": "Everydamnandré", "focus": "Kettlebells", "key_principles": ["Grit"]},
+        ])
+        self.pack = KnowledgePack(self.data_path, self.index_path)
+        self.pack.write_index()
+
+    def tearDown(self):
+        """Clean up the temporary pack."""
+        shutil.rmtree(self.temp_dir)
+
+    def write_mentors(self, mentors):
+        with open(self.data_path, "w", encoding="utf-8") as f:
+            for mentor in mentors:
+                f.write(json.dumps(mentor, ensure_ascii=False) + "\n")
+
+    def test_lazy_lookup_by_offset(self):
+        """Test single mentors are parsed from their indexed byte range."""
+        pack = KnowledgePack(self.data_path, self.index_path)
+        self.assertIsNone(pack._index)
+
+        mentor = pack.get("everydamnandré")
+        self.assertEqual(mentor["name"], "Everydamnandré")
+        self.assertNotIn("id", mentor)
+        self.assertEqual(list(pack._mentors), ["everydamnandré"])
+        self.assertEqual(pack.get("unknown"), {})
+        self.assertEqual(pack.mentor_ids(), ["dylan_werner", "everydamnandré"])
+        self.assertGreater(pack.tokens("dylan_werner"), 0)
+
+    def test_edited_pack_changes_version(self):
+        """Test editing the data file without reindexing still loads correctly under a new version."""
+        old_version = self.pack.version
+        self.write_mentors([
+            {"id": "squat_u", "name": "SquatU", "focus": "Joint safety", "key_principles": ["Depth"]},
+        ])
+        pack = KnowledgePack(self.data_path, self.index_path)
+
+        self.assertNotEqual(pack.version, old_version)
+        self.assertEqual(list(pack.all()), ["squat_u"])
+        self.assertEqual(pack.get("squat_u")["focus"], "Joint safety")
+
+    def test_build_index(self):
+        """Test offsets and lengths cover each line exactly."""
+        with open(self.data_path, "rb") as f:
+            data = f.read()
+        index = build_index(data)
+
+        for entry in index["mentors"].values():
+            line = data[entry["offset"]:entry["offset"] + entry["length"]]
+            self.assertTrue(line.endswith(b"\n"))
+            json.loads(line)
+        self.assertEqual(index["version"], index["sha256"][:12])
+
+    def test_shipped_index_is_current(self):
+        """Test the committed index.json matches the committed mentors.jsonl."""
+        with open(DATA_PATH, "rb") as f:
+            expected = build_index(f.read())
+        with open(INDEX_PATH, "r") as f:
+            self.assertEqual(json.load(f), expected)
+
+    def test_mentor_brain_api(self):
+        """Test mentor_brain keeps its module attributes and helpers on top of the pack."""
+        self.assertEqual(mentor_brain.KNOWLEDGE_VERSION, mentor_brain.get_knowledge_version())
+        self.assertEqual(len(mentor_brain.MENTOR_KNOWLEDGE), 15)
+        self.assertEqual(mentor_brain.get_mentor_context("Dylan Werner")["name"], "Dylan Werner")
+        self.assertIn("SquatU", mentor_brain.create_mentor_prompt("squat_u", "Deeper squats?"))
+        with self.assertRaises(AttributeError):
+            mentor_brain.NOT_A_THING
+
+    def test_comprehensive_guidance(self):
+        """Test the combined guidance is one string covering every mentor in the pack."""
+        guidance = mentor_brain.get_comprehensive_mentor_guidance()
+        self.assertIsInstance(guidance, str)
+        self.assertTrue(guidance.strip())
+        for mentor in mentor_brain.get_all_mentors_context().values():
+            self.assertIn(mentor["name"], guidance)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.limiter import LLMLimiter, RateLimited, TokenBucket, as_user, current_user
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refill_and_debt(self):
+        """Test the bucket refills at its per-minute rate and oversized takes leave a debt to wait off."""
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock=clock)
+        self.assertEqual(bucket.wait_time(60), 0)
+        bucket.take(90)
+        self.assertAlmostEqual(bucket.wait_time(1), 31)
+        clock.now = 31
+        self.assertEqual(bucket.wait_time(1), 0)
+        # Refunds never overfill, and a zero rate means unlimited
+        bucket.adjust(-1000)
+        self.assertEqual(bucket.level, 60)
+        self.assertEqual(TokenBucket(0, clock=clock).wait_time(10 ** 6), 0)
+
+class TestLLMLimiter(unittest.TestCase):
+    def setUp(self):
+        patch.dict(os.environ, {"COACH_LLM_LIMITER": "on"}).start()
+        self.addCleanup(patch.stopall)
+
+    def test_user_budget_fails_fast(self):
+        """Test a user over their own budget is refused at once without affecting other users."""
+        limiter = LLMLimiter(rpm=0, tpm=0, user_rpm=2, user_tpm=0, max_wait=1)
+        for _ in range(2):
+            limiter.acquire(user="chatty").release()
+        started = time.monotonic()
+        with self.assertRaises(RateLimited) as raised:
+            limiter.acquire(user="chatty")
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertGreater(raised.exception.retry_after, 1)
+        limiter.acquire(user="quiet").release()
+
+    def test_concurrency_cap_and_timeout(self):
+        """Test requests beyond the concurrency cap queue until a release, or time out."""
+        limiter = LLMLimiter(rpm=0, tpm=0, user_rpm=0, user_tpm=0, concurrency=1)
+        permit = limiter.acquire(user="a")
+        with self.assertRaises(RateLimited):
+            limiter.acquire(user="b", timeout=0.05)
+        self.assertEqual(limiter.stats()["waiting"], 0)
+
+        threading.Timer(0.05, permit.release).start()
+        with limiter.acquire(user="b", timeout=2):
+            self.assertEqual(limiter.stats()["active"], 1)
+        self.assertEqual(limiter.stats()["active"], 0)
+
+    def test_fair_round_robin(self):
+        """Test queued users take turns instead of one user's backlog going first."""
+        limiter = LLMLimiter(rpm=0, tpm=0, user_rpm=0, user_tpm=0, concurrency=1)
+        blocker = limiter.acquire(user="a")
+        order = []
+
+        def request(user):
+            with limiter.acquire(user=user, timeout=5):
+                order.append(user)
+
+        threads = []
+        for user in ("a", "a", "a", "b", "c"):
+            threads.append(threading.Thread(target=request, args=(user,)))
+            threads[-1].start()
+            time.sleep(0.02)
+        blocker.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order[:3], ["a", "b", "c"])
+
+    def test_settle_charges_actual_tokens(self):
+        """Test the token bucket is corrected from the estimate to the tokens actually used."""
+        limiter = LLMLimiter(rpm=0, tpm=1000, user_rpm=0, user_tpm=0)
+        with limiter.acquire(800, user="a") as permit:
+            permit.settle(100)
+        self.assertAlmostEqual(limiter.tokens.level, 900, delta=1)
+
+    def test_async_acquire_and_user_scope(self):
+        """Test the async acquire admits and dequeues on cancellation, and as_user scopes the caller."""
+        limiter = LLMLimiter(rpm=0, tpm=0, user_rpm=0, user_tpm=0, concurrency=1)
+        with as_user("session-1"):
+            self.assertEqual(current_user(), "session-1")
+            permit = limiter.acquire()
+        self.assertEqual(permit.user, "session-1")
+        self.assertEqual(current_user(), "default")
+
+        async def waits():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(limiter.acquire_async(user="b"), timeout=0.1)
+            self.assertEqual(limiter.stats()["waiting"], 0)
+            permit.release()
+            (await limiter.acquire_async(user="b")).release()
+        asyncio.run(waits())
+        self.assertEqual(limiter.stats()["active"], 0)
+
+    def test_disable_switch(self):
+        """Test COACH_LLM_LIMITER=off admits everything."""
+        limiter = LLMLimiter(rpm=1, concurrency=1, max_wait=0)
+        with patch.dict(os.environ, {"COACH_LLM_LIMITER": "off"}):
+            permits = [limiter.acquire() for _ in range(3)]
+        self.assertEqual(limiter.stats()["active"], 0)
+        for permit in permits:
+            permit.release()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.mentor_index import rank_mentors, tokenize, DEFAULT_MENTORS, DEFAULT_TOP_K
+from coach_core.prompts import get_system_prompt
+
+class TestMentorIndex(unittest.TestCase):
+    def test_tokenize(self):
+        """Test tokenization drops stopwords and plural endings."""
+        self.assertEqual(tokenize("What should I do for my Shoulders?"), ["shoulder"])
+    
+    def test_rank_relevant_mentor_first(self):
+        """Test specific questions surface the matching mentor first."""
+        self.assertEqual(rank_mentors("I want kettlebell conditioning")[0], "everydamnandré")
+        self.assertEqual(rank_mentors("handstand and planche holds")[0], "dylan_werner")
+    
+    def test_rank_pads_with_generalists(self):
+        """Test questions with no matches fall back to the default mentors."""
+        self.assertEqual(rank_mentors("hi"), DEFAULT_MENTORS[:DEFAULT_TOP_K])
+        self.assertEqual(len(rank_mentors("kettlebell", k=2)), 2)
+    
+    def test_selected_prompt_is_smaller(self):
+        """Test a top-k system prompt only carries the selected mentor sections."""
+        selected = rank_mentors("kettlebell swings")
+        prompt = get_system_prompt(selected)
+        self.assertIn("Everydamnandré - ", prompt)
+        self.assertNotIn("Joe Rogan - ", prompt)
+        self.assertLess(len(prompt), len(get_system_prompt()) / 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.panel import stream_panel, mentor_messages
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+class FakeAsyncClient:
+    """Async client stand-in that streams per-mentor words with a configurable delay."""
+    def __init__(self, delays):
+        self.delays = delays
+        self.active = 0
+        self.max_active = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, stream, **params):
+        mentor = messages[0]["content"].split(",")[0].replace("You are ", "")
+        delay = self.delays.get(mentor, 0.01)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+
+        async def generate():
+            try:
+                for word in ("Move", " well"):
+                    await asyncio.sleep(delay)
+                    yield chunk(word)
+            finally:
+                self.active -= 1
+        return generate()
+
+class TestMentorPanel(unittest.TestCase):
+    def setUp(self):
+        self.mentors = ["dylan_werner", "patrick_beach", "squat_u"]
+        # Keep test calls out of the telemetry table and the shared rate limiter
+        patch.dict(os.environ, {"COACH_TELEMETRY": "off", "COACH_LLM_LIMITER": "off"}).start()
+        self.addCleanup(patch.stopall)
+
+    def collect(self, client, **kwargs):
+        answers = {}
+        for mentor_id, delta in stream_panel("How do I fix my shoulder?", "PROFILE: Yoel", self.mentors,
+                                             client=client, **kwargs):
+            answers[mentor_id] = answers.get(mentor_id, "") + delta
+        return answers
+
+    def test_mentor_prompt_uses_create_mentor_prompt(self):
+        """Test each mentor gets their own persona prompt plus the shared context."""
+        messages = mentor_messages("squat_u", "How do I squat deeper?", "PROFILE: Yoel")
+        self.assertIn("SquatU", messages[0]["content"])
+        self.assertIn("How do I squat deeper?", messages[0]["content"])
+        self.assertIn("PROFILE: Yoel", messages[1]["content"])
+
+    def test_mentors_run_concurrently(self):
+        """Test wall-clock time is close to one call rather than the sum of all calls."""
+        client = FakeAsyncClient({})
+        client.delays = {name: 0.2 for name in ("Dylan Werner", "Patrick Beach", "SquatU")}
+        started = time.monotonic()
+        answers = self.collect(client)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(set(answers), set(self.mentors))
+        self.assertTrue(all(answer == "Move well" for answer in answers.values()))
+        self.assertEqual(client.max_active, 3)
+        self.assertLess(elapsed, 1.0)
+
+    def test_semaphore_bounds_concurrency(self):
+        """Test no more than `concurrency` mentors are in flight at once."""
+        client = FakeAsyncClient({})
+        self.collect(client, concurrency=1)
+        self.assertEqual(client.max_active, 1)
+
+    def test_slow_mentor_is_cut_off(self):
+        """Test a mentor slower than the deadline keeps only what it streamed in time."""
+        client = FakeAsyncClient({"SquatU": 0.3})
+        answers = self.collect(client, deadline=0.45)
+
+        self.assertEqual(answers["dylan_werner"], "Move well")
+        self.assertEqual(answers["squat_u"], "Move")
+
+if __name__ == '__main__':
+    unittest.main()
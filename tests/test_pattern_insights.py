@@ -0,0 +1,123 @@
+import unittest
+import tempfile
+import os
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.database import CoachDatabase, add_write_listener, remove_write_listener
+from coach_core.pattern_insights import InsightWorker, compute_pattern_insight, get_pattern_insight
+from coach_core.routing import PATTERN_INSIGHT
+
+def make_log(day, energy=7):
+    return {"date": f"2025-06-{day:02d}", "energy": energy, "training_done": "Push", "timestamp": f"2025-06-{day:02d}T08:00:00"}
+
+class TestPatternInsights(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary database and a counting completion."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_patterns.db")
+        self.db = CoachDatabase(self.db_path)
+        self.calls = []
+        self.writes = []
+
+    def tearDown(self):
+        """Clean up test database and listeners."""
+        remove_write_listener(self.writes.append)
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+
+    def complete(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        return f"Insight #{len(self.calls)}"
+
+    def test_write_listeners(self):
+        """Test listeners run after add_log, save_logs and delete_log, and their errors never fail writes."""
+        def broken(db_path):
+            raise RuntimeError("boom")
+
+        add_write_listener(self.writes.append)
+        add_write_listener(broken)
+        try:
+            self.db.add_log(make_log(1))
+            self.db.save_logs([make_log(2), make_log(3)])
+            self.db.delete_log("2025-06-01")
+            self.db.delete_log("2025-06-01")
+        finally:
+            remove_write_listener(broken)
+        self.assertEqual(self.writes, [self.db_path] * 3)
+        self.assertEqual(len(self.db.load_logs()), 2)
+
+    def test_computed_once_per_generation(self):
+        """Test the insight is generated once per data generation and recomputed after a write."""
+        self.db.add_log(make_log(1))
+        first = compute_pattern_insight(self.db, self.complete)
+        self.assertEqual(first["insight"], "Insight #1")
+        self.assertEqual(self.calls[0]["kind"], PATTERN_INSIGHT)
+        self.assertEqual(compute_pattern_insight(self.db, self.complete)["insight"], "Insight #1")
+        self.assertEqual(len(self.calls), 1)
+
+        self.db.add_log(make_log(2, energy=4))
+        self.assertTrue(get_pattern_insight(self.db)["stale"])
+        compute_pattern_insight(self.db, self.complete)
+        stored = get_pattern_insight(self.db)
+        self.assertFalse(stored["stale"])
+        self.assertEqual(stored["insight"], "Insight #2")
+
+    def test_summary_without_client_is_completed_later(self):
+        """Test a summary-only row is stored without a client and gets its insight once one is available."""
+        self.db.add_log(make_log(1))
+        stored = compute_pattern_insight(self.db)
+        self.assertIsNone(stored["insight"])
+        self.assertTrue(stored["summary"])
+
+        self.assertEqual(compute_pattern_insight(self.db, self.complete)["insight"], "Insight #1")
+
+    def test_failed_insight_is_retried_with_backoff(self):
+        """Test a failed generation isn't served as current and is retried once its backoff has passed."""
+        self.db.add_log(make_log(1))
+        compute_pattern_insight(self.db, self.complete)
+        self.db.add_log(make_log(2))
+
+        def failing(messages, **kwargs):
+            self.calls.append(kwargs)
+            raise RuntimeError("timeout")
+
+        failed = compute_pattern_insight(self.db, failing)
+        self.assertEqual((failed["insight"], failed["attempts"]), (None, 1))
+        stored = get_pattern_insight(self.db)
+        self.assertEqual(stored["insight"], "Insight #1")
+        self.assertTrue(stored["stale"])
+
+        # Within the backoff nothing is requested; afterwards the insight is regenerated
+        compute_pattern_insight(self.db, self.complete)
+        self.assertEqual(len(self.calls), 2)
+        with patch("coach_core.pattern_insights.time.time", return_value=failed["created_at"] + 61):
+            self.assertEqual(compute_pattern_insight(self.db, self.complete)["insight"], "Insight #3")
+        self.assertFalse(get_pattern_insight(self.db)["stale"])
+
+    def test_summary_covers_newest_week(self):
+        """Test the stored summary describes the latest seven days, not the oldest."""
+        for day in range(1, 15):
+            self.db.add_log(make_log(day, energy=2 if day <= 7 else 8))
+        self.assertIn("Average energy: 8.0/10", compute_pattern_insight(self.db)["summary"])
+
+    def test_worker_coalesces_bursts(self):
+        """Test a burst of write notifications leads to a single computation."""
+        worker = InsightWorker(lambda: self.complete, debounce=0.2)
+        add_write_listener(worker.notify)
+        try:
+            for day in range(1, 6):
+                self.db.add_log(make_log(day))
+            worker.join()
+        finally:
+            remove_write_listener(worker.notify)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertFalse(get_pattern_insight(self.db)["stale"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import json
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.plan_patcher import PlanPatcher, scale_reps
+from coach_core.plans import DAYS
+from coach_core.intents import INJURY_CONCERN, NEEDS_PROGRESSION, NEEDS_REGRESSION, RECOVERY_NEEDED, POSITIVE
+
+def exercise(name, sets=3, reps="8-10", shoulder_load=False):
+    return {"name": name, "sets": sets, "reps": reps, "tempo": "", "rest_seconds": 90, "notes": "", "shoulder_load": shoulder_load}
+
+def sample_plan():
+    exercises = {
+        "Monday": [exercise("Push-ups", shoulder_load=True), exercise("Squats", sets=2)],
+        "Wednesday": [exercise("Ring support hold", reps="3-5", shoulder_load=True), exercise("Lunges")],
+        "Friday": [exercise("Pull-ups", sets=4, reps="5", shoulder_load=True)],
+    }
+    return {
+        "focus": "",
+        "notes": "",
+        "days": [
+            {"day": day, "focus": "", "type": "training" if day in exercises else "rest", "exercises": exercises.get(day, [])}
+            for day in DAYS
+        ],
+    }
+
+class TestPlanPatcher(unittest.TestCase):
+    def setUp(self):
+        self.plan = sample_plan()
+        self.calls = []
+
+    def day(self, plan, name):
+        return next(d for d in plan["days"] if d["day"] == name)
+
+    def test_scale_reps(self):
+        """Test reps ranges, counts and timed sets scale and keep their suffix."""
+        self.assertEqual(scale_reps("8-10", 0.8), "6-8")
+        self.assertEqual(scale_reps("30s", 1.2), "36s")
+        self.assertEqual(scale_reps("1", 0.8), "1")
+        self.assertEqual(scale_reps("AMRAP", 1.2), "AMRAP")
+
+    def test_regression_only_touches_remaining_days(self):
+        """Test regressing drops a set (or reps at two sets) from today onwards only."""
+        result = PlanPatcher().patch(self.plan, NEEDS_REGRESSION, start_day=2)
+
+        self.assertEqual(result["days"], ["Wednesday", "Friday"])
+        self.assertEqual(self.day(result["plan"], "Monday"), self.day(self.plan, "Monday"))
+        self.assertEqual(self.day(result["plan"], "Wednesday")["exercises"][0]["sets"], 2)
+        self.assertEqual(self.day(result["plan"], "Friday")["exercises"][0]["sets"], 3)
+        self.assertEqual(self.day(self.plan, "Friday")["exercises"][0]["sets"], 4)
+
+        result = PlanPatcher().patch(self.plan, NEEDS_REGRESSION)
+        self.assertEqual(self.day(result["plan"], "Monday")["exercises"][1]["reps"], "6-8")
+
+    def test_progression_and_recovery(self):
+        """Test progressing raises reps and recovery converts only the next training day."""
+        result = PlanPatcher().patch(self.plan, NEEDS_PROGRESSION)
+        self.assertEqual(self.day(result["plan"], "Friday")["exercises"][0]["reps"], "6")
+
+        result = PlanPatcher().patch(self.plan, RECOVERY_NEEDED, start_day=1)
+        self.assertEqual(result["days"], ["Wednesday"])
+        self.assertEqual(self.day(result["plan"], "Wednesday")["type"], "recovery")
+        self.assertEqual(PlanPatcher().patch(self.plan, POSITIVE)["days"], [])
+
+    def test_shoulder_swaps_locally_without_llm(self):
+        """Test known shoulder exercises are swapped and unknown ones dropped when no LLM is available."""
+        result = PlanPatcher().patch(self.plan, INJURY_CONCERN, "Shoulder tight")
+        plan = result["plan"]
+
+        self.assertEqual(self.day(plan, "Monday")["exercises"][0]["name"], "Hollow body hold")
+        self.assertEqual(self.day(plan, "Friday")["exercises"][0]["name"], "Single-leg Romanian deadlift")
+        self.assertEqual([e["name"] for e in self.day(plan, "Wednesday")["exercises"]], ["Lunges"])
+        self.assertFalse(any(e["shoulder_load"] for d in plan["days"] for e in d["exercises"]))
+        self.assertEqual(result["days"], ["Monday", "Wednesday", "Friday"])
+
+    def test_llm_refines_only_unresolved_days(self):
+        """Test only days the rules could not resolve are sent to the LLM, and bad days are ignored."""
+        def complete(messages, **kwargs):
+            self.calls.append(messages)
+            wednesday = {"day": "Wednesday", "type": "training", "exercises": [exercise("Hanging knee raises"), exercise("Lunges")]}
+            return json.dumps({"days": [wednesday, {"day": "Monday", "type": "rest", "exercises": []}]})
+
+        result = PlanPatcher(complete).patch(self.plan, INJURY_CONCERN, "Shoulder pain")
+        prompt = self.calls[0][1]["content"]
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertIn("Ring support hold", prompt)
+        self.assertNotIn("Pull-ups", prompt)
+        self.assertEqual(result["refined"], ["Wednesday"])
+        self.assertEqual(self.day(result["plan"], "Wednesday")["exercises"][0]["name"], "Hanging knee raises")
+        self.assertEqual(self.day(result["plan"], "Monday")["type"], "training")
+
+    def test_unsafe_refinement_is_dropped(self):
+        """Test a rewritten day that keeps a shoulder exercise falls back to dropping it."""
+        def complete(messages, **kwargs):
+            wednesday = {"day": "Wednesday", "type": "training",
+                         "exercises": [exercise("Ring support hold", reps="3-5"), exercise("Lunges")]}
+            return json.dumps({"days": [wednesday]})
+
+        result = PlanPatcher(complete).patch(self.plan, INJURY_CONCERN, "Shoulder pain")
+        self.assertEqual(result["refined"], [])
+        self.assertEqual([e["name"] for e in self.day(result["plan"], "Wednesday")["exercises"]], ["Lunges"])
+        self.assertIn("Wednesday: removed Ring support hold", result["changes"])
+
+    def test_refined_day_changes_are_rebuilt(self):
+        """Test change lines of a rewritten day describe the rewrite against the original day."""
+        self.day(self.plan, "Wednesday")["exercises"].insert(0, exercise("Dips", shoulder_load=True))
+
+        def complete(messages, **kwargs):
+            # The rewrite drops the rule-based Hollow body hold swap for Dips
+            wednesday = {"day": "Wednesday", "type": "training", "exercises": [exercise("Dead bug"), exercise("Lunges")]}
+            return json.dumps({"days": [wednesday]})
+
+        result = PlanPatcher(complete).patch(self.plan, INJURY_CONCERN, "Shoulder pain")
+        wednesday = [line for line in result["changes"] if line.startswith("Wednesday")]
+        self.assertEqual(wednesday, ["Wednesday: removed Dips", "Wednesday: removed Ring support hold",
+                                     "Wednesday: added Dead bug"])
+        self.assertIn("Monday: Push-ups → Hollow body hold", result["changes"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import unittest
+import tempfile
+import os
+import json
+from datetime import date, datetime
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.database import CoachDatabase
+from coach_core.limiter import RateLimited
+from coach_core.planner import Planner, PlanScheduler, RATE_LIMITED_MESSAGE, week_key, plan_week, in_precompute_window
+from coach_core.plans import DAYS
+from coach_core.routing import WEEKLY_PLAN, REFLECTION
+
+def make_plan(focus):
+    return {
+        "focus": focus,
+        "days": [
+            {"day": day, "type": "training" if i % 2 == 0 else "rest",
+             "exercises": [{"name": "Ring rows", "sets": 3, "reps": "8-10"}] if i % 2 == 0 else []}
+            for i, day in enumerate(DAYS)
+        ],
+    }
+
+class FakeCoach:
+    """Coach stand-in that counts completions; JSON requests get a valid plan unless replies (or errors) are queued."""
+    def __init__(self):
+        self.profile = {"name": "Yoel"}
+        self.logs = []
+        self.client = object()
+        self.calls = []
+        self.replies = []
+
+    def complete(self, messages, kind, feature=None, bypass_cache=False, **kwargs):
+        self.calls.append((kind, messages, kwargs))
+        if self.replies:
+            reply = self.replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+        if kwargs.get("response_format"):
+            return json.dumps(make_plan(f"{kind} #{len(self.calls)}"))
+        return f"{kind} #{len(self.calls)}"
+
+class TestPlanner(unittest.TestCase):
+    def setUp(self):
+        """Set up a planner backed by a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_planner.db")
+        self.db = CoachDatabase(self.db_path)
+        self.coach = FakeCoach()
+        self.now = datetime(2025, 6, 18, 9, 0)  # Wednesday
+        self.planner = Planner(self.coach, self.db, now=lambda: self.now)
+
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+
+    def test_week_helpers(self):
+        """Test weeks are keyed by Monday and plans roll to next week on Saturday evening."""
+        self.assertEqual(week_key(date(2025, 6, 22)), "2025-06-16")
+        self.assertEqual(plan_week(datetime(2025, 6, 18, 9)), "2025-06-16")
+        self.assertFalse(in_precompute_window(datetime(2025, 6, 21, 10)))
+        self.assertTrue(in_precompute_window(datetime(2025, 6, 21, 21)))
+        self.assertEqual(plan_week(datetime(2025, 6, 22, 8)), "2025-06-23")
+
+    def test_stored_plan_is_reused_until_data_changes(self):
+        """Test repeated requests are served from storage and regenerate after a log write."""
+        first = self.planner.weekly_plan()
+        self.assertEqual(self.planner.weekly_plan(), first)
+        self.assertEqual(len(self.coach.calls), 1)
+
+        self.db.add_log({"date": "2025-06-18", "energy": 7, "timestamp": "2025-06-18T08:00:00"})
+        second = self.planner.weekly_plan()
+        self.assertNotEqual(second, first)
+        self.assertEqual(len(self.coach.calls), 2)
+        self.assertEqual(self.planner.stored(WEEKLY_PLAN)["content"], second)
+
+    def test_bypass_cache_regenerates(self):
+        """Test regenerate skips the stored plan and replaces it."""
+        self.planner.weekly_plan()
+        fresh = self.planner.weekly_plan(bypass_cache=True)
+        self.assertEqual(len(self.coach.calls), 2)
+        self.assertEqual(self.planner.weekly_plan(), fresh)
+
+    def test_reflection_with_feedback_is_not_stored(self):
+        """Test feedback reflections are generated live and include the feedback."""
+        self.planner.reflection(feedback="2025-06-18 [needs_regression] Too hard")
+        self.assertIsNone(self.planner.stored(REFLECTION))
+        self.assertIn("Too hard", self.coach.calls[0][1][1]["content"])
+
+    def test_rate_limited_serves_stored_plan(self):
+        """Test a rate-limited request serves the last stored plan, or a friendly message without one."""
+        limited = RateLimited("Over the LLM budget for 3f2a9c; retry in 20s", 20)
+        self.coach.replies = [limited]
+        self.assertEqual(self.planner.reflection(), RATE_LIMITED_MESSAGE)
+        self.assertNotIn("3f2a9c", RATE_LIMITED_MESSAGE)
+
+        first = self.planner.weekly_plan()
+        self.db.add_log({"date": "2025-06-18", "energy": 7, "timestamp": "2025-06-18T08:00:00"})
+        self.coach.replies = [limited]
+        self.assertEqual(self.planner.weekly_plan(), first)
+        self.assertIsNone(self.planner.stored(WEEKLY_PLAN))  # still due for regeneration
+
+    def test_precompute_only_in_window(self):
+        """Test the scheduler tick generates next week's plan and the reflection once on the weekend."""
+        scheduler = PlanScheduler(lambda: self.planner)
+        self.assertEqual(scheduler.tick(), [])
+
+        self.now = datetime(2025, 6, 21, 21, 0)  # Saturday evening
+        self.assertEqual(scheduler.tick(), [WEEKLY_PLAN, REFLECTION])
+        self.assertEqual(scheduler.tick(), [])
+        self.assertIn("weekly_plan #1", self.db.get_plan("2025-06-23", WEEKLY_PLAN)["content"])
+        self.assertEqual(self.db.get_plan("2025-06-16", REFLECTION)["content"], "reflection #2")
+
+        # Clicking the button now returns the precomputed plan instantly
+        self.assertIn("weekly_plan #1", self.planner.weekly_plan())
+        self.assertEqual(len(self.coach.calls), 2)
+
+    def test_weekly_plan_is_stored_structured(self):
+        """Test JSON plans are requested, stored in normalized rows and rendered from storage."""
+        content = self.planner.weekly_plan()
+        kwargs = self.coach.calls[0][2]
+        self.assertEqual(kwargs["response_format"], {"type": "json_object"})
+
+        stored = self.planner.stored(WEEKLY_PLAN)
+        self.assertEqual(stored["content"], content)
+        self.assertEqual(len(stored["plan"]["days"]), 7)
+        self.assertEqual(stored["plan"]["days"][0]["exercises"][0]["reps"], "8-10")
+        self.assertIn("Ring rows: 3 × 8-10", content)
+
+    def test_invalid_plan_is_repaired_then_falls_back_to_text(self):
+        """Test one repair request is made before falling back to a free-text plan."""
+        self.coach.replies = ["not json", json.dumps(make_plan("fixed"))]
+        self.assertIn("fixed", self.planner.weekly_plan())
+        self.assertIn("invalid", self.coach.calls[1][1][-1]["content"])
+
+        self.coach.replies = ['{"days": []}', "still not json", "Monday: rest"]
+        self.assertEqual(self.planner.weekly_plan(bypass_cache=True), "Monday: rest")
+        self.assertIsNone(self.planner.stored(WEEKLY_PLAN)["plan"])
+
+    def test_edit_updates_plan_in_place(self):
+        """Test edits are validated and saved without another completion."""
+        self.planner.weekly_plan()
+        stored = self.planner.stored(WEEKLY_PLAN)
+        plan = stored["plan"]
+        plan["days"][0]["exercises"][0]["sets"] = 4
+        content = self.planner.edit(stored["id"], plan)
+
+        self.assertIn("4 × 8-10", content)
+        self.assertEqual(self.planner.stored(WEEKLY_PLAN)["plan"]["days"][0]["exercises"][0]["sets"], 4)
+        self.assertEqual(len(self.coach.calls), 1)
+
+        plan["days"][0]["exercises"][0]["sets"] = 0
+        with self.assertRaises(ValueError):
+            self.planner.edit(stored["id"], plan)
+
+    def test_adjust_patches_stored_plan(self):
+        """Test feedback patches today's remaining days and the next plan request serves the patch."""
+        self.assertIsNone(self.planner.adjust("needs_regression"))
+        self.planner.weekly_plan()
+
+        result = self.planner.adjust("needs_regression", "Too hard")  # Wednesday
+        self.assertEqual(result["days"], ["Wednesday", "Friday", "Sunday"])
+        self.assertIn("Ring rows: 2 × 8-10", result["content"])
+        self.assertEqual(self.planner.weekly_plan(), result["content"])
+        self.assertEqual(self.planner.stored(WEEKLY_PLAN)["plan"]["days"][0]["exercises"][0]["reps"], "8-10")
+        self.assertEqual(len(self.coach.calls), 1)
+
+        # The pre-feedback plan is kept as its own version
+        versions = self.db.get_plan_versions(self.planner.stored(WEEKLY_PLAN)["week"], WEEKLY_PLAN)
+        self.assertEqual(len(versions), 2)
+        original = self.db.get_structured_plan(versions[-1]["id"])
+        self.assertEqual(original["days"][2]["exercises"][0]["sets"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import tempfile
+import os
+import json
+import sqlite3
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.database import CoachDatabase
+from coach_core.plans import (
+    DAYS, PlanValidationError, parse_plan, render_plan, validate, diff_plans, plan_rows, plan_from_rows, PLAN_SCHEMA
+)
+
+def sample_plan():
+    return {
+        "focus": "Pulling strength",
+        "days": [
+            {"day": day, "focus": "Pull" if i == 0 else "", "type": "training" if i == 0 else "rest",
+             "exercises": [{"name": "Ring rows", "sets": 3, "reps": "8-10", "tempo": "3-1-1-0", "rest_seconds": 90}] if i == 0 else []}
+            for i, day in enumerate(DAYS)
+        ],
+    }
+
+class TestPlanParsing(unittest.TestCase):
+    def test_parse_fenced_json(self):
+        """Test JSON inside code fences is parsed, normalized and ordered by weekday."""
+        data = sample_plan()
+        data["days"].reverse()
+        plan = parse_plan(f"```json\n{json.dumps(data)}\n```")
+
+        self.assertEqual([day["day"] for day in plan["days"]], DAYS)
+        exercise = plan["days"][0]["exercises"][0]
+        self.assertEqual(exercise["notes"], "")
+        self.assertFalse(exercise["shoulder_load"])
+        self.assertEqual(plan["notes"], "")
+
+    def test_schema_errors(self):
+        """Test wrong types, ranges, enums and missing days are reported."""
+        data = sample_plan()
+        data["days"][0]["exercises"][0]["sets"] = "3"
+        data["days"][1]["type"] = "party"
+        data["days"][2]["exercises"] = [{"name": "Dips", "sets": 11, "reps": "5"}]
+        errors = validate(data, PLAN_SCHEMA)
+        self.assertEqual(len(errors), 3)
+        self.assertIn("$.days[0].exercises[0].sets: expected integer", errors)
+
+        data = sample_plan()
+        data["days"][6]["day"] = "Monday"
+        with self.assertRaises(PlanValidationError) as ctx:
+            parse_plan(json.dumps(data))
+        self.assertIn("exactly once", str(ctx.exception))
+        with self.assertRaises(PlanValidationError):
+            parse_plan("Here is your plan: rest all week")
+
+    def test_render_and_diff(self):
+        """Test rendering and day-level comparison of plans."""
+        plan = parse_plan(json.dumps(sample_plan()))
+        rendered = render_plan(plan)
+        self.assertIn("**Focus:** Pulling strength", rendered)
+        self.assertIn("- Ring rows: 3 × 8-10 @ 3-1-1-0, rest 90s", rendered)
+
+        changed = json.loads(json.dumps(plan))
+        changed["days"][0]["exercises"][0]["sets"] = 2
+        self.assertEqual(diff_plans(plan, changed), ["Monday"])
+        self.assertEqual(diff_plans(None, plan), DAYS)
+
+    def test_rows_round_trip(self):
+        """Test edited table rows rebuild the plan, dropping blank rows and coercing editor floats."""
+        plan = parse_plan(json.dumps(sample_plan()))
+        rows = plan_rows(plan)
+        self.assertEqual(plan_from_rows(plan, rows), plan)
+
+        rows[0]["sets"] = 4.0
+        rows[0]["rest_seconds"] = float("nan")
+        rows.append({"day": "Tuesday", "position": 0, "name": "Squats", "sets": 3, "reps": "10"})
+        rows.append({"day": "Tuesday", "position": 1, "name": "", "sets": None})
+        edited = plan_from_rows(plan, rows)
+        self.assertEqual(edited["days"][0]["exercises"][0]["sets"], 4)
+        self.assertIsNone(edited["days"][0]["exercises"][0]["rest_seconds"])
+        self.assertEqual([e["name"] for e in edited["days"][1]["exercises"]], ["Squats"])
+        self.assertEqual(validate(edited, PLAN_SCHEMA), [])
+
+class TestPlanStorage(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_plans.db")
+
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+
+    def test_round_trip_and_replace(self):
+        """Test structured plans round-trip through the normalized tables without orphaned rows."""
+        db = CoachDatabase(self.db_path)
+        plan = parse_plan(json.dumps(sample_plan()))
+        db.save_plan("2025-06-16", "weekly_plan", 1, render_plan(plan), plan)
+        plan_id = db.save_plan("2025-06-16", "weekly_plan", 1, render_plan(plan), plan)
+
+        self.assertEqual(db.get_structured_plan(plan_id), plan)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM plan_items").fetchone()[0], 1)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM plan_days").fetchone()[0], 7)
+
+        text_id = db.save_plan("2025-06-16", "weekly_plan", 2, "Free text plan")
+        self.assertIsNone(db.get_structured_plan(text_id))
+        self.assertEqual([v["id"] for v in db.get_plan_versions("2025-06-16", "weekly_plan")], [text_id, plan_id])
+
+if __name__ == '__main__':
+    unittest.main()
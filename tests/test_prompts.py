@@ -0,0 +1,32 @@
+import unittest
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core import prompts
+from coach_core.mentor_brain import MENTOR_KNOWLEDGE, get_knowledge_version
+
+class TestPrompts(unittest.TestCase):
+    def test_system_prompt_includes_all_mentors(self):
+        """Test the compiled system prompt embeds every mentor section."""
+        system_prompt = prompts.get_system_prompt()
+        for mentor in MENTOR_KNOWLEDGE.values():
+            self.assertIn(f"{mentor['name']} - {mentor['focus']}:", system_prompt)
+        self.assertTrue(system_prompt.startswith("You are Yoel's personal AI fitness coach"))
+        self.assertTrue(system_prompt.endswith("combines the best insights from these mentors."))
+    
+    def test_prompt_compiled_once_per_version(self):
+        """Test repeated lookups reuse the compiled prompt for the current version."""
+        first = prompts.get_system_prompt()
+        self.assertIs(first, prompts.get_system_prompt())
+        self.assertEqual(list(prompts._compiled), [get_knowledge_version()])
+    
+    def test_build_user_context(self):
+        """Test only the dynamic fields are interpolated into the user context."""
+        context = prompts.build_user_context("PROFILE:\nname: Yoel", "Leg day?")
+        self.assertIn("PROFILE:\nname: Yoel", context)
+        self.assertIn("YOEL'S QUESTION/REQUEST:\nLeg day?", context)
+
+if __name__ == '__main__':
+    unittest.main()
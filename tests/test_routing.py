@@ -0,0 +1,91 @@
+import unittest
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.routing import ModelRouter, ROUTES, QUICK_CHAT, REFLECTION, WEEKLY_PLAN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        self.routes = {
+            QUICK_CHAT: {"model": "fast", "fast_model": "fast", "max_tokens": 500, "temperature": 0.8, "latency_budget": 5.0},
+            WEEKLY_PLAN: {"model": "large", "fast_model": "fast", "max_tokens": 800, "temperature": 0.7, "latency_budget": 20.0},
+            REFLECTION: {"model": "large", "fast_model": "fast", "max_tokens": 400, "temperature": 0.8, "latency_budget": 15.0},
+        }
+        self.clock = FakeClock()
+        self.router = ModelRouter(self.routes, min_samples=3, probe_every=4, probe_interval=300,
+                                  max_age=3600, clock=self.clock)
+
+    def slow_plans(self, count=3):
+        for _ in range(count):
+            self.router.record(WEEKLY_PLAN, "large", 30.0)
+
+    def test_routes_cover_every_kind(self):
+        """Test the default table defines model and params for each kind."""
+        for kind, route in ROUTES.items():
+            self.assertEqual(set(route), {"model", "fast_model", "max_tokens", "temperature", "latency_budget"}, kind)
+
+    def test_select_uses_primary_model(self):
+        """Test kinds route to their primary model with the table's params."""
+        self.assertEqual(self.router.select(WEEKLY_PLAN), {"model": "large", "max_tokens": 800, "temperature": 0.7})
+        self.assertEqual(self.router.select(QUICK_CHAT)["model"], "fast")
+        with self.assertRaises(ValueError):
+            self.router.select("unknown")
+
+    def test_downgrades_when_p95_over_budget(self):
+        """Test slow primary models are swapped for the fast model, with periodic probes."""
+        self.slow_plans()
+        models = [self.router.select(WEEKLY_PLAN)["model"] for _ in range(8)]
+        self.assertEqual(models, ["fast", "fast", "fast", "large", "fast", "fast", "fast", "large"])
+
+    def test_single_outlier_does_not_downgrade(self):
+        """Test one slow call among fast ones isn't enough to downgrade."""
+        for _ in range(4):
+            self.router.record(WEEKLY_PLAN, "large", 5.0)
+        self.router.record(WEEKLY_PLAN, "large", 40.0)
+        self.assertEqual(self.router.select(WEEKLY_PLAN)["model"], "large")
+
+    def test_latency_is_tracked_per_kind(self):
+        """Test slow weekly plans don't downgrade reflections on the same model, and fast-model calls are ignored."""
+        self.slow_plans()
+        self.router.record(WEEKLY_PLAN, "fast", 1.0)
+        self.assertEqual(self.router.select(REFLECTION)["model"], "large")
+        self.assertEqual(self.router.select(WEEKLY_PLAN)["model"], "fast")
+
+    def test_recovers_when_latency_drops(self):
+        """Test a probe chosen by select() that comes back under budget restores the primary model."""
+        self.slow_plans()
+        models = []
+        for _ in range(5):
+            selected = self.router.select(WEEKLY_PLAN)["model"]
+            models.append(selected)
+            self.router.record(WEEKLY_PLAN, selected, 4.0)
+        self.assertEqual(models, ["fast", "fast", "fast", "large", "large"])
+
+    def test_infrequent_kinds_probe_after_interval_and_samples_expire(self):
+        """Test a rarely used kind probes the primary after a quiet spell and old slow samples expire."""
+        self.slow_plans()
+        self.assertEqual(self.router.select(WEEKLY_PLAN)["model"], "fast")
+        self.clock.now += 301
+        self.assertEqual(self.router.select(WEEKLY_PLAN)["model"], "large")
+
+        self.clock.now += 3600
+        self.assertIsNone(self.router.p95(WEEKLY_PLAN))
+        self.assertEqual(self.router.select(WEEKLY_PLAN)["model"], "large")
+
+    def test_not_enough_samples(self):
+        """Test the router doesn't downgrade on too few samples."""
+        self.router.record(WEEKLY_PLAN, "large", 30.0)
+        self.assertIsNone(self.router.p95(WEEKLY_PLAN))
+        self.assertEqual(self.router.select(WEEKLY_PLAN)["model"], "large")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import tempfile
+import os
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.database import CoachDatabase
+from coach_core.semantic_cache import (
+    SemanticCache, embed, similarity, cache_scope, compatible, semantic_cache_disabled, DEGRADED_THRESHOLD
+)
+
+def score(a, b):
+    return similarity(embed(a), embed(b))
+
+class TestEmbedding(unittest.TestCase):
+    def test_rephrasings_are_close(self):
+        """Test rephrased questions clear the default threshold."""
+        self.assertGreater(score("What should I train today?", "what's today's workout"), 0.85)
+        self.assertGreater(score("How do I get better at handstands", "how do i get better at my handstand?"), 0.85)
+        self.assertAlmostEqual(score("Rest day ideas", "rest day ideas"), 1.0, places=5)
+
+    def test_different_questions_are_apart(self):
+        """Test questions that differ in what they ask about stay below the threshold."""
+        self.assertLess(score("What should I train today", "What should I train tomorrow"), 0.85)
+        self.assertLess(score("How can I improve my handstand", "How can I improve my squat"), 0.85)
+        self.assertLess(score("What should I eat after training", "What should I train today"), 0.85)
+        self.assertEqual(embed("?!"), {})
+
+    def test_negations_and_short_near_misses_are_incompatible(self):
+        """Test questions differing by a negation or a short-question content word never match."""
+        self.assertGreater(score("I am tired", "I am not tired"), 0.85)
+        self.assertFalse(compatible("I am tired", "I am not tired"))
+        self.assertFalse(compatible("Should I train if my shoulder doesn't hurt", "Should I train if my shoulder hurts"))
+        self.assertFalse(compatible("how many push-ups", "how many pull-ups"))
+        self.assertTrue(compatible("What should I train today?", "what's today's workout"))
+        self.assertTrue(compatible("How do I get better at handstands", "how do i get better at my handstand?"))
+
+    def test_scope_includes_history(self):
+        """Test conversations get their own scope and fresh chats share one."""
+        history = [{"role": "user", "content": "My shoulder hurts"}]
+        self.assertEqual(cache_scope("quick_chat"), "quick_chat")
+        self.assertNotEqual(cache_scope("quick_chat", history), "quick_chat")
+        self.assertEqual(cache_scope("quick_chat", history), cache_scope("quick_chat", list(history)))
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        """Set up a cache backed by a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_semantic.db")
+        self.db = CoachDatabase(self.db_path)
+        self.cache = SemanticCache(self.db)
+
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+
+    def test_serves_similar_question_in_same_scope(self):
+        """Test a near-duplicate question is answered from the cache, but not in another scope."""
+        self.cache.add("What should I train today?", "quick_chat", "Pull day")
+        answer, similarity_score = self.cache.lookup("what's today's workout", "quick_chat")
+        self.assertEqual(answer, "Pull day")
+        self.assertGreater(similarity_score, 0.85)
+        self.assertIsNone(self.cache.lookup("what's today's workout", "quick_chat:abc"))
+        self.assertIsNone(self.cache.lookup("How can I improve my squat", "quick_chat"))
+
+    def test_incompatible_questions_are_not_served(self):
+        """Test near-duplicates with a different meaning miss, even at the degraded threshold."""
+        self.cache.add("I am tired", "quick_chat", "Take a rest day")
+        self.cache.add("how many push-ups", "quick_chat", "3 x 10")
+        self.assertIsNone(self.cache.lookup("I am not tired", "quick_chat"))
+        self.assertIsNone(self.cache.lookup("how many pull-ups", "quick_chat", threshold=DEGRADED_THRESHOLD))
+        self.assertEqual(self.cache.lookup("I'm tired", "quick_chat")[0], "Take a rest day")
+
+    def test_new_data_invalidates(self):
+        """Test a log write moves the generation on so earlier answers are no longer served."""
+        self.cache.add("What should I train today?", "quick_chat", "Pull day")
+        self.db.add_log({"date": "2025-06-18", "energy": 3, "timestamp": "2025-06-18T08:00:00"})
+        self.assertIsNone(self.cache.lookup("What should I train today?", "quick_chat"))
+
+        # Entries from older generations are dropped on the next write
+        self.cache.add("Any rest day ideas?", "quick_chat", "Walk")
+        self.assertEqual(self.db.clear_llm_cache(), 1)
+
+    def test_ttl_and_eviction(self):
+        """Test expired entries are not served and the table is capped."""
+        expired = SemanticCache(self.db, ttl_seconds=-1)
+        self.cache.add("What should I train today?", "quick_chat", "Pull day")
+        self.assertIsNone(expired.lookup("What should I train today?", "quick_chat"))
+
+        capped = SemanticCache(self.db, max_entries=2)
+        for question in ("Rest day ideas", "Best warm up", "Protein needs"):
+            capped.add(question, "quick_chat", question.upper())
+        self.assertIsNone(capped.lookup("Rest day ideas", "quick_chat"))
+        self.assertEqual(capped.lookup("Protein needs", "quick_chat")[0], "PROTEIN NEEDS")
+
+    def test_disable_switches(self):
+        """Test COACH_SEMANTIC_CACHE=off and COACH_LLM_CACHE=off both turn it off."""
+        with patch.dict(os.environ, {"COACH_SEMANTIC_CACHE": "off"}):
+            self.assertTrue(semantic_cache_disabled())
+        with patch.dict(os.environ, {"COACH_SEMANTIC_CACHE": "on", "COACH_LLM_CACHE": "off"}):
+            self.assertTrue(semantic_cache_disabled())
+        with patch.dict(os.environ, {"COACH_SEMANTIC_CACHE": "on", "COACH_LLM_CACHE": "on"}):
+            self.assertFalse(semantic_cache_disabled())
+
+if __name__ == '__main__':
+    unittest.main()
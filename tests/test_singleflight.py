@@ -0,0 +1,65 @@
+import unittest
+import threading
+import time
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.singleflight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        """Test identical concurrent requests run the function once."""
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+        
+        def slow_plan():
+            calls.append(1)
+            release.wait(5)
+            return "weekly plan"
+        
+        results = []
+        def worker():
+            results.append(flight.do("plan", slow_plan))
+        
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while flight.in_flight() == 0:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(r[0] for r in results), ["weekly plan"] * 5)
+        self.assertEqual(sum(1 for _, shared in results if not shared), 1)
+        self.assertEqual(flight.in_flight(), 0)
+    
+    def test_errors_propagate_to_followers(self):
+        """Test followers see the leader's exception and later calls retry."""
+        flight = SingleFlight()
+        call, leader = flight.join("k")
+        follower, is_leader = flight.join("k")
+        self.assertTrue(leader)
+        self.assertFalse(is_leader)
+        self.assertIs(call, follower)
+        
+        flight.finish("k", call, error=ValueError("upstream down"))
+        with self.assertRaises(ValueError):
+            follower.wait(1)
+        
+        # The key is free again after the leader finishes
+        self.assertEqual(flight.do("k", lambda: "ok"), ("ok", False))
+    
+    def test_different_keys_do_not_coalesce(self):
+        """Test distinct fingerprints run independently."""
+        flight = SingleFlight()
+        self.assertEqual(flight.do("a", lambda: 1), (1, False))
+        self.assertEqual(flight.do("b", lambda: 2), (2, False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from stub_server import StubConfig, TranscriptStore, create_server, request_key
+
+def start(config):
+    server = create_server(port=0, config=config, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def post(base_url, body):
+    request = urllib.request.Request(
+        f"{base_url}/chat/completions",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    return urllib.request.urlopen(request, timeout=10)
+
+class TestStubServer(unittest.TestCase):
+    def setUp(self):
+        self.body = {
+            "model": "gpt-3.5-turbo",
+            "messages": [{"role": "user", "content": "Plan my week"}],
+            "max_tokens": 40,
+            "temperature": 0.7,
+        }
+        self.servers = []
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def serve(self, config):
+        server, base_url = start(config)
+        self.servers.append(server)
+        return base_url
+
+    def test_blocking_completion(self):
+        """Test the stub returns a chat.completion with usage."""
+        base_url = self.serve(StubConfig(profile="instant"))
+        with post(base_url, self.body) as response:
+            payload = json.loads(response.read())
+
+        self.assertEqual(payload["object"], "chat.completion")
+        self.assertTrue(payload["choices"][0]["message"]["content"])
+        self.assertGreater(payload["usage"]["completion_tokens"], 0)
+
+    def test_streaming_completion(self):
+        """Test streaming sends SSE chunks that add up to the full reply."""
+        base_url = self.serve(StubConfig(profile="instant"))
+        with post(base_url, self.body) as response:
+            blocking = json.loads(response.read())["choices"][0]["message"]["content"]
+
+        pieces = []
+        with post(base_url, dict(self.body, stream=True)) as response:
+            self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+            lines = [line.decode("utf-8").strip() for line in response]
+        events = [line[len("data: "):] for line in lines if line.startswith("data: ")]
+
+        self.assertEqual(events[-1], "[DONE]")
+        for event in events[:-1]:
+            pieces.append(json.loads(event)["choices"][0]["delta"].get("content") or "")
+        self.assertEqual("".join(pieces), blocking)
+
+    def test_record_then_replay(self):
+        """Test transcripts recorded from an upstream are replayed verbatim."""
+        upstream = self.serve(StubConfig(profile="instant"))
+        path = os.path.join(self.temp_dir, "transcripts.jsonl")
+
+        recorder = self.serve(StubConfig(profile="instant", record=TranscriptStore(path),
+                                         upstream=upstream, upstream_key="stub"))
+        with post(recorder, self.body) as response:
+            recorded = json.loads(response.read())["choices"][0]["message"]["content"]
+
+        store = TranscriptStore(path)
+        self.assertEqual(store.get(request_key(self.body))["content"], recorded)
+
+        replayer = self.serve(StubConfig(profile="instant", replay=store, strict=True))
+        with post(replayer, dict(self.body, stream=True)) as response:
+            events = [line.decode("utf-8").strip()[len("data: "):] for line in response
+                      if line.startswith(b"data: ") and b"[DONE]" not in line]
+        replayed = "".join(json.loads(e)["choices"][0]["delta"].get("content") or "" for e in events)
+        self.assertEqual(replayed, recorded)
+
+    def test_strict_replay_miss(self):
+        """Test strict replay returns 404 for unrecorded requests."""
+        store = TranscriptStore(os.path.join(self.temp_dir, "empty.jsonl"))
+        base_url = self.serve(StubConfig(profile="instant", replay=store, strict=True))
+
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            post(base_url, self.body)
+        self.assertEqual(ctx.exception.code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
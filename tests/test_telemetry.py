@@ -0,0 +1,115 @@
+import unittest
+import tempfile
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.database import CoachDatabase
+from coach_core.telemetry import Telemetry, summarize_calls, percentile
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        """Set up telemetry backed by a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_telemetry.db")
+        self.db = CoachDatabase(self.db_path)
+        self.telemetry = Telemetry(self.db, max_rows=3)
+        self.messages = [{"role": "user", "content": "Plan my week"}]
+
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+
+    def test_record_upstream_call(self):
+        """Test a finished record stores timings, usage and model."""
+        record = self.telemetry.start("weekly_plan", "gpt-4o")
+        record.mark_sent()
+        record.mark_first_token()
+        record.set_usage(SimpleNamespace(prompt_tokens=120, completion_tokens=40))
+        row = record.finish()
+        self.telemetry.flush()
+
+        calls = self.telemetry.load_calls(days=1)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0]["feature"], "weekly_plan")
+        self.assertEqual(calls[0]["model"], "gpt-4o")
+        self.assertEqual(calls[0]["prompt_tokens"], 120)
+        self.assertEqual(calls[0]["completion_tokens"], 40)
+        self.assertEqual(calls[0]["cache_hit"], 0)
+        self.assertIsNone(calls[0]["error"])
+        self.assertGreaterEqual(row["latency_ms"], row["ttft_ms"])
+
+    def test_estimated_usage_and_errors(self):
+        """Test usage is estimated without an API usage block and errors store their class."""
+        record = self.telemetry.start("quick_chat", "gpt-3.5-turbo", streamed=True)
+        record.set_usage(None, self.messages, "Three rounds of push-ups")
+        record.finish(TimeoutError("slow"))
+        record.finish()
+        self.telemetry.flush()
+
+        calls = self.telemetry.load_calls(days=1)
+        self.assertEqual(len(calls), 1)
+        self.assertGreater(calls[0]["prompt_tokens"], 0)
+        self.assertGreater(calls[0]["completion_tokens"], 0)
+        self.assertEqual(calls[0]["error"], "TimeoutError")
+        self.assertEqual(calls[0]["streamed"], 1)
+
+    def test_history_is_capped(self):
+        """Test only the newest max_rows records are kept."""
+        for i in range(5):
+            self.telemetry.start(f"feature_{i}", "gpt-3.5-turbo").finish()
+            self.telemetry.flush()
+
+        features = [c["feature"] for c in self.telemetry.load_calls(days=1)]
+        self.assertEqual(features, ["feature_2", "feature_3", "feature_4"])
+
+    def test_disabled(self):
+        """Test COACH_TELEMETRY=off records nothing."""
+        with patch.dict(os.environ, {"COACH_TELEMETRY": "off"}):
+            self.telemetry.start("quick_chat", "gpt-3.5-turbo").finish()
+        self.telemetry.flush()
+        self.assertEqual(self.telemetry.load_calls(days=1), [])
+
+    def test_tokens_by_day(self):
+        """Test token usage is grouped per day and feature."""
+        for feature, tokens in (("weekly_plan", 100), ("weekly_plan", 50), ("quick_chat", 10)):
+            record = self.telemetry.start(feature, "gpt-3.5-turbo")
+            record.set_usage(SimpleNamespace(prompt_tokens=tokens, completion_tokens=1))
+            record.finish()
+        self.telemetry.max_rows = None
+        self.telemetry.flush()
+
+        usage = {row["feature"]: row for row in self.telemetry.tokens_by_day(days=1)}
+        self.assertEqual(usage["weekly_plan"]["prompt_tokens"], 150)
+        self.assertEqual(usage["weekly_plan"]["calls"], 2)
+        self.assertEqual(usage["quick_chat"]["completion_tokens"], 1)
+        self.assertEqual(usage["weekly_plan"]["day"], time.strftime("%Y-%m-%d"))
+
+    def test_summarize_calls(self):
+        """Test per-feature percentiles, cache hit rate and ordering by p95."""
+        def call(feature, latency, cache_hit=0, error=None):
+            return {"feature": feature, "latency_ms": latency, "ttft_ms": latency / 2, "prompt_tokens": 10,
+                    "completion_tokens": 5, "cache_hit": cache_hit, "shared": 0, "error": error}
+
+        calls = [call("quick_chat", ms) for ms in (100, 200, 300, 400)] + [
+            call("weekly_plan", 5000), call("weekly_plan", 1, cache_hit=1), call("weekly_plan", 9000, error="APITimeoutError")
+        ]
+        summary = summarize_calls(calls)
+
+        self.assertEqual([row["feature"] for row in summary], ["weekly_plan", "quick_chat"])
+        self.assertEqual(summary[1]["p50_ms"], 200)
+        self.assertEqual(summary[1]["p95_ms"], 400)
+        self.assertEqual(summary[0]["cache_hit_rate"], 0.333)
+        self.assertEqual(summary[0]["errors"], 1)
+        self.assertEqual(summary[0]["tokens"], 45)
+        self.assertIsNone(percentile([], 95))
+
+if __name__ == '__main__':
+    unittest.main()
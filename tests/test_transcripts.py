@@ -0,0 +1,141 @@
+import unittest
+import tempfile
+import os
+import io
+import json
+import zlib
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.conversation import ConversationManager
+from coach_core.database import CoachDatabase
+from coach_core.transcripts import TranscriptStore, ZLIB, decompress_chunks, iter_lines
+
+class FakeClock:
+    def __init__(self, moment):
+        self.moment = moment
+
+    def __call__(self):
+        return self.moment
+
+class TestTranscriptStore(unittest.TestCase):
+    def setUp(self):
+        """Set up a zlib store backed by a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_transcripts.db")
+        self.db = CoachDatabase(self.db_path)
+        self.clock = FakeClock(datetime(2025, 6, 18, 9, 0))
+        self.store = TranscriptStore(self.db, codec=ZLIB, flush_records=100, flush_seconds=3600, now=self.clock)
+        patch.dict(os.environ, {"COACH_TRANSCRIPTS": "on"}).start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+
+    def chat(self, turns, session_id="s1", feature="chat"):
+        for i in range(turns):
+            self.store.record(feature, "user", f"Should I train handstands today? Question {i}", session_id=session_id)
+            self.store.record(feature, "assistant", "Yes: 5 x 30s wall holds, then shoulder mobility.",
+                              session_id=session_id)
+
+    def test_batches_append_to_one_block_per_session_day_feature(self):
+        """Test repeated flushes grow the day's block and other sessions, days and features get their own."""
+        self.chat(10)
+        self.assertEqual(self.db.find_transcript_blocks(), [])  # still buffered
+        self.assertEqual(self.store.flush(), 20)
+        self.chat(10)
+        self.store.flush()
+        self.chat(1, session_id="s2")
+        self.chat(1, feature="weekly_coach")
+        self.clock.moment = datetime(2025, 6, 19, 9, 0)
+        self.chat(1)
+
+        blocks = self.store.stats()
+        self.assertEqual(blocks["blocks"], 4)
+        self.assertEqual(blocks["records"], 46)
+        self.assertGreater(blocks["ratio"], 5)
+
+        first = self.db.find_transcript_blocks(feature="chat", session_id="s1")[0]
+        self.assertEqual((first["day"], first["records"]), ("2025-06-18", 40))
+
+    def test_flushes_append_frames_without_rewriting(self):
+        """Test a flush appends a compressed frame to the open block and leaves stored data untouched."""
+        self.chat(5)
+        self.store.flush()
+        first = self.db.get_transcript_block_data(self.db.find_transcript_blocks()[0]["block_id"])
+        self.chat(5)
+        self.store.flush()
+        (block,) = self.db.find_transcript_blocks()
+        data = self.db.get_transcript_block_data(block["block_id"])
+        self.assertTrue(data.startswith(first))
+        self.assertEqual((block["records"], block["stored_bytes"]), (20, len(data)))
+        self.assertEqual(len(list(self.store.iter_records())), 20)
+
+    def test_timer_flushes_idle_buffer(self):
+        """Test buffered records are written after flush_seconds even when no further record arrives."""
+        store = TranscriptStore(self.db, codec=ZLIB, flush_records=100, flush_seconds=0.05, now=self.clock)
+        store.record("chat", "user", "Last message before closing the tab", session_id="s1")
+        deadline = time.monotonic() + 2
+        while not self.db.find_transcript_blocks() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.db.find_transcript_blocks()[0]["records"], 1)
+
+    def test_lookup_and_streaming_export(self):
+        """Test records come back in order, filtered by date and feature, with their block keys."""
+        self.chat(2)
+        self.store.record("weekly_plan", "assistant", "## Monday\nPush", {"week": "2025-W25"}, session_id="s1")
+        self.clock.moment = datetime(2025, 6, 20, 9, 0)
+        self.chat(1)
+
+        records = list(self.store.iter_records(end_date="2025-06-18", feature="chat"))
+        self.assertEqual([r["role"] for r in records], ["user", "assistant"] * 2)
+        self.assertEqual(records[0]["content"], "Should I train handstands today? Question 0")
+        self.assertEqual((records[0]["day"], records[0]["session_id"]), ("2025-06-18", "s1"))
+
+        out = io.StringIO()
+        self.assertEqual(self.store.export(out, feature="weekly_plan"), 1)
+        self.assertEqual(json.loads(out.getvalue())["meta"], {"week": "2025-W25"})
+        self.assertEqual(len(list(self.store.iter_records(start_date="2025-06-19"))), 2)
+
+    def test_blocks_are_sealed_at_size_limit(self):
+        """Test a day's history is split into blocks once the raw size limit is reached."""
+        store = TranscriptStore(self.db, codec=ZLIB, block_bytes=2000, flush_records=5, now=self.clock)
+        for i in range(60):
+            store.record("chat", "user", f"Message number {i} about mobility", session_id="s1")
+        store.flush()
+        blocks = self.db.find_transcript_blocks()
+        self.assertGreater(len(blocks), 1)
+        self.assertTrue(all(block["raw_bytes"] <= 2100 for block in blocks))
+        contents = [r["content"] for r in store.iter_records()]
+        self.assertEqual(contents, [f"Message number {i} about mobility" for i in range(60)])
+
+    def test_chunked_decompression(self):
+        """Test lines split across decompressed chunks and concatenated frames are reassembled."""
+        raw = [json.dumps({"n": i, "pad": "x" * 100}).encode() + b"\n" for i in range(2000)]
+        frames = zlib.compress(b"".join(raw[:700])) + zlib.compress(b"".join(raw[700:]))
+        with patch("coach_core.transcripts.CHUNK_BYTES", 1024):
+            lines = list(iter_lines(decompress_chunks(frames, ZLIB)))
+        self.assertEqual(len(lines), 2000)
+        self.assertEqual(json.loads(lines[-1])["n"], 1999)
+
+    def test_conversation_turns_and_disable_switch(self):
+        """Test conversation turns reach the archive and COACH_TRANSCRIPTS=off keeps them out."""
+        conversation = ConversationManager(
+            on_add=lambda role, content: self.store.record("chat", role, content, session_id="s1")
+        )
+        conversation.add("user", "My shoulder hurts")
+        conversation.add("coach", "Skip overhead work today.")
+        with patch.dict(os.environ, {"COACH_TRANSCRIPTS": "off"}):
+            conversation.add("user", "Not archived")
+        self.assertEqual([r["role"] for r in self.store.iter_records()], ["user", "assistant"])
+
+if __name__ == '__main__':
+    unittest.main()
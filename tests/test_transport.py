@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import patch
+
+# Import the modules to test
+import sys
+sys.path.append('..')
+
+from coach_core.transport import (
+    ResilientTransport, CircuitBreaker, CircuitOpenError, DeadlineExceeded, is_retryable
+)
+
+class UpstreamError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def flaky(failures, status_code=503, result="ok"):
+    """Build an attempt function that fails `failures` times before succeeding."""
+    calls = []
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) <= failures:
+            raise UpstreamError(status_code)
+        return result
+    return attempt, calls
+
+class TestResilientTransport(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        self.transport = ResilientTransport(deadline=10, max_retries=2, hedge=False,
+                                            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+                                            sleep=self.sleeps.append)
+    
+    def test_is_retryable(self):
+        """Test 429/5xx and timeouts are retryable but client errors are not."""
+        self.assertTrue(is_retryable(UpstreamError(429)))
+        self.assertTrue(is_retryable(UpstreamError(503)))
+        self.assertTrue(is_retryable(TimeoutError()))
+        self.assertFalse(is_retryable(UpstreamError(400)))
+        self.assertFalse(is_retryable(ValueError()))
+    
+    def test_retries_with_backoff_then_succeeds(self):
+        """Test transient failures are retried with jittered backoff."""
+        attempt, calls = flaky(2)
+        self.assertEqual(self.transport.call(attempt), "ok")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertLessEqual(self.sleeps[0], 0.5)
+        self.assertLessEqual(self.sleeps[1], 1.0)
+        # Each attempt gets the remaining deadline as its timeout
+        self.assertTrue(all(0 < timeout <= 10 for timeout in calls))
+    
+    def test_client_errors_are_not_retried(self):
+        """Test a 400 is raised immediately without tripping the breaker."""
+        attempt, calls = flaky(5, status_code=400)
+        with self.assertRaises(UpstreamError):
+            self.transport.call(attempt)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.transport.breaker.state, "closed")
+    
+    def test_circuit_opens_and_fails_fast(self):
+        """Test repeated upstream failures open the breaker so later calls fail fast."""
+        for _ in range(2):
+            attempt, _ = flaky(10)
+            with self.assertRaises(UpstreamError):
+                self.transport.call(attempt)
+        self.assertEqual(self.transport.breaker.state, "open")
+        
+        attempt, calls = flaky(0)
+        with self.assertRaises(CircuitOpenError):
+            self.transport.call(attempt)
+        self.assertEqual(calls, [])
+    
+    def test_half_open_probe_closes_breaker(self):
+        """Test a successful probe after the reset timeout closes the breaker."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        with patch("coach_core.transport.time.monotonic", return_value=breaker.opened_at + 31):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())  # only one probe at a time
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+    
+    def test_deadline_bounds_retries(self):
+        """Test a backoff that would overrun the deadline is not attempted."""
+        transport = ResilientTransport(deadline=0.2, max_retries=5, hedge=False, sleep=self.sleeps.append)
+        error = UpstreamError(429)
+        error.response = type("Response", (), {"headers": {"retry-after": "5"}, "status_code": 429})()
+        def attempt(timeout):
+            raise error
+        with self.assertRaises(UpstreamError):
+            transport.call(attempt)
+        self.assertEqual(self.sleeps, [])
+        
+        with self.assertRaises(DeadlineExceeded):
+            transport.call(lambda timeout: "late", deadline=0)
+    
+    def test_hedged_request_wins(self):
+        """Test a hedge fires after p95 and the faster attempt's result is used."""
+        import threading
+        transport = ResilientTransport(deadline=5, hedge=True, hedge_min_samples=3)
+        for _ in range(3):
+            transport.latency.record(0.01)
+        
+        release = threading.Event()
+        attempts = []
+        def attempt(timeout):
+            attempts.append(timeout)
+            if len(attempts) == 1:
+                release.wait(5)  # first attempt stalls
+                return "slow"
+            return "fast"
+        
+        try:
+            self.assertEqual(transport.call(attempt), "fast")
+            self.assertEqual(len(attempts), 2)
+        finally:
+            release.set()
+
+if __name__ == '__main__':
+    unittest.main()